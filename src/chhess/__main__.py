@@ -0,0 +1,26 @@
+import sys
+
+from . import uci
+from .game import game
+
+# Entry point: python -m src.chhess [uci]
+
+
+def main(argv: list[str] = None) -> int:
+    """Plays a game on the terminal, or speaks UCI with the uci command.
+
+    Args:
+        argv (list[str], optional): Arguments. Defaults to None (sys.argv).
+
+    Returns:
+        int: Exit status.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["uci"]:
+        return uci.main()
+    game.Player.play()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+import mmap
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Iterable, Iterator, Union
+
+from . import objects
+
+# Binary archive of Sequences. Layout, little-endian throughout:
+#
+#   MAGIC
+#   one record per game:
+#       HEADER                          fixed-size match data and lengths
+#       strings                         UTF-8, NUL-separated: event, site,
+#                                       white, black, then tag names and values
+#       moves                           16 bits per move, see pack
+#       extras                          8 bits per move: the bits of the move
+#                                       above objects.MOVE
+#   index                               64-bit offset of each record
+#   FOOTER                              64-bit offset of the index, game count
+#
+# Records can be written one at a time, and any one of them read through the
+# index without reading those before it.
+
+MAGIC = b"CHHSARC3"
+# Number of moves, length of strings, result, date and event date (number of
+# parts, year, month, day), round, elo_white, elo_black, count_ply and eco
+HEADER = struct.Struct("<IIBBIIIBIIIIIII3s")
+# Largest number of the header, above which numbers of tags are clamped (the
+# tags themselves keep the text)
+LARGEST = 0xFFFFFFFF
+FOOTER = struct.Struct("<QQ")
+OFFSET = struct.Struct("<Q")
+# Sequence.result by result code, and back
+RESULTS: tuple[list] = ([], [1, 0], [0, 1], [0.5, 0.5])
+CODES: dict[str, int] = {str(result): code for code, result in enumerate(RESULTS)}
+
+
+def pack(text: str) -> int:
+    """Returns a move in HHN packed into 16 bits, as by Event.pack: departure
+    square index (bits 0-5), arrival square index (bits 6-11) and Piece.kind
+    of the promotion, if any (bits 12-14).
+
+    Args:
+        text (str): Move in HHN, e.g. "e2 e4" or "e7 e8n".
+
+    Returns:
+        int: Packed move.
+    """
+    return objects.Sequence.pack(text)
+
+
+def unpack(move: int) -> str:
+    """Returns a move packed with pack in HHN.
+
+    Args:
+        move (int): Packed move.
+
+    Returns:
+        str: Move in HHN.
+    """
+    return objects.Sequence.unpack(move)
+
+
+def _number(number: int) -> int:
+    return min(max(number, 0), LARGEST)
+
+
+def _date(date: list[int]) -> tuple[int, int, int, int]:
+    # Year, month and day only, as decode reads no more
+    parts = [_number(part) for part in date[:3]]
+    return (len(parts), *(parts + [0, 0, 0])[:3])
+
+
+def encode(sequence: objects.Sequence) -> bytes:
+    """Encodes a Sequence as an archive record.
+
+    Args:
+        sequence (objects.Sequence): Sequence of moves, with its match data.
+
+    Returns:
+        bytes: Archive record.
+    """
+    strings = [sequence.event, sequence.site, sequence.white, sequence.black]
+    for name, value in sequence.tags.items():
+        strings += [name, value]
+    strings = "\0".join(strings).encode()
+    moves = array("H", (move & objects.MOVE for move in sequence.sequence))
+    if sys.byteorder == "big":
+        moves.byteswap()
+    extras = bytes(move >> objects.CAPTURED for move in sequence.sequence)
+    return (
+        HEADER.pack(
+            len(moves),
+            len(strings),
+            CODES.get(str(sequence.result), 0),
+            *_date(sequence.date),
+            *_date(sequence.date_event),
+            _number(sequence.round),
+            _number(sequence.elo_white),
+            _number(sequence.elo_black),
+            _number(sequence.count_ply),
+            sequence.eco.encode(),
+        )
+        + strings
+        + moves.tobytes()
+        + extras
+    )
+
+
+def decode(data: Union[bytes, memoryview], offset: int = 0) -> objects.Sequence:
+    """Decodes an archive record as a Sequence.
+
+    Args:
+        data (Union[bytes, memoryview]): Buffer holding the record.
+        offset (int, optional): Offset of the record in the buffer. Defaults
+            to 0.
+
+    Returns:
+        objects.Sequence: Sequence of moves, with its match data.
+    """
+    fields = HEADER.unpack_from(data, offset)
+    count, length, result = fields[:3]
+    offset += HEADER.size
+    strings = bytes(data[offset : offset + length]).decode().split("\0")
+    offset += length
+
+    sequence = objects.Sequence()
+    extras = data[offset + 2 * count : offset + 3 * count]
+    sequence.sequence = [
+        move | extra << objects.CAPTURED
+        for move, extra in zip(_moves(data, offset, count), extras)
+    ]
+    sequence.moves = count
+    sequence.event, sequence.site, sequence.white, sequence.black = strings[:4]
+    sequence.tags = dict(zip(strings[4::2], strings[5::2]))
+    sequence.result = list(RESULTS[result])
+    sequence.date = list(fields[4 : 4 + fields[3]])
+    sequence.date_event = list(fields[8 : 8 + fields[7]])
+    sequence.round, sequence.elo_white, sequence.elo_black = fields[11:14]
+    sequence.count_ply = fields[14]
+    sequence.eco = fields[15].rstrip(b"\0").decode()
+    return sequence
+
+
+def _moves(data: Union[bytes, memoryview], offset: int, count: int) -> array:
+    moves = array("H")
+    moves.frombytes(data[offset : offset + 2 * count])
+    if sys.byteorder == "big":
+        moves.byteswap()
+    return moves
+
+
+def write(target: Union[str, BinaryIO], sequences: Iterable[objects.Sequence]) -> int:
+    """Writes Sequences to an archive, one record at a time.
+
+    Args:
+        target (Union[str, BinaryIO]): Path of the archive, or a binary file
+            open for writing.
+        sequences (Iterable[objects.Sequence]): Sequences of moves.
+
+    Returns:
+        int: Number of Sequences written.
+    """
+    if isinstance(target, str):
+        with open(target, "wb") as f:
+            return write(f, sequences)
+
+    offsets = array("Q")
+    position = target.write(MAGIC)
+    for sequence in sequences:
+        offsets.append(position)
+        position += target.write(encode(sequence))
+    target.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+    target.write(FOOTER.pack(position, len(offsets)))
+    return len(offsets)
+
+
+class Archive:
+    """Read-only archive of Sequences, memory-mapped so that any game can be
+    fetched through the index without reading the others.
+
+    Variables:
+        file (BinaryIO): Archive file.
+        data (mmap.mmap): Memory map of the file.
+        index (int): Offset of the index.
+        count (int): Number of games.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initializes an Archive object.
+
+        Args:
+            path (str): Path of the archive.
+
+        Raises:
+            ValueError: Not an archive.
+        """
+        self.file: BinaryIO = open(path, "rb")
+        try:
+            self.data: mmap.mmap = mmap.mmap(
+                self.file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        except ValueError:
+            self.file.close()
+            raise ValueError("Not an archive: " + path + ".")
+        if self.data[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError("Not an archive: " + path + ".")
+        self.index, self.count = FOOTER.unpack_from(
+            self.data, len(self.data) - FOOTER.size
+        )
+
+    def __enter__(self) -> "Archive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the memory map and the file."""
+        self.data.close()
+        self.file.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def offset(self, i: int) -> int:
+        """Returns the offset of a game's record.
+
+        Args:
+            i (int): Index of the game, negative to count from the end.
+
+        Raises:
+            IndexError: No such game.
+
+        Returns:
+            int: Offset of the record.
+        """
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("Archive index out of range.")
+        return OFFSET.unpack_from(self.data, self.index + OFFSET.size * i)[0]
+
+    def __getitem__(self, i: int) -> objects.Sequence:
+        return decode(self.data, self.offset(i))
+
+    def __iter__(self) -> Iterator[objects.Sequence]:
+        for i in range(self.count):
+            yield self[i]
+
+    def moves(self, i: int) -> array:
+        """Returns the moves of a game without decoding the rest of its record.
+
+        Args:
+            i (int): Index of the game.
+
+        Returns:
+            array: Moves, packed with pack (or Event.pack).
+        """
+        offset = self.offset(i)
+        count, length = HEADER.unpack_from(self.data, offset)[:2]
+        return _moves(self.data, offset + HEADER.size + length, count)
@@ -0,0 +1,534 @@
+from typing import Iterator
+
+from . import magic, objects, tables
+
+# Square indices run a1 = 0, b1 = 1, ..., h1 = 7, a2 = 8, ..., h8 = 63, so that
+# square = 8 * rank index + file index, matching Position.index().
+
+# Piece kinds, used as indices into BitBoard.pieces. Black pieces are offset
+# by COLOUR_OFFSET, i.e. white knights are pieces[1], black knights pieces[7].
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+COLOUR_OFFSET = 6
+TYPES = (
+    objects.Pawn,
+    objects.Knight,
+    objects.Bishop,
+    objects.Rook,
+    objects.Queen,
+    objects.King,
+)
+KINDS = {TYPES[kind]: kind for kind in range(len(TYPES))}
+
+FULL = 0xFFFF_FFFF_FFFF_FFFF
+FILE_A = 0x0101_0101_0101_0101
+FILE_B = FILE_A << 1
+FILE_G = FILE_A << 6
+FILE_H = FILE_A << 7
+RANK_1 = 0xFF
+RANK_2 = RANK_1 << 8
+RANK_4 = RANK_1 << 24
+RANK_5 = RANK_1 << 32
+RANK_7 = RANK_1 << 48
+RANK_8 = RANK_1 << 56
+
+
+def square(position: objects.Position) -> int:
+    """Returns the square index of a Position.
+
+    Args:
+        position (objects.Position): Position on the board.
+
+    Returns:
+        int: Square index, from 0 (a1) to 63 (h8).
+    """
+    return (position.rank - 1) * 8 + position.file - 1
+
+
+def position(sq: int) -> objects.Position:
+    """Returns the Position of a square index.
+
+    Args:
+        sq (int): Square index, from 0 (a1) to 63 (h8).
+
+    Returns:
+        objects.Position: Position on the board.
+    """
+    return objects.Position.at(sq)
+
+
+def piece_index(piece: objects.Piece) -> int:
+    """Returns the index of a Piece's bitboard in BitBoard.pieces.
+
+    Args:
+        piece (objects.Piece): Piece in play.
+
+    Returns:
+        int: Index into BitBoard.pieces.
+    """
+    return KINDS[type(piece)] + (COLOUR_OFFSET if piece.colour else 0)
+
+
+def squares(bb: int) -> Iterator[int]:
+    """Yields the square index of every set bit in a bitboard, from a1 to h8.
+
+    Args:
+        bb (int): Bitboard.
+
+    Yields:
+        int: Square index of a set bit.
+    """
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+
+def knight_attacks(sq: int) -> int:
+    return tables.KNIGHT_ATTACKS[sq]
+
+
+def king_attacks(sq: int) -> int:
+    return tables.KING_ATTACKS[sq]
+
+
+def pawn_attacks(sq: int, colour: bool) -> int:
+    """Returns the squares attacked (diagonally) by a pawn.
+
+    Args:
+        sq (int): Square index of the pawn.
+        colour (bool): Colour of the pawn.
+
+    Returns:
+        int: Bitboard of attacked squares.
+    """
+    return tables.PAWN_ATTACKS[1 if colour else 0][sq]
+
+
+bishop_attacks = magic.bishop_attacks
+rook_attacks = magic.rook_attacks
+queen_attacks = magic.queen_attacks
+
+
+class BitSquare(objects.Square):
+    """Square of a BitBoard. Assigning a piece to the Square writes through to
+    the bitboards of its BitBoard, so code that moves pieces by setting
+    Square.piece keeps both representations in step.
+
+    Variables:
+        position (Position): Position object representing position of Square on the board.
+        piece (Piece): Piece object on the Square, if any. None if none.
+        sq (int): Square index, from 0 (a1) to 63 (h8).
+        owner (BitBoard): BitBoard the Square belongs to.
+    """
+
+    __slots__ = ("sq", "owner", "_piece")
+
+    def __init__(
+        self, position: objects.Position, owner: "BitBoard", piece: objects.Piece = None
+    ) -> None:
+        """Initializes a BitSquare object.
+
+        Args:
+            position (Position): Position object representing position on the board.
+            owner (BitBoard): BitBoard the Square belongs to.
+            piece (Piece.Piece, optional): Piece occupying the Square. Defaults to None.
+        """
+        self.sq: int = position.square()
+        self.owner: BitBoard = owner
+        self._piece: objects.Piece = None
+        super().__init__(position, piece)
+
+    @property
+    def piece(self) -> objects.Piece:
+        return self._piece
+
+    @piece.setter
+    def piece(self, piece: objects.Piece) -> None:
+        if self._piece is not None:
+            old, self._piece = self._piece, None
+            self.owner.remove(old, self.sq)
+        self._piece = piece
+        if piece is not None:
+            self.owner.place(piece, self.sq)
+
+
+class BitBoard(objects.Board):
+    """Representation of a chess board backed by bitboards. The list of Squares
+    inherited from Board is kept as a view over the bitboards.
+
+    Variables:
+        board (list[list[BitSquare]]): 8x8 2D list of BitSquare objects,
+            representing the board.
+        squares (list[BitSquare]): The same BitSquare objects, indexed by
+            square index.
+        pieces (list[int]): Twelve bitboards, one per kind and colour of
+            piece. See PAWN, KNIGHT, ..., KING and COLOUR_OFFSET.
+        colours (list[int]): Bitboards of the squares occupied by white (1st
+            index) and black (2nd index) pieces.
+        occupied (int): Bitboard of all occupied squares.
+        attack_sets (list[int]): Bitboard of the squares attacked by the
+            piece on each square, 0 if the square is empty.
+        attack_counts (list[list[int]]): Number of white (1st index) and
+            black (2nd index) pieces attacking each square.
+        attack_maps (list[int]): Bitboards of the squares attacked by white
+            (1st index) and black (2nd index) pieces.
+    """
+
+    def __init__(self, notate: bool = False) -> None:
+        self.pieces: list[int] = [0] * 12
+        self.colours: list[int] = [0, 0]
+        self.occupied: int = 0
+        self.attack_sets: list[int] = [0] * 64
+        self.attack_colours: list[int] = [0] * 64
+        self.attack_counts: list[list[int]] = [[0] * 64, [0] * 64]
+        self.attack_maps: list[int] = [0, 0]
+        self._pins: tuple = (None, None, None)
+        super().__init__(notate)
+
+        # Replace the Squares with write-through BitSquares, then set pieces
+        self.squares: list[BitSquare] = []
+        pieces = []
+        for row in self.board:
+            for i in range(len(row)):
+                pieces.append(row[i].piece)
+                row[i] = BitSquare(row[i].position, self)
+                self.squares.append(row[i])
+        for sq in range(64):
+            self.squares[sq].piece = pieces[sq]
+
+    def place(self, piece: objects.Piece, sq: int) -> None:
+        """Sets the bits of a Piece on a square.
+
+        Args:
+            piece (objects.Piece): Piece arriving on the square.
+            sq (int): Square index.
+        """
+        bb = 1 << sq
+        self.pieces[piece_index(piece)] |= bb
+        self.colours[1 if piece.colour else 0] |= bb
+        self.occupied |= bb
+        self.update(sq)
+
+    def remove(self, piece: objects.Piece, sq: int) -> None:
+        """Clears the bits of a Piece on a square.
+
+        Args:
+            piece (objects.Piece): Piece leaving the square.
+            sq (int): Square index.
+        """
+        bb = FULL ^ (1 << sq)
+        self.pieces[piece_index(piece)] &= bb
+        self.colours[1 if piece.colour else 0] &= bb
+        self.occupied &= bb
+        self.update(sq)
+
+    def update(self, sq: int) -> None:
+        """Updates the attack maps after a square has changed, recomputing the
+        attacks of its piece and of every sliding piece that sees the square.
+
+        Args:
+            sq (int): Square index.
+        """
+        pieces = self.pieces
+        diagonal = (
+            pieces[BISHOP] | pieces[QUEEN] | pieces[BISHOP + 6] | pieces[QUEEN + 6]
+        )
+        orthogonal = pieces[ROOK] | pieces[QUEEN] | pieces[ROOK + 6] | pieces[QUEEN + 6]
+        affected = 1 << sq
+        if diagonal:
+            affected |= bishop_attacks(sq, self.occupied) & diagonal
+        if orthogonal:
+            affected |= rook_attacks(sq, self.occupied) & orthogonal
+        for s in squares(affected):
+            self.update_attacks(s)
+
+    def update_attacks(self, sq: int) -> None:
+        """Replaces the attack set of the piece on a square, adjusting the
+        attack counts and maps by the difference.
+
+        Args:
+            sq (int): Square index.
+        """
+        piece = self.squares[sq].piece
+        old, new = self.attack_sets[sq], self.attacks(sq)
+        colour = 1 if piece is not None and piece.colour else 0
+        if old == new and colour == self.attack_colours[sq]:
+            return
+
+        # Remove squares no longer attacked
+        i_c = self.attack_colours[sq]
+        counts = self.attack_counts[i_c]
+        removed = old if colour != i_c else old & ~new
+        for s in squares(removed):
+            counts[s] -= 1
+            if counts[s] == 0:
+                self.attack_maps[i_c] &= FULL ^ (1 << s)
+
+        # Add squares newly attacked
+        counts = self.attack_counts[colour]
+        for s in squares(new if colour != i_c else new & ~old):
+            if counts[s] == 0:
+                self.attack_maps[colour] |= 1 << s
+            counts[s] += 1
+
+        self.attack_sets[sq], self.attack_colours[sq] = new, colour
+
+    def bitboard(self, kind: int, colour: bool) -> int:
+        """Returns the bitboard of one kind and colour of piece.
+
+        Args:
+            kind (int): Kind of piece, e.g. KNIGHT.
+            colour (bool): Colour of piece.
+
+        Returns:
+            int: Bitboard of the squares occupied by such pieces.
+        """
+        return self.pieces[kind + (COLOUR_OFFSET if colour else 0)]
+
+    def king(self, colour: bool) -> int:
+        """Returns the square index of a King.
+
+        Args:
+            colour (bool): Colour of the King.
+
+        Returns:
+            int: Square index of the King, or -1 if there is none.
+        """
+        return self.bitboard(KING, colour).bit_length() - 1
+
+    def attacks(self, sq: int) -> int:
+        """Returns the squares attacked by the piece on a square.
+
+        Args:
+            sq (int): Square index.
+
+        Returns:
+            int: Bitboard of attacked squares, 0 if the square is empty.
+        """
+        piece = self.squares[sq].piece
+        if piece is None:
+            return 0
+        match KINDS[type(piece)]:
+            case 0:
+                return pawn_attacks(sq, piece.colour)
+            case 1:
+                return knight_attacks(sq)
+            case 2:
+                return bishop_attacks(sq, self.occupied)
+            case 3:
+                return rook_attacks(sq, self.occupied)
+            case 4:
+                return queen_attacks(sq, self.occupied)
+            case 5:
+                return king_attacks(sq)
+
+    def attackers(self, sq: int, colour: bool, occupied: int = None) -> int:
+        """Returns the pieces of one colour that attack a square.
+
+        Args:
+            sq (int): Square index.
+            colour (bool): Colour of the attacking pieces.
+            occupied (int, optional): Bitboard of the squares blocking sliding
+                pieces. Defaults to None (the occupied squares).
+
+        Returns:
+            int: Bitboard of the squares of the attacking pieces.
+        """
+        if occupied is None:
+            occupied = self.occupied
+        o = COLOUR_OFFSET if colour else 0
+        pieces = self.pieces
+        diagonal = pieces[BISHOP + o] | pieces[QUEEN + o]
+        orthogonal = pieces[ROOK + o] | pieces[QUEEN + o]
+        return (
+            (pawn_attacks(sq, not colour) & pieces[PAWN + o])
+            | (knight_attacks(sq) & pieces[KNIGHT + o])
+            | (king_attacks(sq) & pieces[KING + o])
+            | (bishop_attacks(sq, occupied) & diagonal if diagonal else 0)
+            | (rook_attacks(sq, occupied) & orthogonal if orthogonal else 0)
+        )
+
+    def attacked(self, sq: int, colour: bool) -> bool:
+        """Returns True if a square is attacked by any piece of one colour.
+
+        Args:
+            sq (int): Square index.
+            colour (bool): Colour of the attacking pieces.
+
+        Returns:
+            bool: Whether or not the square is attacked.
+        """
+        return (self.attack_maps[1 if colour else 0] >> sq) & 1 == 1
+
+    def in_check(self, colour: bool) -> bool:
+        """Returns True if the King of one colour is attacked.
+
+        Args:
+            colour (bool): Colour of the King.
+
+        Returns:
+            bool: Whether or not the King is in check.
+        """
+        sq = self.king(colour)
+        return sq >= 0 and self.attacked(sq, not colour)
+
+    def targets(self, sq: int) -> int:
+        """Returns the squares the piece on a square can move to, before
+        removing moves that leave its own King in check.
+
+        Args:
+            sq (int): Square index.
+
+        Returns:
+            int: Bitboard of target squares, 0 if the square is empty.
+        """
+        piece = self.squares[sq].piece
+        if piece is None:
+            return 0
+        own = self.colours[1 if piece.colour else 0]
+        empty = FULL ^ self.occupied
+
+        if isinstance(piece, objects.Pawn):
+            bb = 1 << sq
+            if piece.colour:
+                single = (bb >> 8) & empty
+                double = ((single & (RANK_7 >> 8)) >> 8) & empty
+            else:
+                single = (bb << 8) & empty
+                double = ((single & (RANK_2 << 8)) << 8) & empty
+            enemy = self.colours[0 if piece.colour else 1]
+            passant = self.en_passant() if piece.colour == self.colour else None
+            if passant is not None:
+                enemy |= 1 << passant.sq
+            return single | double | (pawn_attacks(sq, piece.colour) & enemy)
+
+        targets = self.attacks(sq) & (FULL ^ own)
+        if isinstance(piece, objects.King) and not piece.moved:
+            targets |= self.castles(piece.colour)
+        return targets
+
+    def pins(self, colour: bool) -> tuple[int, int, int]:
+        """Returns the pieces checking and pinned to the King of one colour,
+        and the squares that evade a check. Cached until the position changes.
+
+        Args:
+            colour (bool): Colour of the King.
+
+        Returns:
+            tuple[int, int, int]: Bitboards of the checking pieces, of the
+                pinned pieces, and of the squares a piece other than the King
+                may move to (all squares if not in check, the checking piece
+                and the squares between it and the King if in check by one
+                piece, none if in double check).
+        """
+        if self._pins[0] == self.key and self._pins[1] == colour:
+            return self._pins[2]
+        king = self.king(colour)
+        if king < 0:
+            return (0, 0, FULL)
+
+        o = 0 if colour else COLOUR_OFFSET
+        pieces = self.pieces
+        checkers = self.attackers(king, not colour)
+
+        # A piece is pinned if it is alone between the King and an enemy sliding
+        # piece that would see the King on an empty board
+        pinned = 0
+        snipers = (rook_attacks(king, 0) & (pieces[ROOK + o] | pieces[QUEEN + o])) | (
+            bishop_attacks(king, 0) & (pieces[BISHOP + o] | pieces[QUEEN + o])
+        )
+        for sniper in squares(snipers):
+            blockers = tables.BETWEEN[king][sniper] & self.occupied
+            if blockers and not blockers & (blockers - 1):
+                pinned |= blockers & self.colours[1 if colour else 0]
+
+        if not checkers:
+            evasions = FULL
+        elif checkers & (checkers - 1):
+            evasions = 0
+        else:
+            evasions = checkers | tables.BETWEEN[king][checkers.bit_length() - 1]
+
+        self._pins = (self.key, colour, (checkers, pinned, evasions))
+        return checkers, pinned, evasions
+
+    def legal_targets(self, sq: int) -> int:
+        """Returns the squares the piece on a square can legally move to, using
+        the checks and pins of the position rather than playing each move.
+
+        Args:
+            sq (int): Square index.
+
+        Returns:
+            int: Bitboard of target squares, 0 if the square is empty.
+        """
+        piece = self.squares[sq].piece
+        if piece is None:
+            return 0
+        colour = piece.colour
+        checkers, pinned, evasions = self.pins(colour)
+        own = self.colours[1 if colour else 0]
+
+        # The King may step to any unattacked square. When in check, the
+        # squares behind it on the line of a checking piece are attacked too,
+        # so those steps are checked with the King taken off the board.
+        if isinstance(piece, objects.King):
+            targets = king_attacks(sq) & ~own & ~self.attack_maps[0 if colour else 1]
+            if checkers:
+                occupied = self.occupied ^ (1 << sq)
+                for target in squares(targets):
+                    if self.attackers(target, not colour, occupied):
+                        targets ^= 1 << target
+            elif not piece.moved:
+                targets |= self.castles(colour)
+            return targets
+
+        king = self.king(colour)
+        targets = self.targets(sq) & evasions
+        if pinned >> sq & 1:
+            targets &= tables.LINES[king][sq]
+
+        # Capturing en passant removes two pieces from the rank of the King,
+        # so it is checked with both taken off the board
+        if isinstance(piece, objects.Pawn):
+            passant = self.en_passant() if colour == self.colour else None
+            if passant is not None and pawn_attacks(sq, colour) >> passant.sq & 1:
+                captured = passant.sq + (8 if colour else -8)
+                targets &= FULL ^ (1 << passant.sq)
+                occupied = self.occupied ^ (1 << sq | 1 << captured | 1 << passant.sq)
+                if king < 0 or not (
+                    self.attackers(king, not colour, occupied) & ~(1 << captured)
+                ):
+                    targets |= 1 << passant.sq
+        return targets
+
+    def castles(self, colour: bool) -> int:
+        """Returns the King destination squares of the castles available to
+        one colour: King and Rook unmoved, the squares between them empty, and
+        the King neither in, passing through, nor arriving in check.
+
+        Args:
+            colour (bool): Colour of the castling player.
+
+        Returns:
+            int: Bitboard of King destination squares.
+        """
+        base = 56 if colour else 0
+        king = self.squares[base + 4].piece
+        if not isinstance(king, objects.King) or king.moved or king.colour != colour:
+            return 0
+        if self.attacked(base + 4, not colour):
+            return 0
+
+        targets = 0
+        for corner, between, path in ((0, (1, 2, 3), (3, 2)), (7, (5, 6), (5, 6))):
+            rook = self.squares[base + corner].piece
+            if (
+                isinstance(rook, objects.Rook)
+                and not rook.moved
+                and rook.colour == colour
+                and not any(self.occupied >> (base + i) & 1 for i in between)
+                and not any(self.attacked(base + i, not colour) for i in path)
+            ):
+                targets |= 1 << (base + path[-1])
+        return targets
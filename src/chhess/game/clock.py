@@ -0,0 +1,224 @@
+from time import monotonic, perf_counter
+from typing import Callable
+
+# Game clock, and the time manager that turns the time left on it into
+# deadlines for a search. Times are in seconds.
+
+# Moves assumed left to the next time control, when it is not known
+MOVES = 30
+# Time kept back on every move, for the engine and the interface around it
+OVERHEAD = 0.05
+# Share of the increment spent on a move, the rest being banked
+INCREMENT = 0.75
+# Hard deadline, as a multiple of the soft one
+HARD = 4
+# Scale of the soft deadline when the best move has just changed, less STEP
+# for each iteration it stays the same, down to STABLE
+UNSTABLE, STEP, STABLE = 1.5, 0.25, 0.5
+
+
+class Clock:
+    """Chess clock of both players, with an increment and a delay per move.
+
+    Variables:
+        remaining (list[float]): Time left to white and black, as of the
+            start of the running turn.
+        increment (float): Time added after each move (Fischer).
+        delay (float): Time each move may take before the clock runs (simple
+            delay), or that is given back after it (Bronstein).
+        bronstein (bool): If the delay is given back after each move, rather
+            than waited out before the clock runs.
+        colour (bool): Player whose clock is running, None if stopped.
+        started (float): Time the running turn started, by now.
+        flagged (bool): Player who ran out of time, None if neither.
+        now (Callable[[], float]): Returns the current time.
+    """
+
+    def __init__(
+        self,
+        base: float,
+        increment: float = 0,
+        delay: float = 0,
+        bronstein: bool = False,
+        now: Callable[[], float] = monotonic,
+    ) -> None:
+        """Initializes a Clock object, stopped.
+
+        Args:
+            base (float): Time of each player at the start of the game.
+            increment (float, optional): Time added after each move. Defaults
+                to 0.
+            delay (float, optional): Delay of each move. Defaults to 0.
+            bronstein (bool, optional): If the delay is Bronstein's rather
+                than simple. Defaults to False.
+            now (Callable[[], float], optional): Returns the current time.
+                Defaults to time.monotonic.
+        """
+        self.remaining: list[float] = [base, base]
+        self.increment: float = increment
+        self.delay: float = delay
+        self.bronstein: bool = bronstein
+        self.colour: bool = None
+        self.started: float = None
+        self.flagged: bool = None
+        self.now: Callable[[], float] = now
+
+    def start(self, colour: bool) -> None:
+        """Starts the clock of a player.
+
+        Args:
+            colour (bool): Player whose turn it is.
+        """
+        self.colour, self.started = colour, self.now()
+
+    def charge(self) -> float:
+        """Returns the time charged so far to the running turn.
+
+        Returns:
+            float: Time charged, 0 if the clock is stopped.
+        """
+        if self.colour is None:
+            return 0
+        used = self.now() - self.started
+        return used if self.bronstein else max(0, used - self.delay)
+
+    def left(self, colour: bool) -> float:
+        """Returns the time left to a player, counting the running turn.
+
+        Args:
+            colour (bool): Player.
+
+        Returns:
+            float: Time left, 0 once flagged.
+        """
+        left = self.remaining[colour]
+        if colour == self.colour:
+            left -= self.charge()
+        return max(0, left)
+
+    def press(self) -> bool:
+        """Ends the running turn, once its move is made: charges its time,
+        adds the increment and starts the clock of the other player.
+
+        Returns:
+            bool: False if the player ran out of time.
+        """
+        colour, used = self.colour, self.now() - self.started
+        self.remaining[colour] -= self.charge()
+        if self.remaining[colour] <= 0:
+            self.remaining[colour] = 0
+            self.flagged, self.colour = colour, None
+            return False
+        if self.bronstein:
+            self.remaining[colour] += min(used, self.delay)
+        self.remaining[colour] += self.increment
+        self.start(not colour)
+        return True
+
+    def manager(self, colour: bool, moves: int = None) -> "TimeManager":
+        """Returns the time manager of a player's move.
+
+        Args:
+            colour (bool): Player who moves.
+            moves (int, optional): Moves to the next time control. Defaults
+                to None (unknown).
+
+        Returns:
+            TimeManager: Deadlines of the move.
+        """
+        # The delay is time the move may take for free, like an increment
+        return allocate(self.left(colour), self.increment + self.delay, moves)
+
+
+class TimeManager:
+    """Deadlines of a search, timed from when it starts: a soft deadline after
+    which no new iteration is started, scaled by how stable the best move is,
+    and a hard deadline at which the search is stopped.
+
+    Variables:
+        soft (float): Time after which no new iteration starts, None to only
+            keep to the hard deadline.
+        hard (float): Time at which the search stops.
+        origin (float): Time the search started, by perf_counter, None until
+            it has.
+        best (int): Best move of the last iteration, packed with Event.pack.
+        stable (int): Number of iterations the best move has not changed.
+    """
+
+    def __init__(self, soft: float, hard: float, started: bool = True) -> None:
+        """Initializes a TimeManager object.
+
+        Args:
+            soft (float): Soft deadline, None for none.
+            hard (float): Hard deadline.
+            started (bool, optional): If time runs from now, rather than from
+                start (e.g. after pondering). Defaults to True.
+        """
+        self.soft: float = soft
+        self.hard: float = hard
+        self.origin: float = perf_counter() if started else None
+        self.best: int = None
+        self.stable: int = 0
+
+    def start(self) -> None:
+        """Starts timing the search."""
+        self.origin = perf_counter()
+
+    def elapsed(self) -> float:
+        """Returns the time spent searching, 0 until started."""
+        return 0 if self.origin is None else perf_counter() - self.origin
+
+    def expired(self) -> bool:
+        """Returns True once the hard deadline has passed."""
+        return self.origin is not None and self.elapsed() >= self.hard
+
+    def proceed(self, best: int) -> bool:
+        """Records the best move of a completed iteration and returns whether
+        to start the next one.
+
+        Args:
+            best (int): Best move, packed with Event.pack.
+
+        Returns:
+            bool: False if the search should stop.
+        """
+        if best == self.best:
+            self.stable += 1
+        else:
+            self.best, self.stable = best, 0
+        if self.origin is None or self.soft is None:
+            return True
+        elapsed = self.elapsed()
+        # The next iteration takes about as long as all those before it, so
+        # would likely be cut off
+        if elapsed >= self.hard / 2:
+            return False
+        return elapsed < self.soft * max(STABLE, UNSTABLE - STEP * self.stable)
+
+
+def allocate(
+    remaining: float,
+    increment: float = 0,
+    moves: int = None,
+    overhead: float = OVERHEAD,
+) -> TimeManager:
+    """Returns the deadlines of a move, sharing the time left between the
+    moves to the next time control.
+
+    Args:
+        remaining (float): Time left on the clock.
+        increment (float, optional): Time added after the move. Defaults to
+            0.
+        moves (int, optional): Moves to the next time control, this one
+            included. Defaults to None (MOVES).
+        overhead (float, optional): Time kept back. Defaults to OVERHEAD.
+
+    Returns:
+        TimeManager: Deadlines of the move.
+    """
+    usable = max(0, remaining - overhead)
+    moves = MOVES if moves is None else max(1, moves)
+    soft = usable / moves + increment * INCREMENT
+    # The increment only comes after the move, so never risk the clock on it
+    hard = min(soft * HARD, usable * (0.9 if moves == 1 else 0.5))
+    return TimeManager(min(soft, hard), hard)
@@ -1,9 +1,14 @@
 from os import system, name
+from typing import Iterator
 
-from . import objects
+from . import bitboard, magic, objects, tables
 
 # import objects
 
+# Stages of Referee.iter_legal_moves, combined as bits
+CAPTURES, QUIETS, CASTLES = 1, 2, 4
+ALL = CAPTURES | QUIETS | CASTLES
+
 
 class Referee:
     def legal_moves(
@@ -11,22 +16,74 @@ class Referee:
         board: objects.Board,
         check_check=False,
     ) -> list[objects.Square]:
+        # Take legal moves straight from the checks and pins of a BitBoard
+        if isinstance(board, bitboard.BitBoard) and not check_check:
+            if piece is None:
+                raise ValueError("Invalid piece or board.")
+            return [
+                board.squares[sq]
+                for sq in bitboard.squares(board.legal_targets(piece.position.square()))
+            ]
+
+        moves = Referee.pseudo_legal_moves(piece, board, check_check)
+
+        # Remove moves that result in a check, playing each on the board and
+        # taking it back
+        if not check_check:
+            i_d = piece.position.index()
+            depart = board.board[i_d[0]][i_d[1]]
+            i = 0
+            while i < len(moves):
+                if not Referee.is_legal(objects.Event(depart, moves[i]), board):
+                    moves.pop(i)
+                    i -= 1
+                i += 1
+
+        return moves
+
+    def pseudo_legal_moves(
+        piece: objects.Piece,
+        board: objects.Board,
+        check_check=False,
+    ) -> list[objects.Square]:
+        """Returns the moves of a piece, without removing those that leave its
+        King in check.
+
+        Args:
+            piece (objects.Piece): Piece in play, of the player who moves next.
+            board (objects.Board): Board in play.
+            check_check (bool, optional): If the moves are only needed to find
+                attacks on a King, so castling is left out. Defaults to False.
+
+        Raises:
+            ValueError: Invalid piece or board.
+
+        Returns:
+            list[objects.Square]: Arrival Squares of the moves.
+        """
         if piece is None or board is None:
             raise ValueError("Invalid piece or board.")
-        # Get all possible moves as a list of Squares
-        moves = Referee.moves_as_squares(piece.possible_moves(), board)
-
-        # Remove blocked lines of sights
-        if isinstance(piece, objects.Pawn):
-            moves = Referee.Pawn.prune_lines(moves, piece, board)
-        elif isinstance(piece, objects.Bishop):
-            moves = Referee.Bishop.prune_lines(moves, piece)
+        # Get lines of sight of sliding pieces
+        if isinstance(piece, objects.Bishop):
+            moves = Referee.Bishop.prune_lines(piece, board)
         elif isinstance(piece, objects.Rook):
-            moves = Referee.Rook.prune_lines(moves, piece)
+            moves = Referee.Rook.prune_lines(piece, board)
         elif isinstance(piece, objects.Queen):
-            moves = Referee.Queen.prune_lines(moves, piece)
-        elif isinstance(piece, objects.King):
-            moves = Referee.King.prune_lines(moves, piece, board)
+            moves = Referee.Queen.prune_lines(piece, board)
+        # Get all other moves as a list of Squares, from the bitboards if available
+        elif isinstance(board, bitboard.BitBoard):
+            moves = [
+                board.squares[sq]
+                for sq in bitboard.squares(board.targets(piece.position.square()))
+            ]
+        else:
+            moves = Referee.moves_as_squares(piece.possible_moves(), board)
+
+            # Remove blocked lines of sights
+            if isinstance(piece, objects.Pawn):
+                moves = Referee.Pawn.prune_lines(moves, piece, board)
+            elif isinstance(piece, objects.King):
+                moves = Referee.King.prune_lines(moves, piece, board, check_check)
 
         # Remove moves that arrive on a piece of the same team
         i = 0
@@ -36,27 +93,95 @@ class Referee:
                 i -= 1
             i += 1
 
-        # Remove moves that result in a check
-        if not check_check:
-            i = 0
-            while i < len(moves):
-                board_copy = Referee.copy_board(board)
-                i_d, i_a = piece.position.index(), moves[i].position.index()
-
-                Player.move(
-                    board_copy,
-                    objects.Event(
-                        board_copy.board[i_d[0]][i_d[1]],
-                        board_copy.board[i_a[0]][i_a[1]],
-                    ),
-                )
-                if Referee.check_check(board_copy):
-                    moves.pop(i)
-                    i -= 1
-                i += 1
-
         return moves
 
+    def is_legal(event: objects.Event, board: objects.Board) -> bool:
+        """Returns True if a move does not leave the King of the player making it
+        in check, by playing it on the board and taking it back.
+
+        Args:
+            event (objects.Event): Move of the player who moves next, as
+                returned by pseudo_legal_moves.
+            board (objects.Board): Board in play.
+
+        Returns:
+            bool: Whether or not the move is legal.
+        """
+        board.make_move(event)
+        checked = Referee.check_check(board)
+        board.unmake_move()
+        return not checked
+
+    def iter_legal_moves(
+        board: objects.Board, colour: bool = None, stage: int = ALL
+    ) -> Iterator[objects.Event]:
+        """Yields the legal moves of a player lazily, stage by stage: captures
+        (including en passant), then quiet moves, then castling. On a plain
+        Board, each move is only checked for legality when it is reached, so
+        callers that stop early skip the rest; a BitBoard finds legal moves
+        directly from its checks and pins. A promotion is yielded once per
+        promotion choice, Queen first.
+
+        The board may be played on between moves, but must be as it was found
+        whenever the next move is requested.
+
+        Args:
+            board (objects.Board): Board in play.
+            colour (bool, optional): Colour of the player. Defaults to None
+                (the player who moves next).
+            stage (int, optional): Stages to yield, as bits of CAPTURES,
+                QUIETS and CASTLES. Defaults to ALL.
+
+        Yields:
+            objects.Event: Legal move.
+        """
+        side = board.colour
+        colour = side if colour is None else colour
+        promotions = (objects.Queen, objects.Knight, objects.Rook, objects.Bishop)
+        trial = not isinstance(board, bitboard.BitBoard)
+        staged = None
+        for i, bit in enumerate((CAPTURES, QUIETS, CASTLES)):
+            if not stage & bit:
+                continue
+            # Sort every move into its stage, once the first stage is reached
+            if staged is None:
+                staged = ([], [], [])
+                board.colour = colour
+                for piece in list(board.active[1 if colour else 0]):
+                    i_d = piece.position.index()
+                    depart = board.board[i_d[0]][i_d[1]]
+                    arrivals = (
+                        Referee.pseudo_legal_moves(piece, board)
+                        if trial
+                        else Referee.legal_moves(piece, board)
+                    )
+                    for arrive in arrivals:
+                        file = arrive.position.file - depart.position.file
+                        if arrive.piece is not None or (
+                            file != 0 and isinstance(piece, objects.Pawn)
+                        ):
+                            staged[0].append((depart, arrive))
+                        elif abs(file) == 2 and isinstance(piece, objects.King):
+                            staged[2].append((depart, arrive))
+                        else:
+                            staged[1].append((depart, arrive))
+                board.colour = side
+
+            for depart, arrive in staged[i]:
+                event = objects.Event(depart, arrive)
+                if trial:
+                    board.colour = colour
+                    legal = Referee.is_legal(event, board)
+                    board.colour = side
+                    if not legal:
+                        continue
+                last = arrive.position.rank in (1, 8)
+                if last and isinstance(depart.piece, objects.Pawn):
+                    for promotion in promotions:
+                        yield objects.Event(depart, arrive, promotion=promotion)
+                else:
+                    yield event
+
     def check_check(board: objects.Board) -> bool:
         """Returns True if the board is in a checked state.
 
@@ -66,6 +191,9 @@ class Referee:
         Returns:
             bool: Whether or not the current player is in check.
         """
+        if isinstance(board, bitboard.BitBoard):
+            return board.in_check(not board.colour)
+
         # Check every one of opponent's legal moves for King
         for piece in board.active[1 if board.colour else 0]:
             for move in Referee.legal_moves(piece, board, check_check=True):
@@ -75,6 +203,24 @@ class Referee:
                     return True
         return False
 
+    def in_check(board: objects.Board) -> bool:
+        """Returns True if the player who moves next is in check.
+
+        Args:
+            board (Objects.Board): The current board.
+
+        Returns:
+            bool: Whether or not the player who moves next is in check.
+        """
+        if isinstance(board, bitboard.BitBoard):
+            return board.in_check(board.colour)
+
+        # Check from the opponent's perspective
+        board.colour = not board.colour
+        checked = Referee.check_check(board)
+        board.colour = not board.colour
+        return checked
+
     def check_mate(board: objects.Board) -> bool:
         """Returns True if the board is in a checkmate state.
 
@@ -84,10 +230,45 @@ class Referee:
         Returns:
             bool: Whether or not the current player is in checkmate.
         """
-        for piece in board.active[1 if board.colour else 0]:
-            if len(Referee.legal_moves(piece, board)) > 0:
-                return False
-        return True
+        for event in Referee.iter_legal_moves(board):
+            return False
+        return Referee.in_check(board)
+
+    def stale_mate(board: objects.Board) -> bool:
+        """Returns True if the board is in a stalemate state.
+
+        Args:
+            board (Objects.Board): The current board.
+
+        Returns:
+            bool: Whether or not the current player has no legal move, while
+                not in check.
+        """
+        for event in Referee.iter_legal_moves(board):
+            return False
+        return not Referee.in_check(board)
+
+    def draw(board: objects.Board) -> str:
+        """Returns why the game is drawn, if it is: by stalemate, threefold
+        repetition, the fifty-move rule or insufficient material.
+
+        Args:
+            board (Objects.Board): The current board.
+
+        Returns:
+            str: How the game is drawn, None if it is not.
+        """
+        # The cheap checks first, moves only when needed
+        if board.repetitions() >= 2:
+            return "repetition"
+        if board.insufficient_material():
+            return "insufficient material"
+        if Referee.stale_mate(board):
+            return "stalemate"
+        # Mate on the last move takes precedence
+        if board.halfmove >= 100 and not Referee.check_mate(board):
+            return "fifty moves"
+        return None
 
     def moves_as_squares(
         moves: list[objects.Position], board: objects.Board
@@ -108,18 +289,13 @@ class Referee:
         return moves_squares
 
     def copy_board(board: objects.Board) -> objects.Board:
-        board_copy = objects.Board()
-
-        for event in board.sequence.sequence:
-            split = event.split()
-            i_d = objects.Position(split[0], mode=3).index()
-            i_a = objects.Position(split[1], mode=3).index()
-            Player.move(
-                board_copy,
-                objects.Event(
-                    board_copy.board[i_d[0]][i_d[1]], board_copy.board[i_a[0]][i_a[1]]
-                ),
-            )
+        if board.origin is None:
+            board_copy = type(board)()
+        else:
+            board_copy = type(board).from_fen(board.origin)
+
+        for move in board.sequence.sequence:
+            Player.move(board_copy, board_copy.event(move))
 
         return board_copy
 
@@ -190,310 +366,178 @@ class Referee:
             Returns:
                 bool: True if the pawn is able to capture en passant on the side specified.
             """
-            if len(board.sequence.sequence) == 0:
-                return False
-            i_last = objects.Position(
-                board.sequence.sequence[-1].split()[1], mode=3
-            ).index()
-            p_last = board.board[i_last[0]][i_last[1]]
+            square = board.en_passant()
             if (
-                (pawn.colour and pawn.position.rank != 4)
-                or (not pawn.colour and pawn.position.rank != 5)
-                or not isinstance(p_last, objects.Pawn)
-                or p_last.position.file != pawn.position.file + (-1 if left else -1)
-                or p_last.position.rank != (4 if pawn.colour else 5)
+                square is None
+                or square.position.file != pawn.position.file + (-1 if left else 1)
+                or square.position.rank
+                != pawn.position.rank + (-1 if pawn.colour else 1)
             ):
                 return False
             return True
 
-    class Bishop:
-        def prune_lines(
-            moves: list[objects.Square], bishop: objects.Bishop
-        ) -> list[objects.Square]:
-            """Prunes blocked lines of sight within the passed set of moves for
-            this piece.
-
-            Args:
-                moves (list[Objects.Square]): Moves possible for this piece.
-                bishop (Objects.Bishop): Bishop in play.
-                board (Objects.Board): Board in play.
-
-            Returns:
-                list[Objects.Square]: Possible moves for this piece, with
-                    blocked lines of sight pruned.
-            """
-            file_p, rank_p = bishop.position.file, bishop.position.rank
-            left, right, up, down = file_p - 1, 8 - file_p, 8 - rank_p, rank_p - 1
+    def walk_lines(
+        piece: objects.Piece, board: objects.Board, directions: tuple[int]
+    ) -> list[objects.Square]:
+        """Returns the Squares along the lines of sight of a sliding piece. On a
+        BitBoard, these are looked up in the magic bitboard tables. Otherwise,
+        each line of sight is walked once, outwards, stopping at the first
+        piece in the way, which is included if it may be captured.
 
-            moves = Referee.Bishop.prune_line(
-                moves, bishop, min(right, up), not bishop.colour, not bishop.colour
-            )
-            moves = Referee.Bishop.prune_line(
-                moves, bishop, min(right, down), bishop.colour, not bishop.colour
-            )
-            moves = Referee.Bishop.prune_line(
-                moves, bishop, min(left, down), bishop.colour, bishop.colour
-            )
-            moves = Referee.Bishop.prune_line(
-                moves, bishop, min(left, up), not bishop.colour, bishop.colour
-            )
+        Args:
+            piece (Objects.Piece): Sliding piece in play.
+            board (Objects.Board): Board in play.
+            directions (tuple[int]): Directions of the lines of sight, e.g.
+                tables.DIAGONALS.
 
-            return moves
+        Returns:
+            list[Objects.Square]: Possible moves for this piece.
+        """
+        sq = piece.position.square()
+        if isinstance(board, bitboard.BitBoard):
+            attacks = 0
+            if directions != tables.DIAGONALS:
+                attacks |= magic.rook_attacks(sq, board.occupied)
+            if directions != tables.ORTHOGONALS:
+                attacks |= magic.bishop_attacks(sq, board.occupied)
+            attacks &= ~board.colours[1 if piece.colour else 0]
+            return [board.squares[target] for target in bitboard.squares(attacks)]
+
+        moves = []
+        for direction in directions:
+            for target in tables.RAYS[direction][sq]:
+                square = board.board[target >> 3][target & 7]
+                if square.piece is not None:
+                    if square.piece.colour != piece.colour:
+                        moves.append(square)
+                    break
+                moves.append(square)
+        return moves
 
-        def prune_line(
-            moves: list[objects.Square],
-            bishop: objects.Bishop,
-            sight: int,
-            up: bool,
-            right: bool,
+    class Bishop:
+        def prune_lines(
+            bishop: objects.Bishop, board: objects.Board
         ) -> list[objects.Square]:
-            """Prunes one line of sight within the passed set of moves for this piece.
+            """Returns the possible moves for this piece, with blocked lines of
+            sight pruned.
 
             Args:
-                moves (list[Objects.Square]): Possible moves for this piece.
                 bishop (Objects.Bishop): Bishop in play.
-                sight (int): Length of the line of sight, by number of squares.
-                up (bool): If the line of sight is towards the 8-rank.
-                right (bool): If the line of sight is towards the h-file.
+                board (Objects.Board): Board in play.
 
             Returns:
-                list[Objects.Square]: Possible moves for this piece, with a
-                    single line of sight pruned.
+                list[Objects.Square]: Possible moves for this piece.
             """
-            file_p, rank_p = bishop.position.file, bishop.position.rank
-            i, f, r, prune = 0, 1 if right else -1, 1 if up else -1, False
-
-            # Loop over moves list to find squares along single line of sight
-            while i < len(moves) and abs(f) <= sight and abs(r) <= sight:
-                file_m, rank_m = moves[i].position.file, moves[i].position.rank
-                piece_a = moves[i].piece
-
-                # Prune move if line of sight is blocked
-                if file_m == file_p + f and rank_m == rank_p + r:
-                    if prune or piece_a is not None:
-                        if prune or piece_a.colour == bishop.colour:
-                            moves.pop(i)
-                        i, f, r, prune = (
-                            -1,
-                            f + (1 if right else -1),
-                            r + (1 if up else -1),
-                            True,
-                        )
-
-                if i == len(moves) - 1:
-                    i, f, r = -1, f + (1 if right else -1), r + (1 if up else -1)
-
-                i += 1
-
-            return moves
+            return Referee.walk_lines(bishop, board, tables.DIAGONALS)
 
     class Rook:
         def prune_lines(
-            moves: list[objects.Square], rook: objects.Rook
+            rook: objects.Rook, board: objects.Board
         ) -> list[objects.Square]:
-            """Prunes blocked lines of sight within the passed set of moves for
-            this piece.
+            """Returns the possible moves for this piece, with blocked lines of
+            sight pruned.
 
             Args:
-                moves (list[Objects.Square]): Moves possible for this piece.
                 rook (Objects.Rook): Rook in play.
                 board (Objects.Board): Board in play.
 
             Returns:
-                list[Objects.Square]: Possible moves for this piece, with
-                    blocked lines of sight pruned.
+                list[Objects.Square]: Possible moves for this piece.
             """
-            file_p, rank_p = rook.position.file, rook.position.rank
-            left, right, up, down = file_p - 1, 8 - file_p, 8 - rank_p, rank_p - 1
-
-            moves = Referee.Rook.prune_line(moves, rook, right, not rook.colour, True)
-            moves = Referee.Rook.prune_line(moves, rook, down, rook.colour, False)
-            moves = Referee.Rook.prune_line(moves, rook, left, rook.colour, True)
-            moves = Referee.Rook.prune_line(moves, rook, up, not rook.colour, False)
-
-            return moves
-
-        def prune_line(
-            moves: list[objects.Square],
-            rook: objects.Rook,
-            sight: int,
-            increasing: bool,
-            along_files: bool,
-        ) -> list[objects.Square]:
-            """Prunes one line of sight within the passed set of moves for this piece.
-
-            Args:
-                moves (list[Objects.Square]): Possible moves for this piece.
-                rook (Objects.Rook): Rook in play.
-                sight (int): Length of the line of sight, by number of squares.
-                increasing (bool): If the line of sight is towards the 8-rank or
-                h-file.
-                along_files (bool): If the line of sight is along the files.
-
-            Returns:
-                list[Objects.Square]: Possible moves for this piece, with a
-                    single line of sight pruned.
-            """
-            file_p, rank_p = rook.position.file, rook.position.rank
-            i, a, prune = 0, 1 if increasing else -1, False
-
-            # Loop over moves list to find squares along single line of sight
-            while i < len(moves) and abs(a) <= sight:
-                file_m, rank_m = moves[i].position.file, moves[i].position.rank
-                piece_a = moves[i].piece
-
-                # Prune move if line of sight is blocked
-                if (along_files and file_m == file_p + a and rank_m == rank_p) or (
-                    not along_files and file_m == file_p and rank_m == rank_p + a
-                ):
-                    if prune or piece_a is not None:
-                        if prune or piece_a.colour == rook.colour:
-                            moves.pop(i)
-                        i, a, prune = -1, a + (1 if increasing else -1), True
-
-                if i == len(moves) - 1:
-                    i, a = -1, a + (1 if increasing else -1)
-
-                i += 1
-
-            return moves
+            return Referee.walk_lines(rook, board, tables.ORTHOGONALS)
 
     class Queen:
         def prune_lines(
-            moves: list[objects.Square], queen: objects.Queen
+            queen: objects.Queen, board: objects.Board
         ) -> list[objects.Square]:
-            """Prunes blocked lines of sight within the passed set of moves for
-            this piece.
+            """Returns the possible moves for this piece, with blocked lines of
+            sight pruned.
 
             Args:
-                moves (list[Objects.Square]): Moves possible for this piece.
                 queen (Objects.Queen): Queen in play.
+                board (Objects.Board): Board in play.
 
             Returns:
-                list[Objects.Square]: Possible moves for this piece, with
-                    blocked lines of sight pruned.
+                list[Objects.Square]: Possible moves for this piece.
             """
-            file_p, rank_p = queen.position.file, queen.position.rank
-            left, right, up, down = file_p - 1, 8 - file_p, 8 - rank_p, rank_p - 1
-
-            # Clean diagonal lines of sight
-            moves = Referee.Bishop.prune_line(
-                moves, queen, min(right, up), not queen.colour, not queen.colour
-            )
-            moves = Referee.Bishop.prune_line(
-                moves, queen, min(right, down), queen.colour, not queen.colour
-            )
-            moves = Referee.Bishop.prune_line(
-                moves, queen, min(left, down), queen.colour, queen.colour
-            )
-            moves = Referee.Bishop.prune_line(
-                moves, queen, min(left, up), not queen.colour, queen.colour
+            return Referee.walk_lines(
+                queen, board, tables.ORTHOGONALS + tables.DIAGONALS
             )
 
-            # Clean axis lines of sight
-            moves = Referee.Rook.prune_line(moves, queen, right, not queen.colour, True)
-            moves = Referee.Rook.prune_line(moves, queen, down, queen.colour, False)
-            moves = Referee.Rook.prune_line(moves, queen, left, queen.colour, True)
-            moves = Referee.Rook.prune_line(moves, queen, up, not queen.colour, False)
-
-            return moves
-
     class King:
         def prune_lines(
-            moves: list[objects.Square], king: objects.King, board: objects.Board
+            moves: list[objects.Square],
+            king: objects.King,
+            board: objects.Board,
+            check_check: bool = False,
         ) -> list[objects.Square]:
-            """Prunes blocked lines of sight (in the context of castling) within
-            the passed set of moves for this piece.
+            """Prunes castle moves that are not available within the passed set
+            of moves for this piece.
 
             Args:
                 moves (list[Objects.Square]): Moves possible for this piece.
                 king (Objects.King): King in play.
                 board (Objects.Board): Board in play.
+                check_check (bool, optional): If only moves that may capture
+                    are wanted, in which case every castle is pruned. Defaults
+                    to False.
 
             Returns:
                 list[Objects.Square]: Possible moves for this piece, with
-                    blocked lines of sight pruned.
+                    unavailable castles pruned.
             """
-            i_l, i_r = ((0, 7 if king.colour else 0)), ((7, 7 if king.colour else 0))
-
-            if not king.moved:
-                if board.board[i_l[0]][i_l[1]].piece is not None and isinstance(
-                    board.board[i_l[0]][i_l[1]].piece, objects.Rook
-                ):
-                    moves = Referee.King.prune_line(moves, king, False, False)
-                else:
-                    moves = Referee.King.prune_line(moves, king, False, True)
-
-                if board.board[i_r[0]][i_r[1]].piece is not None and isinstance(
-                    board.board[i_r[0]][i_r[1]].piece, objects.Rook
+            i = 0
+            while i < len(moves):
+                file_m = moves[i].position.file
+                if abs(file_m - king.position.file) == 2 and (
+                    check_check
+                    or not Referee.King.castle(king, board, file_m > king.position.file)
                 ):
-                    moves = Referee.King.prune_line(moves, king, True, False)
-                else:
-                    moves = Referee.King.prune_line(moves, king, True, True)
+                    moves.pop(i)
+                    i -= 1
+                i += 1
 
             return moves
 
-        def prune_line(
-            moves: list[objects.Square],
-            king: objects.King,
-            board: objects.Board,
-            increasing: bool,
-            prune: bool = False,
-        ) -> list[objects.Square]:
-            """Prunes one line of sight within the passed set of moves for this piece.
+        def castle(king: objects.King, board: objects.Board, increasing: bool) -> bool:
+            """Returns whether or not this piece may castle on one side: King
+            and Rook unmoved, the squares between them empty, and the King
+            neither in nor passing through check.
 
             Args:
-                moves (list[Objects.Square]): Possible moves for this piece.
                 king (Objects.King): King in play.
                 board (Objects.Board): Board in play.
-                increasing (bool): If the line of sight is towards the 8-rank or
-                h-file.
-                prune (bool): If the line of sight is to be pruned.
+                increasing (bool): If castling towards the h-file.
 
             Returns:
-                list[Objects.Square]: Possible moves for this piece, with a
-                    single line of sight pruned.
+                bool: True if the castle is available.
             """
-            file_p, rank_p = king.position.file, king.position.rank
-            i, a, sight, prune = 0, 1 if increasing else -1, 2, prune
-
-            # Loop over moves list to find squares along single line of sight
-            while i < len(moves) and abs(a) <= sight:
-                file_m, rank_m = moves[i].position.file, moves[i].position.rank
-                piece_a = moves[i].piece
-
-                # Inspects square if on line of sight at correct distance
-                if file_m == file_p + a and rank_m == rank_p:
-                    # Prune move if line of sight is blocked
-                    if prune or piece_a is not None:
-                        if prune or piece_a.colour == king.colour:
-                            moves.pop(i)
-                        i, a, prune = -1, a + (1 if increasing else -1), True
-                    # Prune move if watched by opponent piece
-                    else:
-                        j = 0
-                        while j < len(moves):
-                            board_copy = Referee.copy_board(board)
-                            j_d, j_a = king.position.index(), moves[j].position.index()
-
-                            Player.move(
-                                board_copy,
-                                objects.Event(
-                                    board_copy.board[j_d[0]][j_d[1]],
-                                    board_copy.board[j_a[0]][j_a[1]],
-                                ),
-                            )
-
-                            if Referee.check_check(board_copy):
-                                moves.pop(j)
-                                j = len(moves)
-
-                if i == len(moves) - 1:
-                    i, a = -1, a + (1 if increasing else -1)
+            row = board.board[king.position.rank - 1]
+            rook = row[7 if increasing else 0].piece
+            between = range(5, 7) if increasing else range(1, 4)
+            if (
+                king.moved
+                or not isinstance(rook, objects.Rook)
+                or rook.moved
+                or rook.colour != king.colour
+                or any(row[file].piece is not None for file in between)
+            ):
+                return False
 
-                i += 1
+            # Check if the King is in check
+            if Referee.in_check(board):
+                return False
 
-            return moves
+            # Check if the King passes through check
+            i_d = king.position.index()
+            board.make_move(
+                objects.Event(
+                    board.board[i_d[0]][i_d[1]], row[i_d[1] + (1 if increasing else -1)]
+                )
+            )
+            checked = Referee.check_check(board)
+            board.unmake_move()
+            return not checked
 
     def clear_screen() -> None:
         if name == "nt":
@@ -504,78 +548,46 @@ class Referee:
 
 class Player:
     def castle(board: objects.Board, event: objects.Event) -> objects.Board:
-        increasing = event.arrive.position.file - event.depart.position.file < 0
-        i_r = (event.depart.position.rank - 1, 0 if increasing else 7)
-        i_ra = (i_r[0], i_r[1] + (-2 if increasing else 3))
-        board.board[i_ra[0]][i_ra[1]].piece = board.board[i_r[0]][i_r[1]].piece
-        board.board[i_ra[0]][i_ra[1]].piece.position = board.board[i_ra[0]][
-            i_ra[1]
-        ].position
-        board.board[i_r[0]][i_r[1]].piece = None
+        board.castle(event)
         return board
 
     def promote(board: objects.Board, event: objects.Event) -> objects.Board:
-        i_a = event.arrive.position.index()
-        pawn = board.board[i_a[0]][i_a[1]].piece
-        queen = objects.Queen(event.arrive.position, board.colour)
-        for i in range(len(board.active[1 if board.colour else 0])):
-            if (
-                board.active[1 if board.colour else 0][i].position.file
-                == pawn.position.file
-                and board.active[1 if board.colour else 0][i].position.rank
-                == pawn.position.rank
-            ):
-                board.active[1 if board.colour else 0][i] = queen
-                break
-        board.board[i_a[0]][i_a[1]].piece = queen
+        board.promote(event)
         return board
 
     def move(board: objects.Board, event: objects.Event) -> objects.Board:
         # TODO Implement string interpretation?
 
         # Assume legal moves by the power of Game
-        # Remove captured piece if capture event
-        if event.capture:
-            i_c = 0 if board.colour else 1
-            for i in range(len(board.active[i_c])):
-                if str(board.active[i_c][i].position) == str(event.arrive.position):
-                    board.captured[i_c].append(board.active[i_c].pop(i))
-                    break
-
-        # Move piece from depart to arrive
-        i_a, i_d = event.arrive.position.index(), event.depart.position.index()
-        board.board[i_a[0]][i_a[1]].piece = event.depart.piece
-        board.board[i_a[0]][i_a[1]].piece.position = event.arrive.position
-        board.board[i_d[0]][i_d[1]].piece = None
-
-        # If event is castle
-        if (
-            isinstance(event.arrive.piece, objects.King)
-            and abs(event.arrive.position.file - event.depart.position.file) == 2
-        ):
-            board = Player.castle(board, event)
-        # # If event is pawn promotion CHANGING EVERYTHING
-        # elif (
-        #     isinstance(event.arrive.piece, objects.Pawn)
-        #     and event.arrive.position.rank == 1
-        #     if board.colour
-        #     else 8
-        # ):
-        #     board = Player.promote(board, event)
-
-        # Add event to sequence and change active player
-        board.sequence.add_event(event)
-        board.colour = not board.colour
+        board.make_move(event)
 
         return board
 
+    def game_over(board: objects.Board) -> bool:
+        """Announces the end of the game, by checkmate or a draw, if it has
+        ended.
+
+        Args:
+            board (objects.Board): Board in play.
+
+        Returns:
+            bool: True if the game is over.
+        """
+        if Referee.check_mate(board):
+            print("White" if board.colour else "Black", "has won.")
+            return True
+        draw = Referee.draw(board)
+        if draw is not None:
+            print("Draw by " + draw + ".")
+            return True
+        return False
+
     def user_turn(board: objects.Board) -> bool:
         Referee.clear_screen()
         print(board)
 
-        # Ends game if board in mate state
-        if Referee.check_mate(board):
-            print("White" if board.colour else "Black", "has won.")
+        # Ends game if board in mate or drawn state
+        if Player.game_over(board):
             return False
 
         # Current input: depart arrive, e.g. e4 e6
@@ -609,8 +621,53 @@ class Player:
 
         return True
 
-    def play():
-        board = objects.Board(notate=True)
+    def engine_turn(board: objects.Board, engine, book=None, clock=None) -> bool:
+        """Plays one turn for a computer player, from the opening book if the
+        position is in it.
+
+        Args:
+            board (objects.Board): Board in play.
+            engine (solver.search.Engine): Engine choosing the move. Any object
+                with a search(board, manager) method returning an Event will
+                do.
+            book (solver.book.Book, optional): Opening book, consulted before
+                the engine. Defaults to None (no book).
+            clock (clock.Clock, optional): Game clock, which the engine keeps
+                to. Defaults to None (no time limit).
+
+        Returns:
+            bool: False if the game is over, True otherwise.
+        """
+        Referee.clear_screen()
+        print(board)
+
+        # Ends game if board in mate or drawn state
+        if Player.game_over(board):
+            return False
+
+        event = None if book is None else book.choose(board)
+        if event is None and clock is None:
+            event = engine.search(board)
+        elif event is None:
+            event = engine.search(board, clock.manager(board.colour))
+
+        board = Player.move(board, event)
+        return True
+
+    def play(white=None, black=None, book=None, clock=None):
+        """Plays a game on the command line, on the clock if given one.
+
+        Args:
+            white (solver.search.Engine, optional): Engine playing white.
+                Defaults to None (user input).
+            black (solver.search.Engine, optional): Engine playing black.
+                Defaults to None (user input).
+            book (solver.book.Book, optional): Opening book of the engines.
+                Defaults to None (no book).
+            clock (clock.Clock, optional): Game clock. Defaults to None (no
+                clock).
+        """
+        board = bitboard.BitBoard(notate=True)
 
         # # Auto play six moves
         # events = ["e2 e4", "b8 b6", "f1 c4", "b6 b8", "d1 f4", "b8 b6"]
@@ -625,4 +682,15 @@ class Player:
 
         game_active = True
         while game_active:
-            game_active = Player.user_turn(board)
+            engine, plies = black if board.colour else white, len(board.history)
+            if clock is not None and clock.colour is None:
+                clock.start(board.colour)
+            if engine is None:
+                game_active = Player.user_turn(board)
+            else:
+                game_active = Player.engine_turn(board, engine, book, clock)
+
+            # The clock runs on through retries, until a move is made
+            if clock is not None and len(board.history) > plies and not clock.press():
+                print("Black" if board.colour else "White", "has won on time.")
+                game_active = False
@@ -0,0 +1,333 @@
+import threading
+
+from . import tables
+
+# Sliding piece attacks by magic bitboard lookup. For each square, the
+# occupancy of the squares that can block a line of sight (the relevant mask)
+# is multiplied by a magic number, and the top bits of the product index a
+# table of attack bitboards. The magic numbers were found with find_magic and
+# SEED; the attack tables are generated from them at first use.
+
+FULL = 0xFFFF_FFFF_FFFF_FFFF
+SEED = 0x9E37_79B9_7F4A_7C15
+
+
+ROOK_MAGICS: tuple[int] = (
+    0x2080002080400010,
+    0x00C0002001401000,
+    0x2100110008402002,
+    0x0880080081041000,
+    0x0200020020041008,
+    0x2300040008010012,
+    0x0C00283004008201,
+    0x0180010000407A80,
+    0x0168800080400020,
+    0x0010400040201000,
+    0x1001002001001048,
+    0x1001002408100100,
+    0x0801000408010012,
+    0x4001000209000400,
+    0x08A20004C8020001,
+    0x2002801145002280,
+    0x0080860021004200,
+    0x001000C009402002,
+    0x00B0002004002800,
+    0x100A808010020800,
+    0x8101010008000410,
+    0x0244008002000480,
+    0x0000040010810208,
+    0x2000020000448534,
+    0x4104400480008033,
+    0x0000810100204000,
+    0x0440430900200010,
+    0x4600240900100100,
+    0x0060080080040080,
+    0x0001000300080400,
+    0x0004084400011002,
+    0x0023040200008041,
+    0x0580050043002080,
+    0x0400804002802008,
+    0x0001002001004010,
+    0x1000200901001000,
+    0x4410800801800C00,
+    0xA012003806001004,
+    0x0020100104008802,
+    0x0004808402000041,
+    0x0010400170898000,
+    0x0080500020004004,
+    0x1040408012020020,
+    0x8010040008004040,
+    0x2001080100110004,
+    0x0000020004008080,
+    0x0021010810040002,
+    0x0800008C43020024,
+    0x0000800021005100,
+    0x0070201040008080,
+    0x0000D04282006A00,
+    0x0010014400080240,
+    0x0001080110050100,
+    0x0012000810240600,
+    0x0402000801040200,
+    0x028100108A004100,
+    0x0050800300102045,
+    0x8208210040120882,
+    0x8010600101183441,
+    0x020B000910006045,
+    0x0241001002480005,
+    0x0081000400880241,
+    0x0000009008024124,
+    0x0048122980410402,
+)
+BISHOP_MAGICS: tuple[int] = (
+    0x8008029802002200,
+    0x4291040808802804,
+    0x0008180040800300,
+    0x00088A0202AA1050,
+    0x000410A800000000,
+    0x0009100804040009,
+    0x0801140121080011,
+    0xA040808400824000,
+    0x000008A004040048,
+    0x0600200440808114,
+    0x2020410401204403,
+    0x000404106200C001,
+    0x0100011040800026,
+    0x00080088200A0820,
+    0x0008004804642080,
+    0x4000004402981800,
+    0x0710002220020088,
+    0x2010808202020402,
+    0x8010080844002820,
+    0x800C000124028000,
+    0x0002000422010040,
+    0x6438402200422000,
+    0x0010A1004C0C2000,
+    0x000A00E109010190,
+    0x08022010400414C0,
+    0x8428022220240101,
+    0x0008088004040010,
+    0x0008080000220020,
+    0x0421010000104000,
+    0x219102082500A000,
+    0x0018008042120150,
+    0x02108020A09C0402,
+    0x301C202000890208,
+    0xA004022000080100,
+    0x100C024100881200,
+    0x8000080800460A00,
+    0x1004010804440040,
+    0x420C920080041000,
+    0x05018C0114440100,
+    0x00040100308A0080,
+    0x0020821042801000,
+    0x0202026120001C02,
+    0x0002001044000800,
+    0x20AA844200800801,
+    0x0000012011001200,
+    0x0860209008808042,
+    0x0008100080A80200,
+    0x0808020050420201,
+    0x00051C0104C00000,
+    0x0000840108820022,
+    0x000A461842080004,
+    0x2400400914880002,
+    0x00040040102481B4,
+    0x2104A14202020060,
+    0x0004081041020060,
+    0x00A0840082005100,
+    0x0000412210101482,
+    0x0108504208042210,
+    0x000020044C040405,
+    0x4140050206051401,
+    0x0122008051820200,
+    0x0082800428109100,
+    0x9104042454440401,
+    0x141E200C00820848,
+)
+
+
+def relevant_mask(sq: int, directions: tuple[int]) -> int:
+    """Returns the squares whose occupancy can block the lines of sight of a
+    sliding piece, i.e. every square along them except the last.
+
+    Args:
+        sq (int): Square index of the sliding piece.
+        directions (tuple[int]): Directions of the lines of sight.
+
+    Returns:
+        int: Bitboard of relevant squares.
+    """
+    return tables.mask(
+        target for direction in directions for target in tables.RAYS[direction][sq][:-1]
+    )
+
+
+def subsets(mask: int):
+    """Yields every subset of a bitboard, starting with the empty set.
+
+    Args:
+        mask (int): Bitboard.
+
+    Yields:
+        int: Subset of the bitboard.
+    """
+    subset = 0
+    while True:
+        yield subset
+        subset = (subset - mask) & mask
+        if subset == 0:
+            return
+
+
+def random(state: int) -> tuple[int, int]:
+    """Advances an xorshift64 pseudo-random number generator.
+
+    Args:
+        state (int): Current (non-zero) state.
+
+    Returns:
+        tuple[int, int]: The new state, which is also the random number.
+    """
+    state ^= (state << 13) & FULL
+    state ^= state >> 7
+    state ^= (state << 17) & FULL
+    return state, state
+
+
+def find_magic(sq: int, directions: tuple[int], state: int = SEED) -> tuple[int, int]:
+    """Searches for a magic number that maps every relevant occupancy of a
+    square to a table index without harmful collisions.
+
+    Args:
+        sq (int): Square index of the sliding piece.
+        directions (tuple[int]): Directions of the lines of sight.
+        state (int, optional): Random generator state. Defaults to SEED.
+
+    Returns:
+        tuple[int, int]: The magic number and the final generator state.
+    """
+    mask = relevant_mask(sq, directions)
+    shift = 64 - bin(mask).count("1")
+    occupancies = list(subsets(mask))
+    attacks = [tables.slide(sq, occupied, directions) for occupied in occupancies]
+    while True:
+        # Sparse candidates make good magics far more often
+        state, a = random(state)
+        state, b = random(state)
+        state, c = random(state)
+        magic = a & b & c
+        if bin((mask * magic) & 0xFF00_0000_0000_0000).count("1") < 6:
+            continue
+        table = {}
+        for occupied, attack in zip(occupancies, attacks):
+            index = ((occupied * magic) & FULL) >> shift
+            if table.setdefault(index, attack) != attack:
+                break
+        else:
+            return magic, state
+
+
+def find_magics(directions: tuple[int]) -> tuple[int]:
+    """Searches for the magic numbers of every square, in order, starting the
+    random generator from SEED.
+
+    Args:
+        directions (tuple[int]): Directions of the lines of sight.
+
+    Returns:
+        tuple[int]: Magic number of each square.
+    """
+    magics, state = [], SEED
+    for sq in range(64):
+        magic, state = find_magic(sq, directions, state)
+        magics.append(magic)
+    return tuple(magics)
+
+
+ROOK_MASKS: tuple[int] = tuple(
+    relevant_mask(sq, tables.ORTHOGONALS) for sq in range(64)
+)
+BISHOP_MASKS: tuple[int] = tuple(
+    relevant_mask(sq, tables.DIAGONALS) for sq in range(64)
+)
+ROOK_SHIFTS: tuple[int] = tuple(64 - bin(mask).count("1") for mask in ROOK_MASKS)
+BISHOP_SHIFTS: tuple[int] = tuple(64 - bin(mask).count("1") for mask in BISHOP_MASKS)
+
+# Attack tables, one list per square, filled by generate() at first use
+ROOK_TABLE: list[list[int]] = []
+BISHOP_TABLE: list[list[int]] = []
+# Held while generating, as the first use may come from several threads
+LOCK = threading.Lock()
+
+
+def generate() -> None:
+    """Fills the rook and bishop attack tables from the magic numbers. Each
+    table is filled at once, so it is either empty or complete."""
+    with LOCK:
+        for table, masks, magics, shifts, directions in (
+            (ROOK_TABLE, ROOK_MASKS, ROOK_MAGICS, ROOK_SHIFTS, tables.ORTHOGONALS),
+            (
+                BISHOP_TABLE,
+                BISHOP_MASKS,
+                BISHOP_MAGICS,
+                BISHOP_SHIFTS,
+                tables.DIAGONALS,
+            ),
+        ):
+            if table:
+                continue
+            filled = []
+            for sq in range(64):
+                attacks = [0] * (1 << (64 - shifts[sq]))
+                for occupied in subsets(masks[sq]):
+                    index = ((occupied * magics[sq]) & FULL) >> shifts[sq]
+                    attacks[index] = tables.slide(sq, occupied, directions)
+                filled.append(attacks)
+            table.extend(filled)
+
+
+def rook_attacks(sq: int, occupied: int) -> int:
+    """Returns the squares attacked by a rook.
+
+    Args:
+        sq (int): Square index of the rook.
+        occupied (int): Bitboard of occupied squares.
+
+    Returns:
+        int: Bitboard of attacked squares.
+    """
+    if not ROOK_TABLE:
+        generate()
+    return ROOK_TABLE[sq][
+        ((occupied & ROOK_MASKS[sq]) * ROOK_MAGICS[sq] & FULL) >> ROOK_SHIFTS[sq]
+    ]
+
+
+def bishop_attacks(sq: int, occupied: int) -> int:
+    """Returns the squares attacked by a bishop.
+
+    Args:
+        sq (int): Square index of the bishop.
+        occupied (int): Bitboard of occupied squares.
+
+    Returns:
+        int: Bitboard of attacked squares.
+    """
+    if not BISHOP_TABLE:
+        generate()
+    return BISHOP_TABLE[sq][
+        ((occupied & BISHOP_MASKS[sq]) * BISHOP_MAGICS[sq] & FULL) >> BISHOP_SHIFTS[sq]
+    ]
+
+
+def queen_attacks(sq: int, occupied: int) -> int:
+    """Returns the squares attacked by a queen.
+
+    Args:
+        sq (int): Square index of the queen.
+        occupied (int): Bitboard of occupied squares.
+
+    Returns:
+        int: Bitboard of attacked squares.
+    """
+    return rook_attacks(sq, occupied) | bishop_attacks(sq, occupied)
@@ -2,9 +2,13 @@
 # __name__ == main?
 from typing import Union
 
+from . import tables, zobrist
+
 
 class Position:
-    """Representation of a coordinate on a chess board.
+    """Representation of a coordinate on a chess board. Positions are
+    immutable, and the 64 Positions of the board are interned: use Position.of
+    or Position.at to get the shared instance rather than a new one.
 
     Variables:
         file (int): Column-like position on chess board. The a-file corresponds
@@ -13,6 +17,8 @@ class Position:
             to a value of 1, 2nd rank to a value of 2, and so on.
     """
 
+    __slots__ = ("file", "rank")
+
     def __init__(
         self, position: Union[tuple[int], tuple[str, int], str], mode: int = 0
     ) -> None:
@@ -32,27 +38,71 @@ class Position:
         """
         match mode:
             case 0:
-                self.file: int = position[1] + 1
-                self.rank: int = position[0] + 1
+                file, rank = position[1] + 1, position[0] + 1
             case 1:
-                self.file: int = position[0]
-                self.rank: int = position[1]
+                file, rank = position[0], position[1]
             case 2:
-                self.file: int = ord(position[0]) - ord("a")
-                self.rank: int = position[1]
+                file, rank = ord(position[0]) - ord("a"), position[1]
             case 3:
-                self.file: int = ord(position[0]) - ord("a") + 1
-                self.rank: int = ord(position[1]) - ord("1") + 1
+                file = ord(position[0]) - ord("a") + 1
+                rank = ord(position[1]) - ord("1") + 1
             case _:
                 raise ValueError("Invalid mode for position initialization.")
-        if self.file < 1 or self.file > 8 or self.rank < 1 or self.rank > 8:
+        if file < 1 or file > 8 or rank < 1 or rank > 8:
+            raise ValueError(
+                "Position (" + str(file) + ", " + str(rank) + ") out of bounds."
+            )
+        object.__setattr__(self, "file", file)
+        object.__setattr__(self, "rank", rank)
+
+    @staticmethod
+    def of(file: int, rank: int) -> "Position":
+        """Returns the interned Position of position coordinates.
+
+        Args:
+            file (int): File, from 1 (a-file) to 8 (h-file).
+            rank (int): Rank, from 1 to 8.
+
+        Raises:
+            ValueError: Position out of bounds on board.
+
+        Returns:
+            Position: Shared Position object.
+        """
+        if file < 1 or file > 8 or rank < 1 or rank > 8:
             raise ValueError(
-                "Position ("
-                + str(self.file)
-                + ", "
-                + str(self.rank)
-                + ") out of bounds."
+                "Position (" + str(file) + ", " + str(rank) + ") out of bounds."
             )
+        return POSITIONS[(rank - 1) * 8 + file - 1]
+
+    @staticmethod
+    def at(sq: int) -> "Position":
+        """Returns the interned Position of a square index.
+
+        Args:
+            sq (int): Square index, from 0 (a1) to 63 (h8).
+
+        Returns:
+            Position: Shared Position object.
+        """
+        return POSITIONS[sq]
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("Position objects are immutable.")
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, Position)
+            and self.file == other.file
+            and self.rank == other.rank
+        )
+
+    def __hash__(self) -> int:
+        return self.square()
+
+    def __reduce__(self) -> tuple:
+        # Unpickle and copy to the interned instance
+        return (Position.at, (self.square(),))
 
     def __str__(self) -> str:
         """Returns representation of Position as a string in algebraic notation.
@@ -70,15 +120,30 @@ class Position:
         """
         return (self.rank - 1, self.file - 1)
 
+    def square(self) -> int:
+        """Returns representation of Position as a square index, from 0 (a1) to
+        63 (h8), as used by the move tables.
+
+        Returns:
+            int: Square index representation of Position.
+        """
+        return (self.rank - 1) * 8 + self.file - 1
+
+
+# Interned Positions, by square index
+POSITIONS: tuple[Position] = tuple(Position((sq >> 3, sq & 7)) for sq in range(64))
+
 
 class Piece:
-    def __init__(
-        self, position: Position, colour: bool, active: bool = True, value: int = 0
-    ) -> None:
+    __slots__ = ("position", "colour", "active")
+    # Index of the kind of piece, from 0 (Pawn) to 5 (King)
+    kind: int = -1
+    value: int = 0
+
+    def __init__(self, position: Position, colour: bool, active: bool = True) -> None:
         self.position: Position = position
         self.colour: bool = colour
         self.active: bool = active
-        self.value: int = value
 
     def __str__(self) -> str:
         return NotImplementedError(
@@ -95,6 +160,10 @@ class Piece:
 
 
 class Pawn(Piece):
+    __slots__ = ()
+    kind: int = 0
+    value: int = 1
+
     def __init__(self, position: Position, colour: bool, active: bool = True) -> None:
         """Initializes Pawn object.
 
@@ -103,7 +172,7 @@ class Pawn(Piece):
             colour (bool): Colour of piece.
             active (bool, optional): If the piece is on the board. Defaults to True.
         """
-        super().__init__(position, colour, active, value=1)
+        super().__init__(position, colour, active)
 
     def __str__(self) -> str:
         """Returns representation of Pawn as a string.
@@ -126,12 +195,8 @@ class Pawn(Piece):
             self.colour and self.position.rank == 7
         ):
             moves.append(
-                Position(
-                    (
-                        self.position.file,
-                        self.position.rank + (-2 if self.colour else 2),
-                    ),
-                    mode=1,
+                Position.of(
+                    self.position.file, self.position.rank + (-2 if self.colour else 2)
                 )
             )
 
@@ -140,14 +205,14 @@ class Pawn(Piece):
         )
         for file in files:
             moves.append(
-                Position(
-                    (file, self.position.rank + (-1 if self.colour else 1)), mode=1
-                )
+                Position.of(file, self.position.rank + (-1 if self.colour else 1))
             )
         return moves
 
 
 class Knight(Piece):
+    __slots__ = ()
+    kind: int = 1
     value: int = 3
 
     def __init__(self, position: Position, colour: bool, active: bool = True) -> None:
@@ -174,29 +239,12 @@ class Knight(Piece):
         Returns:
             list[Position]: Every advancing position possible for this knight, this move.
         """
-        moves: list[Position] = []
-
-        wide = [
-            [self.position.file - 2, self.position.file + 2],
-            [self.position.rank - 1, self.position.rank + 1],
-        ]
-        tall = [
-            [self.position.file - 1, self.position.file + 1],
-            [self.position.rank - 2, self.position.rank + 2],
-        ]
-
-        for file in wide[0]:
-            for rank in wide[1]:
-                if file >= 1 and file <= 8 and rank >= 1 and rank <= 8:
-                    moves.append(Position((file, rank), mode=1))
-        for file in tall[0]:
-            for rank in tall[1]:
-                if file >= 1 and file <= 8 and rank >= 1 and rank <= 8:
-                    moves.append(Position((file, rank), mode=1))
-        return moves
+        return [POSITIONS[sq] for sq in tables.KNIGHT_TARGETS[self.position.square()]]
 
 
 class Bishop(Piece):
+    __slots__ = ()
+    kind: int = 2
     value: int = 3
 
     def __init__(self, position: Position, colour: bool, active: bool = True) -> None:
@@ -223,22 +271,17 @@ class Bishop(Piece):
         Returns:
             list[Position]: Every advancing position possible for this bishop, this move.
         """
-        moves: list[Position] = []
-
-        for file in range(1 - self.position.file, 8 - self.position.file + 1):
-            for rank in range(1 - self.position.rank, 8 - self.position.rank + 1):
-                if abs(rank) == abs(file) and rank != 0:
-                    moves.append(
-                        Position(
-                            (self.position.file + file, self.position.rank + rank),
-                            mode=1,
-                        )
-                    )
-
-        return moves
+        sq = self.position.square()
+        return [
+            POSITIONS[target]
+            for direction in tables.DIAGONALS
+            for target in tables.RAYS[direction][sq]
+        ]
 
 
 class Rook(Piece):
+    __slots__ = ("moved",)
+    kind: int = 3
     value: int = 5
 
     def __init__(
@@ -270,18 +313,17 @@ class Rook(Piece):
         Returns:
             list[Position]: Every advancing position possible for this rook, this move.
         """
-        moves: list[Position] = []
-
-        for n in range(1, 8 + 1):
-            if n != self.position.file:
-                moves.append(Position((n, self.position.rank), mode=1))
-            if n != self.position.rank:
-                moves.append(Position((self.position.file, n), mode=1))
-
-        return moves
+        sq = self.position.square()
+        return [
+            POSITIONS[target]
+            for direction in tables.ORTHOGONALS
+            for target in tables.RAYS[direction][sq]
+        ]
 
 
 class Queen(Piece):
+    __slots__ = ()
+    kind: int = 4
     value: int = 9
 
     def __init__(self, position: Position, colour: bool, active: bool = True) -> None:
@@ -308,28 +350,17 @@ class Queen(Piece):
         Returns:
             list[Position]: Every advancing position possible for this queen, this move.
         """
-        moves: list[Position] = []
-
-        for file in range(1 - self.position.file, 8 - self.position.file + 1):
-            for rank in range(1 - self.position.rank, 8 - self.position.rank + 1):
-                if abs(rank) == abs(file) and rank != 0:
-                    moves.append(
-                        Position(
-                            (self.position.file + file, self.position.rank + rank),
-                            mode=1,
-                        )
-                    )
-
-        for n in range(1, 8 + 1):
-            if n != self.position.file:
-                moves.append(Position((n, self.position.rank), mode=1))
-            if n != self.position.rank:
-                moves.append(Position((self.position.file, n), mode=1))
-
-        return moves
+        sq = self.position.square()
+        return [
+            POSITIONS[target]
+            for direction in tables.ORTHOGONALS + tables.DIAGONALS
+            for target in tables.RAYS[direction][sq]
+        ]
 
 
 class King(Piece):
+    __slots__ = ("moved",)
+    kind: int = 5
     value: int = 10
 
     def __init__(
@@ -361,25 +392,31 @@ class King(Piece):
         Returns:
             list[Position]: Every advancing position possible for this king, this move.
         """
-        moves: list[Position] = []
-
-        for file in range(
-            max(1, self.position.file - 1), min(8, self.position.file + 1) + 1
-        ):
-            for rank in range(
-                max(1, self.position.rank - 1), min(8, self.position.rank + 1) + 1
-            ):
-                if file != self.position.file or rank != self.position.rank:
-                    moves.append(Position((file, rank), mode=1))
+        moves: list[Position] = [
+            POSITIONS[sq] for sq in tables.KING_TARGETS[self.position.square()]
+        ]
 
         # If king unmoved, append castle move on either side
         if not self.moved:
-            moves.append(Position((self.position.file - 2, self.position.rank), mode=1))
-            moves.append(Position((self.position.file + 2, self.position.rank), mode=1))
+            moves.append(Position.of(self.position.file - 2, self.position.rank))
+            moves.append(Position.of(self.position.file + 2, self.position.rank))
 
         return moves
 
 
+# Pieces a pawn may promote to, by the letter used in HHN notation
+PROMOTIONS: dict[str, type] = {"n": Knight, "b": Bishop, "r": Rook, "q": Queen}
+# Piece classes by Piece.kind
+KINDS: tuple[type] = (Pawn, Knight, Bishop, Rook, Queen, King)
+
+# Moves recorded in a Sequence hold the 16 bits of Event.pack (MOVE), the
+# Piece.kind of the captured piece plus one from bit CAPTURED (0 if none), and
+# flags for en passant captures, castles and double pawn advances
+MOVE = 0xFFFF
+CAPTURED = 16
+EN_PASSANT, CASTLE, DOUBLE = 1 << 19, 1 << 20, 1 << 21
+
+
 class Square:
     """Representation of a square on a chess board.
 
@@ -388,6 +425,8 @@ class Square:
         piece (Piece): Piece object on the Square, if any. None if none.
     """
 
+    __slots__ = ("position", "piece")
+
     def __init__(self, position: Position, piece: Piece = None) -> None:
         """Initializes a Square object.
 
@@ -414,12 +453,15 @@ class Square:
 
 
 class Event:
+    __slots__ = ("depart", "arrive", "capture", "disam", "mode", "promotion")
+
     def __init__(
         self,
         depart: Square,
         arrive: Square,
         mode: Union[str, int] = 4,
         disam: int = 0,
+        promotion: type = None,
     ) -> None:
         # TODO implement other notations
         # Assume legal moves by the power of Referee
@@ -430,6 +472,22 @@ class Event:
         if self.disam not in (0, 1, 2, 3):
             raise ValueError("Invalid disambiguation mode " + str(self.disam) + ".")
         self.mode: str = mode
+        # Piece class a pawn promotes to, None for the default (Queen)
+        self.promotion: type = promotion
+
+    def pack(self) -> int:
+        """Returns the move of this Event packed into 16 bits: departure square
+        index (bits 0-5), arrival square index (bits 6-11) and Piece.kind of
+        the promotion, if any (bits 12-14).
+
+        Returns:
+            int: Packed move.
+        """
+        return (
+            self.depart.position.square()
+            | self.arrive.position.square() << 6
+            | (0 if self.promotion is None else self.promotion.kind << 12)
+        )
 
     def __str__(self):
         if (
@@ -477,10 +535,20 @@ class Event:
             or isinstance(self.mode, int)
             and self.mode == 4
         ):
-            return str(self.depart.position) + " " + str(self.arrive.position)
+            string = str(self.depart.position) + " " + str(self.arrive.position)
+            if self.promotion is not None:
+                string += str(self.promotion(self.arrive.position, False))
+            return string
 
 
 class Sequence:
+    """Moves of a game, packed into integers (see MOVE), with its match data.
+
+    Variables:
+        sequence (list[int]): Moves, in the order played.
+        moves (int): Number of moves.
+    """
+
     def __init__(self, mode: Union[str, int] = 4, sequence: list[str] = None) -> None:
         if sequence is not None:
             self.sequence = []
@@ -519,41 +587,86 @@ class Sequence:
                 or isinstance(mode, int)
                 and mode == 4
             ):
-                self.sequence = sequence
+                self.sequence = [Sequence.pack(text) for text in sequence]
                 self.moves = len(sequence)
             else:
                 raise ValueError("Invalid game notation standard.")
             self.mode: str = mode
         else:
-            self.sequence: list[str] = []
+            self.sequence: list[int] = []
             self.moves: int = 0
 
-            # PGN match data
-            self.event: str = ""
-            self.site: str = ""
-            self.date: list[int] = []
-            self.date_event: list[int] = []
-            self.round: int = 0
-            self.result: list[int] = []
-            self.white: str = ""
-            self.black: str = ""
-            self.eco: str = ""
-            self.elo_white: int = 0
-            self.elo_black: int = 0
-            self.count_ply: int = 0
+        # PGN match data, and every tag pair by name
+        self.event: str = ""
+        self.site: str = ""
+        self.date: list[int] = []
+        self.date_event: list[int] = []
+        self.round: int = 0
+        self.result: list[int] = []
+        self.white: str = ""
+        self.black: str = ""
+        self.eco: str = ""
+        self.elo_white: int = 0
+        self.elo_black: int = 0
+        self.count_ply: int = 0
+        self.tags: dict[str, str] = {}
 
     def __str__(self):
         string = ""
         for i in range(len(self.sequence)):
             if i % 3 == 0 and i > 0:
                 string += "\n"
-            string += str(i + 1) + ". " + str(self.sequence[i]) + "  "
+            string += str(i + 1) + ". " + Sequence.unpack(self.sequence[i]) + "  "
         return string
 
-    def add_event(self, event: Event):
-        self.sequence.append(str(event))
+    @staticmethod
+    def pack(text: str) -> int:
+        """Returns a move in HHN packed into 16 bits, as by Event.pack.
+
+        Args:
+            text (str): Move in HHN, e.g. "e2 e4" or "e7 e8n".
+
+        Returns:
+            int: Packed move.
+        """
+        depart = (ord(text[1]) - ord("1")) * 8 + ord(text[0]) - ord("a")
+        arrive = (ord(text[4]) - ord("1")) * 8 + ord(text[3]) - ord("a")
+        promotion = PROMOTIONS.get(text[5:])
+        return depart | arrive << 6 | (0 if promotion is None else promotion.kind << 12)
+
+    @staticmethod
+    def unpack(move: int) -> str:
+        """Returns a packed move in HHN.
+
+        Args:
+            move (int): Packed move. Bits beyond MOVE are ignored.
+
+        Returns:
+            str: Move in HHN.
+        """
+        string = str(Position.at(move & 63)) + " " + str(Position.at(move >> 6 & 63))
+        if move >> 12 & 7:
+            string += "pnbrqk"[move >> 12 & 7]
+        return string
+
+    def add_event(self, move: int) -> None:
+        """Appends a move.
+
+        Args:
+            move (int): Packed move, with its capture and flags.
+        """
+        self.sequence.append(move)
         self.moves += 1
 
+    def remove_event(self) -> int:
+        """Removes the last move.
+
+        Returns:
+            int: Packed move removed.
+        """
+        self.moves -= 1
+        return self.sequence.pop()
+
 
 class Board:
     """Representation of a chess board.
@@ -570,11 +683,26 @@ class Board:
         colour (bool): Colour corresponding to the player who moves next.
         notate (bool): Toggles algebraic notation display.
         sequence (Sequence): Sequence representing move history.
+        history (list[tuple]): Stack of undo records, one per move made with
+            make_move, consumed by unmake_move.
+        key (int): 64-bit Zobrist key of the position, covering piece
+            placement, side to move, castling rights and en passant file.
+        halfmove (int): Number of moves since the last capture or pawn move.
+        fullmove (int): Number of the current move, starting at 1 and
+            incremented after each move by black.
+        origin (str): FEN of the position the board was set up from, None for
+            the starting position.
+        passant (Square): En passant Square of the position the board was set
+            up from, None if none.
     """
 
+    # FEN of the starting position
+    START = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
     def __init__(self, notate: bool = False) -> None:
-        # Initialize empty Sequence
+        # Initialize empty Sequence and undo stack
         self.sequence: Sequence = Sequence()
+        self.history: list[tuple] = []
 
         # Initialize empty list of active pieces
         self.active: list[list[Piece]] = [[], []]
@@ -588,9 +716,16 @@ class Board:
         # Default no notation
         self.notate: bool = notate
 
+        # Clocks and set up position of the starting position
+        self.halfmove: int = 0
+        self.fullmove: int = 1
+        self.origin: str = None
+        self.passant: Square = None
+
         # Initialize empty board
         self.board: list[list[Square]] = [
-            [Square(Position((file, rank))) for rank in range(8)] for file in range(8)
+            [Square(Position.of(file + 1, rank + 1)) for file in range(8)]
+            for rank in range(8)
         ]
 
         # Initialize pieces
@@ -598,23 +733,441 @@ class Board:
             for file in range(8):
                 rank = 6 if colour else 1
                 i_c = 1 if colour else 0
-                self.active[i_c].append(Pawn(Position((rank, file)), colour))
+                self.active[i_c].append(Pawn(Position.of(file + 1, rank + 1), colour))
                 self.board[rank][file].piece = self.active[i_c][-1]
             rank = 7 if colour else 0
             for file in (0, 7):
-                self.active[i_c].append(Rook(Position((rank, file)), colour))
+                self.active[i_c].append(Rook(Position.of(file + 1, rank + 1), colour))
                 self.board[rank][file].piece = self.active[i_c][-1]
             for file in (1, 6):
-                self.active[i_c].append(Knight(Position((rank, file)), colour))
+                self.active[i_c].append(Knight(Position.of(file + 1, rank + 1), colour))
                 self.board[rank][file].piece = self.active[i_c][-1]
             for file in (2, 5):
-                self.active[i_c].append(Bishop(Position((rank, file)), colour))
+                self.active[i_c].append(Bishop(Position.of(file + 1, rank + 1), colour))
                 self.board[rank][file].piece = self.active[i_c][-1]
-            self.active[i_c].append(Queen(Position((rank, 3)), colour))
+            self.active[i_c].append(Queen(Position.of(4, rank + 1), colour))
             self.board[rank][3].piece = self.active[i_c][-1]
-            self.active[i_c].append(King(Position((rank, 4)), colour))
+            self.active[i_c].append(King(Position.of(5, rank + 1), colour))
             self.board[rank][4].piece = self.active[i_c][-1]
 
+        self.key: int = zobrist.compute(self)
+
+    def make_move(self, event: Event) -> None:
+        """Plays an Event on the board, pushing an undo record so that the move
+        can be taken back with unmake_move. Handles captures (including en
+        passant), castling and promotion.
+
+        Args:
+            event (Event): Event to play. Assumed legal.
+        """
+        depart, arrive = event.depart, event.arrive
+        piece = depart.piece
+        i_c = 0 if piece.colour else 1
+        key = self.key
+
+        # Find the captured piece, which is behind the arrival square en passant
+        target = arrive
+        if (
+            isinstance(piece, Pawn)
+            and arrive.piece is None
+            and depart.position.file != arrive.position.file
+        ):
+            target = self.board[depart.position.rank - 1][arrive.position.file - 1]
+        captured = target.piece
+
+        # Remove side to move, castling rights (if they may change) and en
+        # passant file from the key
+        self.key ^= zobrist.COLOUR
+        passant = self.en_passant()
+        if passant is not None:
+            self.key ^= zobrist.EN_PASSANT[passant.position.file - 1]
+        moved = piece.moved if isinstance(piece, (King, Rook)) else None
+        rights = moved is not None or isinstance(captured, Rook)
+        if rights:
+            self.key ^= zobrist.CASTLING[self.castling()]
+
+        index = -1
+        if captured is not None:
+            index = self.active[i_c].index(captured)
+            self.captured[i_c].append(self.active[i_c].pop(index))
+            target.piece = None
+            self.key ^= zobrist.piece(captured, target.position.square())
+
+        # Move piece from depart to arrive
+        arrive.piece = piece
+        piece.position = arrive.position
+        depart.piece = None
+        if moved is not None:
+            piece.moved = True
+        self.key ^= zobrist.piece(piece, depart.position.square()) ^ zobrist.piece(
+            piece, arrive.position.square()
+        )
+
+        # Move the rook if castling, replace the pawn if promoting
+        castle, promote = None, None
+        if (
+            isinstance(piece, King)
+            and abs(arrive.position.file - depart.position.file) == 2
+        ):
+            castle = self.castle(event)
+        elif isinstance(piece, Pawn) and arrive.position.rank in (1, 8):
+            promote = self.promote(event)
+
+        # Add the packed move to the sequence and change active player
+        move = depart.position.square() | arrive.position.square() << 6
+        if captured is not None:
+            move |= (captured.kind + 1) << CAPTURED
+            if target is not arrive:
+                move |= EN_PASSANT
+        if castle is not None:
+            move |= CASTLE
+        elif promote is not None:
+            move |= (event.promotion or Queen).kind << 12
+        elif (
+            isinstance(piece, Pawn)
+            and abs(arrive.position.rank - depart.position.rank) == 2
+        ):
+            move |= DOUBLE
+        self.sequence.add_event(move)
+        self.history.append(
+            (
+                event,
+                piece,
+                captured,
+                target,
+                index,
+                moved,
+                castle,
+                promote,
+                self.colour,
+                key,
+                self.halfmove,
+            )
+        )
+        self.colour = not self.colour
+
+        # Advance the clocks
+        if captured is not None or isinstance(piece, Pawn):
+            self.halfmove = 0
+        else:
+            self.halfmove += 1
+        if not self.colour:
+            self.fullmove += 1
+
+        # Add new castling rights and en passant file to the key
+        if rights:
+            self.key ^= zobrist.CASTLING[self.castling()]
+        passant = self.en_passant()
+        if passant is not None:
+            self.key ^= zobrist.EN_PASSANT[passant.position.file - 1]
+
+    def unmake_move(self) -> Event:
+        """Takes back the last move played with make_move.
+
+        Returns:
+            Event: The Event taken back.
+        """
+        (
+            event,
+            piece,
+            captured,
+            target,
+            index,
+            moved,
+            castle,
+            promote,
+            colour,
+            key,
+            halfmove,
+        ) = self.history.pop()
+        i_c = 0 if piece.colour else 1
+
+        # Put the pawn back in place of the promoted piece
+        if promote is not None:
+            self.active[1 if piece.colour else 0][promote] = piece
+
+        # Put the rook back in its corner
+        if castle is not None:
+            rook, origin, dest, rook_moved = castle
+            dest.piece = None
+            origin.piece = rook
+            rook.position = origin.position
+            rook.moved = rook_moved
+
+        # Move piece from arrive back to depart
+        event.arrive.piece = None
+        event.depart.piece = piece
+        piece.position = event.depart.position
+        if moved is not None:
+            piece.moved = moved
+
+        # Restore captured piece
+        if captured is not None:
+            target.piece = captured
+            self.active[i_c].insert(index, self.captured[i_c].pop())
+
+        self.sequence.remove_event()
+        if colour:
+            self.fullmove -= 1
+        self.colour = colour
+        self.key = key
+        self.halfmove = halfmove
+        return event
+
+    def castle(self, event: Event) -> tuple:
+        """Moves the rook of a castling King's move, once the King has moved.
+
+        Args:
+            event (Event): Event of the King's move.
+
+        Returns:
+            tuple: Undo record (rook, corner Square, arrival Square, Rook.moved).
+        """
+        queenside = event.arrive.position.file < event.depart.position.file
+        row = self.board[event.depart.position.rank - 1]
+        origin, dest = row[0 if queenside else 7], row[3 if queenside else 5]
+        rook = origin.piece
+        dest.piece = rook
+        rook.position = dest.position
+        origin.piece = None
+        moved, rook.moved = rook.moved, True
+        self.key ^= zobrist.piece(rook, origin.position.square()) ^ zobrist.piece(
+            rook, dest.position.square()
+        )
+        return (rook, origin, dest, moved)
+
+    def promote(self, event: Event) -> int:
+        """Replaces a pawn that has reached the last rank, once it has moved.
+
+        Args:
+            event (Event): Event of the pawn's move.
+
+        Returns:
+            int: Undo record, the index of the pawn in its active list.
+        """
+        pawn = event.arrive.piece
+        active = self.active[1 if pawn.colour else 0]
+        index = active.index(pawn)
+        active[index] = (event.promotion or Queen)(event.arrive.position, pawn.colour)
+        event.arrive.piece = active[index]
+        sq = event.arrive.position.square()
+        self.key ^= zobrist.piece(pawn, sq) ^ zobrist.piece(active[index], sq)
+        return index
+
+    def event(self, move: int) -> Event:
+        """Returns the Event of a move packed with Event.pack, on this board.
+
+        Args:
+            move (int): Packed move. Bits beyond MOVE are ignored.
+
+        Returns:
+            Event: Event of the move.
+        """
+        depart, arrive, kind = move & 63, (move >> 6) & 63, (move >> 12) & 7
+        return Event(
+            self.board[depart >> 3][depart & 7],
+            self.board[arrive >> 3][arrive & 7],
+            promotion=KINDS[kind] if kind else None,
+        )
+
+    def castling(self) -> int:
+        """Returns the castling rights of both players, as given by King.moved
+        and Rook.moved of the pieces on their starting squares.
+
+        Returns:
+            int: Castling rights, as bits. 1 = white kingside, 2 = white
+                queenside, 4 = black kingside, 8 = black queenside.
+        """
+        rights = 0
+        for colour in (False, True):
+            row = self.board[7 if colour else 0]
+            king = row[4].piece
+            if not isinstance(king, King) or king.colour != colour or king.moved:
+                continue
+            for corner, right in ((7, 1), (0, 2)):
+                rook = row[corner].piece
+                if isinstance(rook, Rook) and rook.colour == colour and not rook.moved:
+                    rights |= right << (2 if colour else 0)
+        return rights
+
+    def repetitions(self) -> int:
+        """Returns the number of times the position occurred before. Only the
+        positions since the last capture or pawn move can repeat it, and only
+        every other one has the same player to move, so only those are
+        compared, by Zobrist key.
+
+        Returns:
+            int: Number of earlier occurrences.
+        """
+        history, key, count = self.history, self.key, 0
+        # The position two plies back differs by the moves in between
+        for i in range(4, min(self.halfmove, len(history)) + 1, 2):
+            if history[-i][9] == key:
+                count += 1
+        return count
+
+    def insufficient_material(self) -> bool:
+        """Returns True if neither player can ever mate: Kings with at most
+        one Knight or Bishop between them, or Kings and any number of Bishops
+        all on squares of the same colour.
+
+        Returns:
+            bool: Whether or not the position is a dead draw.
+        """
+        knights, colours = 0, set()
+        for piece in self.active[0] + self.active[1]:
+            if isinstance(piece, Knight):
+                knights += 1
+            elif isinstance(piece, Bishop):
+                colours.add(sum(piece.position.index()) % 2)
+            elif not isinstance(piece, King):
+                return False
+        # A Knight beside any other minor piece, or Bishops on both colours,
+        # can help build a mate
+        if knights == 1:
+            return len(colours) == 0
+        return knights == 0 and len(colours) <= 1
+
+    def en_passant(self) -> Square:
+        """Returns the Square passed over by a pawn advancing two ranks on the
+        last move, if a Pawn of the player who moves next stands beside it and
+        may capture onto it en passant. Otherwise the position is the same as
+        if the pawn had advanced one rank at a time, for the Zobrist key and
+        repetitions too.
+
+        Returns:
+            Square: En passant Square, None if none.
+        """
+        if len(self.history) == 0:
+            if self.passant is None:
+                return None
+            passed = self.passant.position.square()
+        else:
+            move = self.sequence.sequence[-1]
+            if not move & DOUBLE:
+                return None
+            passed = ((move & 63) + (move >> 6 & 63)) // 2
+        # The pawn that advanced stands one rank past the square
+        rank, file = (passed >> 3) + (1 if self.colour else -1), passed & 7
+        for beside in (file - 1, file + 1):
+            if 0 <= beside < 8:
+                piece = self.board[rank][beside].piece
+                if isinstance(piece, Pawn) and piece.colour == self.colour:
+                    return self.board[passed >> 3][file]
+        return None
+
+    @classmethod
+    def from_fen(cls, fen: str, notate: bool = False) -> "Board":
+        """Returns a Board set up from a position in Forsyth-Edwards Notation.
+
+        Args:
+            fen (str): Position in FEN, e.g. Board.START. The clocks may be
+                left out.
+            notate (bool, optional): Toggles algebraic notation display.
+                Defaults to False.
+
+        Raises:
+            ValueError: Invalid FEN.
+
+        Returns:
+            Board: Board in play, with no moves played.
+        """
+        fields = fen.split()
+        if len(fields) == 4:
+            fields += ["0", "1"]
+        if len(fields) != 6:
+            raise ValueError("Invalid FEN " + fen + ".")
+        placement, colour, castling, passant, halfmove, fullmove = fields
+        rows = placement.split("/")
+        if len(rows) != 8 or colour not in ("w", "b"):
+            raise ValueError("Invalid FEN " + fen + ".")
+
+        # Empty the starting position, then place the pieces
+        board = cls(notate)
+        for row in board.board:
+            for square in row:
+                square.piece = None
+        board.active = [[], []]
+        letters = {str(kind(None, True)): kind for kind in KINDS}
+        for i, row in enumerate(rows):
+            rank, file = 7 - i, 0
+            for letter in row:
+                if letter.isdigit():
+                    file += int(letter)
+                    continue
+                if letter.upper() not in letters or file > 7:
+                    raise ValueError("Invalid FEN " + fen + ".")
+                # Upper case letters are white pieces
+                piece = letters[letter.upper()](
+                    Position.of(file + 1, rank + 1), letter.islower()
+                )
+                board.active[1 if piece.colour else 0].append(piece)
+                board.board[rank][file].piece = piece
+                file += 1
+            if file != 8:
+                raise ValueError("Invalid FEN " + fen + ".")
+
+        # Pieces have moved unless they keep a castling right
+        for side, letter, row in ((False, "K", 0), (True, "k", 7)):
+            for piece in board.active[1 if side else 0]:
+                if isinstance(piece, (King, Rook)):
+                    piece.moved = True
+            king = board.board[row][4].piece
+            for corner, right in ((7, letter), (0, "Q" if letter == "K" else "q")):
+                rook = board.board[row][corner].piece
+                if (
+                    right in castling
+                    and isinstance(king, King)
+                    and isinstance(rook, Rook)
+                    and king.colour == rook.colour == side
+                ):
+                    king.moved = rook.moved = False
+
+        board.colour = colour == "b"
+        if passant != "-":
+            i_p = Position(passant, mode=3).index()
+            board.passant = board.board[i_p[0]][i_p[1]]
+        board.halfmove, board.fullmove = int(halfmove), int(fullmove)
+        board.origin = fen
+        board.key = zobrist.compute(board)
+        return board
+
+    def to_fen(self) -> str:
+        """Returns the position in Forsyth-Edwards Notation.
+
+        Returns:
+            str: Position in FEN.
+        """
+        rows = []
+        for row in reversed(self.board):
+            string, empty = "", 0
+            for square in row:
+                if square.piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    string, empty = string + str(empty), 0
+                # Upper case letters are white pieces
+                letter = str(square.piece)
+                string += letter.lower() if square.piece.colour else letter.upper()
+            rows.append(string + (str(empty) if empty else ""))
+
+        rights = self.castling()
+        castling = "".join(
+            letter for bit, letter in enumerate("KQkq") if rights >> bit & 1
+        )
+        passant = self.en_passant()
+        return " ".join(
+            (
+                "/".join(rows),
+                "b" if self.colour else "w",
+                castling or "-",
+                "-" if passant is None else str(passant.position),
+                str(self.halfmove),
+                str(self.fullmove),
+            )
+        )
+
     def __str__(self) -> str:
         string = (
             "============================\n"
@@ -0,0 +1,352 @@
+import re
+from typing import Iterator, TextIO, Union
+
+from . import bitboard, game, objects
+
+# Portable Game Notation: tag pairs, then movetext in Standard Algebraic
+# Notation (SAN), e.g. "Nbd7", "exd6", "O-O-O" or "e8=Q+".
+
+TAG = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# Comments, variations, numeric annotation glyphs, move numbers, results and
+# moves, in order of precedence
+TOKEN = re.compile(
+    r"\{[^}]*\}|;[^\n]*|\(|\)|\$\d+|\d+\.+|1-0|0-1|1/2-1/2|\*|[^\s(){};$]+"
+)
+SAN = re.compile(r"([NBRQK])?([a-h])?([1-8])?(x)?([a-h][1-8])(?:=?([NBRQ]))?[+#]?[!?]*")
+CASTLE = re.compile(r"([O0]-[O0](-[O0])?)[+#]?[!?]*")
+RESULTS = {"1-0": [1, 0], "0-1": [0, 1], "1/2-1/2": [0.5, 0.5], "*": []}
+
+# SAN letter of each kind of piece, see bitboard.PAWN, KNIGHT, ..., KING
+LETTERS = "PNBRQK"
+
+
+def square(text: str) -> int:
+    """Returns the square index of a square in algebraic notation.
+
+    Args:
+        text (str): Square, e.g. "e4".
+
+    Returns:
+        int: Square index, from 0 (a1) to 63 (h8).
+    """
+    return (ord(text[1]) - ord("1")) * 8 + ord(text[0]) - ord("a")
+
+
+def parse(board: bitboard.BitBoard, san: str) -> objects.Event:
+    """Resolves a move in SAN to an Event on a board, looking up the pieces
+    that attack the arrival square rather than generating every move.
+
+    Args:
+        board (bitboard.BitBoard): Board in play.
+        san (str): Move in SAN, e.g. "Nf3".
+
+    Raises:
+        ValueError: Invalid or illegal move.
+
+    Returns:
+        objects.Event: Event of the move.
+    """
+    colour = board.colour
+    base = 56 if colour else 0
+    castle = CASTLE.fullmatch(san)
+    if castle:
+        arrive = base + (2 if castle.group(2) else 6)
+        if not board.legal_targets(base + 4) >> arrive & 1:
+            raise ValueError("Illegal move " + san + ".")
+        return objects.Event(board.squares[base + 4], board.squares[arrive])
+
+    match = SAN.fullmatch(san)
+    if match is None:
+        raise ValueError("Invalid move " + san + ".")
+    letter, file, rank, capture, arrive, promotion = match.groups()
+    arrive = square(arrive)
+
+    # Candidate pieces are those of the right kind that attack the arrival
+    # square, seen from the arrival square
+    if letter is None:
+        pawns = board.bitboard(bitboard.PAWN, colour)
+        if capture:
+            candidates = bitboard.pawn_attacks(arrive, not colour) & pawns
+        else:
+            step = -8 if colour else 8
+            behind = arrive - step
+            candidates = 1 << behind & pawns
+            if not candidates and not board.occupied >> behind & 1:
+                candidates = 1 << (behind - step) & pawns
+    else:
+        kind = LETTERS.index(letter)
+        occupied = board.occupied
+        match kind:
+            case bitboard.KNIGHT:
+                sight = bitboard.knight_attacks(arrive)
+            case bitboard.BISHOP:
+                sight = bitboard.bishop_attacks(arrive, occupied)
+            case bitboard.ROOK:
+                sight = bitboard.rook_attacks(arrive, occupied)
+            case bitboard.QUEEN:
+                sight = bitboard.queen_attacks(arrive, occupied)
+            case bitboard.KING:
+                sight = bitboard.king_attacks(arrive)
+        candidates = sight & board.bitboard(kind, colour)
+    if file is not None:
+        candidates &= bitboard.FILE_A << (ord(file) - ord("a"))
+    if rank is not None:
+        candidates &= bitboard.RANK_1 << 8 * (ord(rank) - ord("1"))
+
+    # Only legal moves count, so SAN leaves out pieces that cannot move for
+    # being pinned
+    departs = [
+        sq
+        for sq in bitboard.squares(candidates)
+        if board.legal_targets(sq) >> arrive & 1
+    ]
+    if len(departs) != 1:
+        raise ValueError(
+            ("Illegal" if len(departs) == 0 else "Ambiguous") + " move " + san + "."
+        )
+    # Pawns promote on the last rank, and only there
+    if (letter is None and arrive >> 3 in (0, 7)) != (promotion is not None):
+        raise ValueError("Invalid promotion " + san + ".")
+    return objects.Event(
+        board.squares[departs[0]],
+        board.squares[arrive],
+        promotion=bitboard.TYPES[LETTERS.index(promotion)] if promotion else None,
+    )
+
+
+def san(board: bitboard.BitBoard, event: objects.Event) -> str:
+    """Returns a move in SAN, including the file and/or rank of departure if
+    another piece of the same kind could also move to the arrival square, and
+    '+' or '#' if it checks or mates.
+
+    Args:
+        board (bitboard.BitBoard): Board in play, before the move.
+        event (objects.Event): Legal move.
+
+    Returns:
+        str: Move in SAN, e.g. "Nbd7".
+    """
+    piece = event.depart.piece
+    depart, arrive = event.depart.position.square(), event.arrive.position.square()
+    string = str(event.arrive.position)
+
+    if isinstance(piece, objects.King) and abs(arrive - depart) == 2:
+        string = "O-O" if arrive > depart else "O-O-O"
+    elif isinstance(piece, objects.Pawn):
+        if depart & 7 != arrive & 7:
+            string = str(event.depart.position)[0] + "x" + string
+        if arrive >> 3 in (0, 7):
+            string += "=" + LETTERS[(event.promotion or objects.Queen).kind]
+    else:
+        if event.arrive.piece is not None:
+            string = "x" + string
+        others = [
+            sq
+            for sq in bitboard.squares(board.bitboard(piece.kind, piece.colour))
+            if sq != depart and board.legal_targets(sq) >> arrive & 1
+        ]
+        if others:
+            if all(sq & 7 != depart & 7 for sq in others):
+                string = str(event.depart.position)[0] + string
+            elif all(sq >> 3 != depart >> 3 for sq in others):
+                string = str(event.depart.position)[1] + string
+            else:
+                string = str(event.depart.position) + string
+        string = LETTERS[piece.kind] + string
+
+    board.make_move(event)
+    if game.Referee.in_check(board):
+        string += "+" if not game.Referee.check_mate(board) else "#"
+    board.unmake_move()
+    return string
+
+
+def tags(sequence: objects.Sequence, pairs: dict[str, str]) -> None:
+    """Fills the match data of a Sequence from PGN tag pairs.
+
+    Args:
+        sequence (objects.Sequence): Sequence of the game.
+        pairs (dict[str, str]): Tag pairs, by name.
+    """
+
+    def number(text: str) -> int:
+        digits = re.match(r"\d+", text or "")
+        return int(digits.group()) if digits else 0
+
+    def date(text: str) -> list[int]:
+        return [number(part) for part in text.split(".")[:3]] if text else []
+
+    sequence.tags = pairs
+    sequence.event = pairs.get("Event", "")
+    sequence.site = pairs.get("Site", "")
+    sequence.date = date(pairs.get("Date"))
+    sequence.date_event = date(pairs.get("EventDate"))
+    sequence.round = number(pairs.get("Round"))
+    sequence.result = RESULTS.get(pairs.get("Result"), [])
+    sequence.white = pairs.get("White", "")
+    sequence.black = pairs.get("Black", "")
+    sequence.eco = pairs.get("ECO", "")
+    sequence.elo_white = number(pairs.get("WhiteElo"))
+    sequence.elo_black = number(pairs.get("BlackElo"))
+    sequence.count_ply = number(pairs.get("PlyCount"))
+
+
+def moves(movetext: str) -> Iterator[str]:
+    """Yields the moves of the main line of a game, leaving out comments,
+    variations, annotations, move numbers and the result.
+
+    Args:
+        movetext (str): Movetext.
+
+    Yields:
+        str: Move in SAN.
+    """
+    depth = 0
+    for token in TOKEN.findall(movetext):
+        first = token[0]
+        if first == "(":
+            depth += 1
+        elif first == ")":
+            depth -= 1
+        elif not (depth or first in "{;$" or token in RESULTS or token[-1] == "."):
+            yield token
+
+
+def replay(pairs: dict[str, str], movetext: str) -> bitboard.BitBoard:
+    """Plays a game from its tag pairs and movetext.
+
+    Args:
+        pairs (dict[str, str]): Tag pairs, by name.
+        movetext (str): Movetext, with comments, variations and annotations.
+
+    Raises:
+        ValueError: Invalid or illegal move, and its ply.
+
+    Returns:
+        bitboard.BitBoard: Board at the end of the game.
+    """
+    if "FEN" in pairs:
+        board = bitboard.BitBoard.from_fen(pairs["FEN"])
+    else:
+        board = bitboard.BitBoard()
+    tags(board.sequence, pairs)
+
+    for san in moves(movetext):
+        try:
+            event = parse(board, san)
+        except ValueError as error:
+            ply = str(len(board.history) + 1)
+            raise ValueError(str(error)[:-1] + " at ply " + ply + ".") from None
+        board.make_move(event)
+    if board.sequence.count_ply == 0:
+        board.sequence.count_ply = len(board.history)
+    return board
+
+
+def read(
+    source: Union[str, TextIO], buffering: int = 1 << 20, strict: bool = False
+) -> Iterator[bitboard.BitBoard]:
+    """Reads the games of a PGN file one at a time, without loading the file.
+
+    Each game is yielded as the BitBoard it ends on. The tag pairs are in
+    board.sequence (Sequence.event, site, white, black, eco, elo_white, ...,
+    and all of them in Sequence.tags), and the moves are the Events of
+    board.history, which may be taken back with unmake_move.
+
+    Args:
+        source (Union[str, TextIO]): Path of the file, or an open text file.
+        buffering (int, optional): Size of the chunks read from a path, in
+            bytes. Defaults to 1 MiB.
+        strict (bool, optional): If a game with an invalid or illegal move
+            raises ValueError, rather than being skipped. Defaults to False.
+
+    Raises:
+        ValueError: Invalid or illegal move, if strict.
+
+    Yields:
+        bitboard.BitBoard: Board at the end of each game.
+    """
+    for pairs, movetext in games(source, buffering):
+        try:
+            yield replay(pairs, movetext)
+        except ValueError:
+            if strict:
+                raise
+
+
+def games(
+    source: Union[str, TextIO], buffering: int = 1 << 20
+) -> Iterator[tuple[dict[str, str], str]]:
+    """Splits a PGN file into games without playing them, one at a time and
+    without loading the file.
+
+    Args:
+        source (Union[str, TextIO]): Path of the file, or an open text file.
+        buffering (int, optional): Size of the chunks read from a path, in
+            bytes. Defaults to 1 MiB.
+
+    Yields:
+        tuple[dict[str, str], str]: Tag pairs, by name, and movetext of each
+            game, as taken by replay.
+    """
+    if isinstance(source, str):
+        with open(source, encoding="utf-8", errors="replace", buffering=buffering) as f:
+            yield from games(f)
+        return
+
+    pairs, movetext = {}, []
+    for line in source:
+        if line.startswith("[") and movetext:
+            # Tags after movetext begin the next game
+            yield pairs, "".join(movetext)
+            pairs, movetext = {}, []
+        if line.startswith("["):
+            tag = TAG.match(line)
+            if tag is not None:
+                pairs[tag.group(1)] = tag.group(2).replace('\\"', '"')
+        elif line.strip() and not line.startswith("%"):
+            movetext.append(line)
+    if pairs or movetext:
+        yield pairs, "".join(movetext)
+
+
+def write(board: objects.Board) -> str:
+    """Returns a game in PGN, with the tag pairs of board.sequence and the
+    moves of board.history.
+
+    Args:
+        board (objects.Board): Board at the end of the game. Left as it was
+            found.
+
+    Returns:
+        str: Game in PGN.
+    """
+    sequence = board.sequence
+    pairs = dict(sequence.tags)
+    result = {str(value): key for key, value in RESULTS.items()}.get(
+        str(sequence.result), "*"
+    )
+    pairs.setdefault("Event", sequence.event or "?")
+    pairs.setdefault("Site", sequence.site or "?")
+    pairs.setdefault("White", sequence.white or "?")
+    pairs.setdefault("Black", sequence.black or "?")
+    pairs["Result"] = result
+
+    # Take the moves back, then replay them to write each in SAN
+    events = []
+    while board.history:
+        events.append(board.unmake_move())
+    if board.origin is not None:
+        pairs["SetUp"], pairs["FEN"] = "1", board.origin
+    moves = []
+    for event in reversed(events):
+        if not board.colour or not moves:
+            moves.append(str(board.fullmove) + ("." if not board.colour else "..."))
+        moves.append(san(board, event))
+        board.make_move(event)
+
+    header = "".join(
+        "[" + key + ' "' + value.replace('"', '\\"') + '"]\n'
+        for key, value in pairs.items()
+    )
+    return header + "\n" + " ".join(moves + [result]) + "\n"
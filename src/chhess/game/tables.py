@@ -0,0 +1,147 @@
+# Precomputed move tables, indexed by square index (a1 = 0, b1 = 1, ..., h8 = 63).
+
+# Directions of the lines of sight, as (file step, rank step)
+NORTH, SOUTH, EAST, WEST, NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST = range(8)
+STEPS = ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (-1, 1), (1, -1), (-1, -1))
+ORTHOGONALS = (NORTH, SOUTH, EAST, WEST)
+DIAGONALS = (NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST)
+# If each direction runs towards higher square indices
+INCREASING = (True, False, True, False, True, True, False, False)
+# Direction running the opposite way to each direction
+OPPOSITE = (SOUTH, NORTH, WEST, EAST, SOUTH_WEST, SOUTH_EAST, NORTH_WEST, NORTH_EAST)
+
+KNIGHT_STEPS = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+KING_STEPS = STEPS
+
+
+def targets(sq: int, steps: tuple[tuple[int, int]]) -> tuple[int]:
+    """Returns the squares one step away from a square, for each step that
+    stays on the board.
+
+    Args:
+        sq (int): Square index.
+        steps (tuple[tuple[int, int]]): (file step, rank step) pairs.
+
+    Returns:
+        tuple[int]: Square indices of the targets.
+    """
+    file, rank = sq & 7, sq >> 3
+    return tuple(
+        (rank + r) * 8 + file + f
+        for f, r in steps
+        if 0 <= file + f < 8 and 0 <= rank + r < 8
+    )
+
+
+def ray(sq: int, step: tuple[int, int]) -> tuple[int]:
+    """Returns the squares along a line of sight from a square, ordered from
+    nearest to furthest.
+
+    Args:
+        sq (int): Square index.
+        step (tuple[int, int]): (file step, rank step) of the line of sight.
+
+    Returns:
+        tuple[int]: Square indices along the line of sight.
+    """
+    squares = []
+    file, rank = (sq & 7) + step[0], (sq >> 3) + step[1]
+    while 0 <= file < 8 and 0 <= rank < 8:
+        squares.append(rank * 8 + file)
+        file, rank = file + step[0], rank + step[1]
+    return tuple(squares)
+
+
+def mask(squares: tuple[int]) -> int:
+    """Returns the bitboard of a set of squares.
+
+    Args:
+        squares (tuple[int]): Square indices.
+
+    Returns:
+        int: Bitboard with the bit of each square set.
+    """
+    bb = 0
+    for sq in squares:
+        bb |= 1 << sq
+    return bb
+
+
+KNIGHT_TARGETS: tuple[tuple[int]] = tuple(targets(sq, KNIGHT_STEPS) for sq in range(64))
+KING_TARGETS: tuple[tuple[int]] = tuple(targets(sq, KING_STEPS) for sq in range(64))
+# Diagonal captures, white (1st index) and black (2nd index)
+PAWN_TARGETS: tuple[tuple[tuple[int]]] = (
+    tuple(targets(sq, ((-1, 1), (1, 1))) for sq in range(64)),
+    tuple(targets(sq, ((-1, -1), (1, -1))) for sq in range(64)),
+)
+RAYS: tuple[tuple[tuple[int]]] = tuple(
+    tuple(ray(sq, step) for sq in range(64)) for step in STEPS
+)
+
+KNIGHT_ATTACKS: tuple[int] = tuple(mask(squares) for squares in KNIGHT_TARGETS)
+KING_ATTACKS: tuple[int] = tuple(mask(squares) for squares in KING_TARGETS)
+PAWN_ATTACKS: tuple[tuple[int]] = tuple(
+    tuple(mask(squares) for squares in colour) for colour in PAWN_TARGETS
+)
+RAY_MASKS: tuple[tuple[int]] = tuple(
+    tuple(mask(squares) for squares in direction) for direction in RAYS
+)
+
+
+def lines() -> tuple[tuple[tuple[int]], tuple[tuple[int]]]:
+    """Returns the bitboards of the squares between, and of the whole line
+    through, every pair of squares on a common rank, file or diagonal.
+
+    Returns:
+        tuple[tuple[tuple[int]], tuple[tuple[int]]]: BETWEEN and LINES, both
+            indexed by two square indices, 0 for squares not in line.
+    """
+    between = [[0] * 64 for sq in range(64)]
+    through = [[0] * 64 for sq in range(64)]
+    for sq in range(64):
+        for direction in range(8):
+            line = (
+                RAY_MASKS[direction][sq] | RAY_MASKS[OPPOSITE[direction]][sq] | 1 << sq
+            )
+            passed = 0
+            for target in RAYS[direction][sq]:
+                between[sq][target] = passed
+                through[sq][target] = line
+                passed |= 1 << target
+    return (
+        tuple(tuple(row) for row in between),
+        tuple(tuple(row) for row in through),
+    )
+
+
+BETWEEN, LINES = lines()
+
+
+def slide(sq: int, occupied: int, directions: tuple[int]) -> int:
+    """Returns the squares attacked by a sliding piece, stopping each line of
+    sight at (and including) the first occupied square.
+
+    Args:
+        sq (int): Square index of the sliding piece.
+        occupied (int): Bitboard of occupied squares.
+        directions (tuple[int]): Directions of the lines of sight, e.g.
+            DIAGONALS.
+
+    Returns:
+        int: Bitboard of attacked squares.
+    """
+    attacks = 0
+    for direction in directions:
+        masks = RAY_MASKS[direction]
+        line = masks[sq]
+        blockers = line & occupied
+        if blockers:
+            # The nearest blocker is the lowest bit on increasing lines of
+            # sight, the highest on decreasing ones
+            if INCREASING[direction]:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            line ^= masks[blocker]
+        attacks |= line
+    return attacks
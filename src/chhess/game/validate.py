@@ -0,0 +1,285 @@
+import argparse
+import os
+import struct
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from time import perf_counter
+from typing import Iterable, Iterator
+
+from . import archive, bitboard, objects, pgn
+
+# Replays recorded games across a pool of worker processes, checking every
+# move, in chunks of games: ranges of indices of an archive, which each worker
+# reads for itself, or games split from a PGN file by the main process.
+
+
+class Report:
+    """Outcome of replaying one game.
+
+    Variables:
+        source (str): Path of the file of the game.
+        number (int): Index of the game in the file, from 0.
+        plies (int): Number of moves replayed.
+        error (str): Reason the game is invalid, None if it is valid.
+    """
+
+    def __init__(self, source: str, number: int, plies: int, error: str = None):
+        self.source: str = source
+        self.number: int = number
+        self.plies: int = plies
+        self.error: str = error
+
+    def __str__(self) -> str:
+        return (
+            self.source
+            + " #"
+            + str(self.number)
+            + ": "
+            + (str(self.plies) + " plies" if self.error is None else self.error)
+        )
+
+
+def check(board: bitboard.BitBoard, move: int) -> str:
+    """Returns why a move is illegal, if it is.
+
+    Args:
+        board (bitboard.BitBoard): Board in play.
+        move (int): Move packed with Event.pack.
+
+    Returns:
+        str: Reason the move is illegal, None if it is legal.
+    """
+    depart, arrive, kind = move & 63, move >> 6 & 63, move >> 12
+    piece = board.squares[depart].piece
+    if piece is None or piece.colour != board.colour:
+        return "No piece to move on " + str(objects.Position.at(depart))
+    if not board.legal_targets(depart) >> arrive & 1:
+        return "Illegal move " + archive.unpack(move)
+    if kind and (
+        piece.kind != bitboard.PAWN
+        or arrive >> 3 not in (0, 7)
+        or kind in (bitboard.PAWN, bitboard.KING)
+    ):
+        return "Invalid promotion " + archive.unpack(move)
+    return None
+
+
+def replay(
+    moves: Iterable[int], fen: str = None, source: str = "", number: int = 0
+) -> Report:
+    """Replays a game, checking every move.
+
+    Args:
+        moves (Iterable[int]): Moves packed with Event.pack.
+        fen (str, optional): Position the game starts from, in FEN. Defaults
+            to None (the starting position).
+        source (str, optional): Path of the file of the game. Defaults to "".
+        number (int, optional): Index of the game in the file. Defaults to 0.
+
+    Returns:
+        Report: Outcome of the replay.
+    """
+    try:
+        board = bitboard.BitBoard() if fen is None else bitboard.BitBoard.from_fen(fen)
+    except (ValueError, IndexError, KeyError):
+        return Report(source, number, 0, "Invalid FEN " + fen)
+    for move in moves:
+        error = check(board, move)
+        if error is not None:
+            ply = str(len(board.history) + 1)
+            return Report(source, number, len(board.history), error + " at ply " + ply)
+        board.make_move(board.event(move))
+    return Report(source, number, len(board.history))
+
+
+def _archive(path: str, start: int, stop: int) -> list[Report]:
+    reports = []
+    with archive.Archive(path) as games:
+        for i in range(start, stop):
+            # A corrupt record only fails its own game
+            try:
+                fen = games[i].tags.get("FEN")
+                moves = games.moves(i)
+            except (struct.error, ValueError) as corrupt:
+                reports.append(Report(path, i, 0, "Corrupt record: " + str(corrupt)))
+                continue
+            reports.append(replay(moves, fen, path, i))
+    return reports
+
+
+def _pgn(
+    path: str, start: int, games: list[tuple[dict[str, str], str]]
+) -> list[Report]:
+    reports = []
+    for i, (pairs, movetext) in enumerate(games, start):
+        try:
+            fen = pairs.get("FEN")
+            board = (
+                bitboard.BitBoard() if fen is None else bitboard.BitBoard.from_fen(fen)
+            )
+        except (ValueError, IndexError, KeyError):
+            reports.append(Report(path, i, 0, "Invalid FEN " + fen))
+            continue
+        error = None
+        for san in pgn.moves(movetext):
+            # Moves are checked as those of archives, and an invalid move only
+            # fails its own game
+            try:
+                event = pgn.parse(board, san)
+                error = check(board, event.pack())
+                if error is None:
+                    board.make_move(event)
+            except (ValueError, IndexError) as invalid:
+                error = str(invalid).rstrip(".") or type(invalid).__name__
+            if error is not None:
+                error += " at ply " + str(len(board.history) + 1)
+                break
+        reports.append(Report(path, i, len(board.history), error))
+    return reports
+
+
+def files(sources: list[str]) -> list[str]:
+    """Returns the game files of paths, expanding directories to the PGN
+    files (.pgn) and archives (.arc) in them.
+
+    Args:
+        sources (list[str]): Paths of files and directories.
+
+    Returns:
+        list[str]: Paths of files.
+    """
+    found = []
+    for source in sources:
+        if os.path.isdir(source):
+            found += [
+                os.path.join(source, name)
+                for name in sorted(os.listdir(source))
+                if name.endswith((".pgn", ".arc"))
+            ]
+        else:
+            found.append(source)
+    return found
+
+
+def tasks(paths: list[str], chunk: int) -> Iterator[tuple]:
+    """Yields the chunks of work of game files.
+
+    Args:
+        paths (list[str]): Paths of PGN files and archives.
+        chunk (int): Number of games per chunk.
+
+    Yields:
+        tuple: Worker function and its arguments.
+    """
+    for path in paths:
+        with open(path, "rb") as f:
+            binary = f.read(len(archive.MAGIC)) == archive.MAGIC
+        if binary:
+            with archive.Archive(path) as games:
+                count = len(games)
+            for start in range(0, count, chunk):
+                yield _archive, path, start, min(start + chunk, count)
+            continue
+        games, start = [], 0
+        for game in pgn.games(path):
+            games.append(game)
+            if len(games) == chunk:
+                yield _pgn, path, start, games
+                games, start = [], start + chunk
+        if games:
+            yield _pgn, path, start, games
+
+
+def validate(
+    sources: list[str], workers: int = None, chunk: int = 64, ordered: bool = True
+) -> Iterator[Report]:
+    """Replays and checks the games of files across worker processes, as the
+    results come in.
+
+    Args:
+        sources (list[str]): Paths of PGN files, archives and directories of
+            them.
+        workers (int, optional): Number of worker processes. Defaults to None
+            (one per CPU).
+        chunk (int, optional): Number of games per chunk of work. Defaults to
+            64.
+        ordered (bool, optional): If games are reported in the order of the
+            files, rather than as soon as their chunk is done. Defaults to
+            True.
+
+    Yields:
+        Report: Outcome of each game.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Chunks in flight, enough to keep every worker busy
+    window = 2 * workers
+    with ProcessPoolExecutor(workers) as executor:
+        pending: deque[Future] = deque()
+        for task in tasks(files(sources), chunk):
+            pending.append(executor.submit(*task))
+            if len(pending) >= window:
+                yield from _collect(pending, ordered)
+        while pending:
+            yield from _collect(pending, ordered)
+
+
+def _collect(pending: deque, ordered: bool) -> Iterator[Report]:
+    if ordered:
+        yield from pending.popleft().result()
+        return
+    done = wait(pending, return_when=FIRST_COMPLETED)[0]
+    for future in [future for future in pending if future in done]:
+        pending.remove(future)
+        yield from future.result()
+
+
+def main(argv: list[str] = None) -> int:
+    """Validates games from the command line, e.g.
+    python -m src.chhess.game.validate games/ --workers 4
+
+    Args:
+        argv (list[str], optional): Arguments. Defaults to None (sys.argv).
+
+    Returns:
+        int: Exit status, 1 if a game is invalid.
+    """
+    parser = argparse.ArgumentParser(description="Replay and validate games.")
+    parser.add_argument("sources", nargs="+", help="PGN files, archives or folders")
+    parser.add_argument("--workers", type=int, help="worker processes")
+    parser.add_argument("--chunk", type=int, default=64, help="games per chunk")
+    parser.add_argument(
+        "--unordered", action="store_true", help="report games as they finish"
+    )
+    parser.add_argument("--verbose", action="store_true", help="report every game")
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    games = errors = plies = 0
+    for report in validate(args.sources, args.workers, args.chunk, not args.unordered):
+        games += 1
+        plies += report.plies
+        if report.error is not None:
+            errors += 1
+        if report.error is not None or args.verbose:
+            print(report)
+    time = perf_counter() - start
+    print(
+        "games "
+        + str(games)
+        + " errors "
+        + str(errors)
+        + " plies "
+        + str(plies)
+        + " time "
+        + str(round(time, 3))
+        + " games/s "
+        + str(int(games / time) if time > 0 else 0)
+        + " plies/s "
+        + str(int(plies / time) if time > 0 else 0)
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
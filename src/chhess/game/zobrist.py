@@ -0,0 +1,53 @@
+from random import Random
+
+# Zobrist keys: fixed random 64-bit numbers, one per feature of a position.
+# The key of a position is the XOR of the numbers of its features, so it can
+# be updated incrementally as pieces move. See objects.Board.key.
+
+SEED = 20230201
+
+_random = Random(SEED)
+
+# One number per piece index (Piece.kind, plus 6 for black) per square index
+PIECES: tuple[tuple[int]] = tuple(
+    tuple(_random.getrandbits(64) for sq in range(64)) for piece in range(12)
+)
+# Black to move
+COLOUR: int = _random.getrandbits(64)
+# One number per combination of castling rights, see objects.Board.castling
+CASTLING: tuple[int] = (0,) + tuple(_random.getrandbits(64) for rights in range(15))
+# One number per file of the en passant square
+EN_PASSANT: tuple[int] = tuple(_random.getrandbits(64) for file in range(8))
+
+
+def piece(piece, sq: int) -> int:
+    """Returns the number of a piece on a square.
+
+    Args:
+        piece (objects.Piece): Piece in play.
+        sq (int): Square index, from 0 (a1) to 63 (h8).
+
+    Returns:
+        int: Zobrist number.
+    """
+    return PIECES[piece.kind + (6 if piece.colour else 0)][sq]
+
+
+def compute(board) -> int:
+    """Computes the key of a position from scratch.
+
+    Args:
+        board (objects.Board): Board in play.
+
+    Returns:
+        int: Zobrist key of the position.
+    """
+    key = COLOUR if board.colour else 0
+    for active in board.active:
+        for p in active:
+            key ^= piece(p, p.position.square())
+    key ^= CASTLING[board.castling()]
+    passant = board.en_passant()
+    if passant is not None:
+        key ^= EN_PASSANT[passant.position.file - 1]
+    return key
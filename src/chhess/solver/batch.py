@@ -0,0 +1,276 @@
+import numpy as np
+
+from ..game import bitboard, objects
+from .evaluate import CENTRE, PAWN
+
+# Evaluation of many positions at once, with NumPy operations across the whole
+# batch. Positions are encoded as twelve bitboards each (see
+# bitboard.BitBoard.pieces), for sliding attacks, or as (12, 64) planes of
+# 0s and 1s, for the tables.
+
+# Centipawns per square a side's pieces attack, other than its own pieces
+MOBILITY = 2
+# Centipawns per pawn beyond the first on a file, and per pawn with no pawns
+# of its colour on either neighbouring file
+DOUBLED = -15
+ISOLATED = -10
+# Centipawns per passed pawn, by rank index counted from its own side
+PASSED: np.ndarray = np.array((0, 5, 10, 20, 35, 60, 100, 0), dtype=np.int32)
+
+_FULL = np.uint64(bitboard.FULL)
+_NOT_A = np.uint64(bitboard.FULL ^ bitboard.FILE_A)
+_NOT_AB = np.uint64(bitboard.FULL ^ (bitboard.FILE_A | bitboard.FILE_B))
+_NOT_H = np.uint64(bitboard.FULL ^ bitboard.FILE_H)
+_NOT_GH = np.uint64(bitboard.FULL ^ (bitboard.FILE_G | bitboard.FILE_H))
+
+# Lines of sight as (shift, towards higher square indices, squares that
+# cannot be reached without wrapping around the board)
+ORTHOGONALS = (
+    (8, True, _FULL),
+    (8, False, _FULL),
+    (1, True, _NOT_A),
+    (1, False, _NOT_H),
+)
+DIAGONALS = (
+    (9, True, _NOT_A),
+    (7, True, _NOT_H),
+    (7, False, _NOT_A),
+    (9, False, _NOT_H),
+)
+
+
+def squares_table() -> np.ndarray:
+    """Returns the score of each kind and colour of piece on each square, from
+    white's perspective: Piece.value in centipawns plus the bonuses of
+    evaluate.evaluate.
+
+    Returns:
+        np.ndarray: (12, 64) table, indexed like bitboard.BitBoard.pieces.
+    """
+    table = np.zeros((12, 64), dtype=np.int32)
+    for kind, piece in enumerate(bitboard.TYPES):
+        for sq in range(64):
+            file, rank = (sq & 7) + 1, (sq >> 3) + 1
+            distance = abs(2 * file - 9) // 2 + abs(2 * rank - 9) // 2
+            score = PAWN * piece.value + CENTRE[kind][distance]
+            if kind == bitboard.PAWN:
+                score += 5 * (rank - 2)
+            # The same square seen from black's side is mirrored across ranks
+            table[kind][sq] = score
+            table[kind + bitboard.COLOUR_OFFSET][sq ^ 56] = -score
+    return table
+
+
+SQUARES: np.ndarray = squares_table()
+
+
+def encode(boards: list[objects.Board]) -> tuple[np.ndarray, np.ndarray]:
+    """Encodes Boards as bitboards.
+
+    Args:
+        boards (list[objects.Board]): Boards in play, BitBoards or not.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (N, 12) bitboards of each kind and
+            colour of piece, indexed like bitboard.BitBoard.pieces, and (N,)
+            colours of the players who move next.
+    """
+    pieces = []
+    for board in boards:
+        if isinstance(board, bitboard.BitBoard):
+            pieces.append(board.pieces)
+            continue
+        bbs = [0] * 12
+        for active in board.active:
+            for piece in active:
+                bbs[bitboard.piece_index(piece)] |= 1 << piece.position.square()
+        pieces.append(bbs)
+    return (
+        np.array(pieces, dtype=np.uint64).reshape(len(boards), 12),
+        np.array([board.colour for board in boards], dtype=bool),
+    )
+
+
+def planes(pieces: np.ndarray) -> np.ndarray:
+    """Returns bitboards as planes of 0s and 1s.
+
+    Args:
+        pieces (np.ndarray): (..., 12) bitboards.
+
+    Returns:
+        np.ndarray: (..., 12, 64) planes, indexed by square index.
+    """
+    octets = pieces.astype("<u8").view(np.uint8).reshape(pieces.shape + (8,))
+    return np.unpackbits(octets, axis=-1, bitorder="little")
+
+
+def count(bbs: np.ndarray) -> np.ndarray:
+    """Returns the number of set bits of each bitboard.
+
+    Args:
+        bbs (np.ndarray): (N,) bitboards.
+
+    Returns:
+        np.ndarray: (N,) counts.
+    """
+    octets = bbs.astype("<u8").view(np.uint8).reshape(bbs.shape + (8,))
+    return np.unpackbits(octets, axis=-1).sum(axis=-1, dtype=np.int32)
+
+
+def shift(bbs: np.ndarray, n: int, increasing: bool) -> np.ndarray:
+    return bbs << np.uint64(n) if increasing else bbs >> np.uint64(n)
+
+
+def slide(bbs: np.ndarray, empty: np.ndarray, lines: tuple) -> np.ndarray:
+    """Returns the squares attacked by sets of sliding pieces, by filling each
+    line of sight up to (and including) the first occupied square.
+
+    Args:
+        bbs (np.ndarray): (N,) bitboards of the sliding pieces.
+        empty (np.ndarray): (N,) bitboards of the empty squares.
+        lines (tuple): ORTHOGONALS and/or DIAGONALS.
+
+    Returns:
+        np.ndarray: (N,) bitboards of attacked squares.
+    """
+    attacks = np.zeros_like(bbs)
+    for n, increasing, wrap in lines:
+        # Double the distance covered on each step (Kogge-Stone fill)
+        gen, pro = bbs, empty & wrap
+        gen = gen | pro & shift(gen, n, increasing)
+        pro = pro & shift(pro, n, increasing)
+        gen = gen | pro & shift(gen, 2 * n, increasing)
+        pro = pro & shift(pro, 2 * n, increasing)
+        gen = gen | pro & shift(gen, 4 * n, increasing)
+        attacks |= shift(gen, n, increasing) & wrap
+    return attacks
+
+
+def knight_attacks(bbs: np.ndarray) -> np.ndarray:
+    """Returns the squares attacked by sets of knights.
+
+    Args:
+        bbs (np.ndarray): (N,) bitboards of the knights.
+
+    Returns:
+        np.ndarray: (N,) bitboards of attacked squares.
+    """
+    one = (bbs << np.uint64(1)) & _NOT_A | (bbs >> np.uint64(1)) & _NOT_H
+    two = (bbs << np.uint64(2)) & _NOT_AB | (bbs >> np.uint64(2)) & _NOT_GH
+    return (
+        one << np.uint64(16)
+        | one >> np.uint64(16)
+        | two << np.uint64(8)
+        | two >> np.uint64(8)
+    )
+
+
+def material(pieces: np.ndarray) -> np.ndarray:
+    """Returns the material and square bonuses of each position, as scored by
+    evaluate.evaluate.
+
+    Args:
+        pieces (np.ndarray): (N, 12) bitboards.
+
+    Returns:
+        np.ndarray: (N,) scores in centipawns, from white's perspective.
+    """
+    return np.einsum("npq,pq->n", planes(pieces).astype(np.int32), SQUARES)
+
+
+def mobility(pieces: np.ndarray) -> np.ndarray:
+    """Returns the difference between the number of squares attacked by white's
+    knights, bishops, rooks and queens and by black's, other than squares of
+    their own pieces.
+
+    Args:
+        pieces (np.ndarray): (N, 12) bitboards.
+
+    Returns:
+        np.ndarray: (N,) scores in centipawns, from white's perspective.
+    """
+    sides = [pieces[:, :6], pieces[:, 6:]]
+    occupied = [np.bitwise_or.reduce(side, axis=1) for side in sides]
+    empty = ~(occupied[0] | occupied[1])
+    score = np.zeros(len(pieces), dtype=np.int32)
+    for i_c, side in enumerate(sides):
+        diagonal = side[:, bitboard.BISHOP] | side[:, bitboard.QUEEN]
+        orthogonal = side[:, bitboard.ROOK] | side[:, bitboard.QUEEN]
+        others = ~occupied[i_c]
+        squares = (
+            count(knight_attacks(side[:, bitboard.KNIGHT]) & others)
+            + count(slide(diagonal, empty, DIAGONALS) & others)
+            + count(slide(orthogonal, empty, ORTHOGONALS) & others)
+        )
+        score += -squares if i_c else squares
+    return MOBILITY * score
+
+
+def structure(pieces: np.ndarray) -> np.ndarray:
+    """Returns the pawn structure terms of each position: doubled, isolated and
+    passed pawns.
+
+    Args:
+        pieces (np.ndarray): (N, 12) bitboards.
+
+    Returns:
+        np.ndarray: (N,) scores in centipawns, from white's perspective.
+    """
+    # Pawns by rank index, then file index
+    white = planes(pieces[:, bitboard.PAWN]).reshape(-1, 8, 8).astype(bool)
+    black = planes(pieces[:, bitboard.PAWN + 6]).reshape(-1, 8, 8).astype(bool)
+    ranks = np.arange(8).reshape(1, 8, 1)
+
+    score = np.zeros(len(pieces), dtype=np.int32)
+    for sign, pawns in ((1, white), (-1, black)):
+        files = pawns.sum(axis=1, dtype=np.int32)
+        doubled = np.maximum(files - 1, 0).sum(axis=1)
+        present = np.pad(files > 0, ((0, 0), (1, 1)))
+        alone = ~(present[:, :-2] | present[:, 2:])
+        isolated = (files * alone).sum(axis=1)
+        score += sign * (DOUBLED * doubled + ISOLATED * isolated)
+
+    # A pawn is passed if no enemy pawn is ahead of it on its file or either
+    # neighbouring file
+    front = np.where(black, ranks, -1).max(axis=1)
+    front = np.pad(front, ((0, 0), (1, 1)), constant_values=-1)
+    front = np.maximum(np.maximum(front[:, :-2], front[:, 1:-1]), front[:, 2:])
+    passed = white & (ranks >= front[:, None, :])
+    score += (passed * PASSED.reshape(1, 8, 1)).sum(axis=(1, 2), dtype=np.int32)
+
+    front = np.where(white, ranks, 8).min(axis=1)
+    front = np.pad(front, ((0, 0), (1, 1)), constant_values=8)
+    front = np.minimum(np.minimum(front[:, :-2], front[:, 1:-1]), front[:, 2:])
+    passed = black & (ranks <= front[:, None, :])
+    score -= (passed * PASSED[::-1].reshape(1, 8, 1)).sum(axis=(1, 2), dtype=np.int32)
+    return score
+
+
+def evaluate_encoded(pieces: np.ndarray, colours: np.ndarray) -> np.ndarray:
+    """Returns a static evaluation of each of a batch of encoded positions, from
+    the perspective of the player who moves next.
+
+    Args:
+        pieces (np.ndarray): (N, 12) bitboards, as returned by encode.
+        colours (np.ndarray): (N,) colours of the players who move next.
+
+    Returns:
+        np.ndarray: (N,) evaluations in centipawns.
+    """
+    score = material(pieces) + mobility(pieces) + structure(pieces)
+    return np.where(colours, -score, score)
+
+
+def evaluate(boards: list[objects.Board]) -> np.ndarray:
+    """Returns a static evaluation of each of a batch of positions, from the
+    perspective of the player who moves next: the material and square terms of
+    evaluate.evaluate, plus mobility and pawn structure.
+
+    Args:
+        boards (list[objects.Board]): Boards in play.
+
+    Returns:
+        np.ndarray: (N,) evaluations in centipawns. Positive if the player who
+            moves next is better.
+    """
+    return evaluate_encoded(*encode(boards))
@@ -0,0 +1,273 @@
+import argparse
+import copy
+import mmap
+import random
+import struct
+import sys
+from typing import BinaryIO, Iterable, Union
+
+from ..game import archive, game, objects, pgn
+
+# Opening book: the moves played from each position in a set of games, with
+# how often each was played and how the games ended. Records are sorted by
+# Zobrist key, then by number of games (most first), so that the moves of a
+# position can be found by binary search.
+
+MAGIC = b"CHHSBOOK"
+# Zobrist key of the position, packed move (see Event.pack), then the number
+# of games it was played in, won and drawn by the player who played it
+RECORD = struct.Struct("<QHIII")
+
+
+def positions(board: objects.Board, plies: int) -> Iterable[tuple[int, int, bool]]:
+    """Yields the positions of a game played out on a board, with the move
+    played from each.
+
+    Args:
+        board (objects.Board): Board at the end of the game.
+        plies (int): Number of moves from the start of the game to yield.
+
+    Yields:
+        tuple[int, int, bool]: Zobrist key of the position, packed move and
+            colour of the player who played it.
+    """
+    for record in board.history[:plies]:
+        yield record[9], record[0].pack(), record[8]
+
+
+def replay(sequence: objects.Sequence, plies: int) -> objects.Board:
+    """Plays the first moves of a Sequence on a Board.
+
+    Args:
+        sequence (objects.Sequence): Sequence of packed moves, with a FEN tag
+            if the game did not start from the starting position.
+        plies (int): Number of moves to play.
+
+    Returns:
+        objects.Board: Board in play.
+    """
+    if "FEN" in sequence.tags:
+        board = objects.Board.from_fen(sequence.tags["FEN"])
+    else:
+        board = objects.Board()
+    for move in sequence.sequence[:plies]:
+        board.make_move(board.event(move))
+    # Keep the moves played, which the board reads back, with the match data
+    played = board.sequence
+    board.sequence = copy.copy(sequence)
+    board.sequence.sequence, board.sequence.moves = played.sequence, played.moves
+    return board
+
+
+def build(
+    boards: Iterable[objects.Board], plies: int = 16
+) -> dict[tuple[int, int], list[int]]:
+    """Counts the moves played from each position in a set of games.
+
+    Args:
+        boards (Iterable[objects.Board]): Boards at the end of each game (or
+            at least plies moves in), with the result in board.sequence.
+        plies (int, optional): Number of moves from the start of each game
+            counted. Defaults to 16.
+
+    Returns:
+        dict[tuple[int, int], list[int]]: Number of games, wins and draws
+            for the player who moved, by Zobrist key and packed move.
+    """
+    counts = {}
+    for board in boards:
+        result = board.sequence.result
+        for key, move, colour in positions(board, plies):
+            count = counts.get((key, move))
+            if count is None:
+                count = counts[(key, move)] = [0, 0, 0]
+            count[0] += 1
+            if result:
+                if result[0] == result[1]:
+                    count[2] += 1
+                elif result[1 if colour else 0] == 1:
+                    count[1] += 1
+    return counts
+
+
+def write(
+    target: Union[str, BinaryIO],
+    counts: dict[tuple[int, int], list[int]],
+    minimum: int = 1,
+) -> int:
+    """Writes counted moves to a book file.
+
+    Args:
+        target (Union[str, BinaryIO]): Path of the book, or a binary file
+            open for writing.
+        counts (dict[tuple[int, int], list[int]]): Counts, as returned by
+            build.
+        minimum (int, optional): Number of games a move must have been played
+            in to be written. Defaults to 1.
+
+    Returns:
+        int: Number of moves written.
+    """
+    if isinstance(target, str):
+        with open(target, "wb") as f:
+            return write(f, counts, minimum)
+
+    records = sorted(
+        (key, -count[0], move, count[1], count[2])
+        for (key, move), count in counts.items()
+        if count[0] >= minimum
+    )
+    target.write(MAGIC)
+    target.write(
+        b"".join(
+            RECORD.pack(key, move, -games, wins, draws)
+            for key, games, move, wins, draws in records
+        )
+    )
+    return len(records)
+
+
+class Book:
+    """Read-only opening book, memory-mapped and searched in place.
+
+    Variables:
+        file (BinaryIO): Book file.
+        data (mmap.mmap): Memory map of the file.
+        count (int): Number of moves in the book.
+        rng (random.Random): Random number generator of choose, None to
+            always choose the most played move.
+    """
+
+    def __init__(self, path: str, seed: int = None, weighted: bool = True) -> None:
+        """Initializes a Book object.
+
+        Args:
+            path (str): Path of the book.
+            seed (int, optional): Seed of the random choice of moves. Defaults
+                to None (random seed).
+            weighted (bool, optional): If moves are chosen at random, in
+                proportion to how often they were played, rather than always
+                choosing the most played. Defaults to True.
+
+        Raises:
+            ValueError: Not a book.
+        """
+        self.file: BinaryIO = open(path, "rb")
+        header = self.file.read(len(MAGIC))
+        if header != MAGIC:
+            self.file.close()
+            raise ValueError("Not a book: " + path + ".")
+        self.count: int = (self.file.seek(0, 2) - len(MAGIC)) // RECORD.size
+        self.data: mmap.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.rng: random.Random = random.Random(seed) if weighted else None
+
+    def __enter__(self) -> "Book":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the memory map and the file."""
+        self.data.close()
+        self.file.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def record(self, i: int) -> tuple[int, int, int, int, int]:
+        """Returns a record of the book.
+
+        Args:
+            i (int): Index of the record.
+
+        Returns:
+            tuple[int, int, int, int, int]: Zobrist key, packed move and
+                number of games, wins and draws.
+        """
+        return RECORD.unpack_from(self.data, len(MAGIC) + RECORD.size * i)
+
+    def entries(self, key: int) -> list[tuple[int, int, int, int]]:
+        """Returns the moves of a position, most played first.
+
+        Args:
+            key (int): Zobrist key of the position.
+
+        Returns:
+            list[tuple[int, int, int, int]]: Packed move and number of games,
+                wins and draws for the player who moves, of each move.
+        """
+        # Find the first record of the key by binary search
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) >> 1
+            if self.record(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        entries = []
+        for i in range(low, self.count):
+            record = self.record(i)
+            if record[0] != key:
+                break
+            entries.append(record[1:])
+        return entries
+
+    def choose(self, board: objects.Board) -> objects.Event:
+        """Returns a book move for the player who moves next.
+
+        Args:
+            board (objects.Board): Board in play.
+
+        Returns:
+            objects.Event: Book move, None if the position is not in the
+                book.
+        """
+        # Keys may collide, so only legal moves are played
+        legal = {event.pack(): event for event in game.Referee.iter_legal_moves(board)}
+        entries = [entry for entry in self.entries(board.key) if entry[0] in legal]
+        if len(entries) == 0:
+            return None
+        if self.rng is None:
+            return legal[entries[0][0]]
+        weights = [entry[1] for entry in entries]
+        return legal[self.rng.choices(entries, weights)[0][0]]
+
+
+def main(argv: list[str] = None) -> int:
+    """Builds a book from the command line, e.g.
+    python -m src.chhess.solver.book --plies 16 --output book.bin games.pgn
+
+    Args:
+        argv (list[str], optional): Arguments. Defaults to None (sys.argv).
+
+    Returns:
+        int: Exit status.
+    """
+    parser = argparse.ArgumentParser(description="Build an opening book.")
+    parser.add_argument("games", nargs="+", help="PGN files or game archives")
+    parser.add_argument("--output", required=True, help="path of the book")
+    parser.add_argument("--plies", type=int, default=16, help="moves per game")
+    parser.add_argument(
+        "--minimum", type=int, default=1, help="games a move must be played in"
+    )
+    args = parser.parse_args(argv)
+
+    def boards():
+        for path in args.games:
+            with open(path, "rb") as f:
+                binary = f.read(len(archive.MAGIC)) == archive.MAGIC
+            if binary:
+                with archive.Archive(path) as games:
+                    for sequence in games:
+                        yield replay(sequence, args.plies)
+            else:
+                yield from pgn.read(path)
+
+    count = write(args.output, build(boards(), args.plies), args.minimum)
+    print(str(count) + " moves written to " + args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+from ..game import objects
+
+# Centipawns per point of Piece.value
+PAWN = 100
+
+# Bonus for each piece kind (Piece.kind) by distance from the centre, in
+# centipawns, indexed by the sum of file and rank distances (0 to 6)
+CENTRE: tuple[tuple[int]] = (
+    (0, 0, 0, 0, 0, 0, 0),
+    (20, 15, 10, 5, 0, -10, -20),
+    (10, 10, 5, 5, 0, -5, -10),
+    (5, 5, 0, 0, 0, 0, -5),
+    (5, 5, 5, 0, 0, -5, -5),
+    (-20, -15, -10, -5, 0, 5, 10),
+)
+
+
+def evaluate(board: objects.Board) -> int:
+    """Returns a static evaluation of the position, from the perspective of the
+    player who moves next: material (Piece.value), a bonus for centralised
+    pieces and advanced pawns, and a penalty for a King in the centre.
+
+    Args:
+        board (objects.Board): Board in play.
+
+    Returns:
+        int: Evaluation in centipawns. Positive if the player who moves next
+            is better.
+    """
+    score = 0
+    for i_c in (0, 1):
+        side = 0
+        for piece in board.active[i_c]:
+            file, rank = piece.position.file, piece.position.rank
+            distance = abs(2 * file - 9) // 2 + abs(2 * rank - 9) // 2
+            side += PAWN * piece.value + CENTRE[piece.kind][distance]
+            if piece.kind == 0:
+                side += 5 * (rank - 2 if i_c == 0 else 7 - rank)
+        score += -side if i_c else side
+    return -score if board.colour else score
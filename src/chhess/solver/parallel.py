@@ -0,0 +1,371 @@
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from time import perf_counter
+
+from ..game import bitboard, objects
+from ..game.clock import TimeManager
+from .search import INFINITY, MATE, Engine, Info, moves
+from .tablebase import Tablebase
+
+# Search state of a worker process, set by _start: its engine, the signal to
+# stop, the board being searched and, for each root move, the iterations of it
+# already completed
+_engine: Engine = None
+_signal: multiprocessing.Event = None
+_data: bytes = None
+_board: bitboard.BitBoard = None
+_done: dict[int, list[Info]] = {}
+
+
+def encode(board: objects.Board) -> bytes:
+    """Encodes a Board compactly: the FEN it was set up from, if any, preceded
+    by its length, then the moves played on it packed with Event.pack, two bytes
+    per move.
+
+    Args:
+        board (objects.Board): Board in play.
+
+    Returns:
+        bytes: Encoded board.
+    """
+    origin = b"" if board.origin is None else board.origin.encode()
+    moves = array("H", (record[0].pack() for record in board.history))
+    return bytes((len(origin),)) + origin + moves.tobytes()
+
+
+def decode(data: bytes) -> bitboard.BitBoard:
+    """Decodes a Board encoded with encode, replaying its moves on a BitBoard.
+
+    Args:
+        data (bytes): Encoded board.
+
+    Returns:
+        bitboard.BitBoard: Board in play.
+    """
+    length = data[0]
+    if length:
+        board = bitboard.BitBoard.from_fen(data[1 : length + 1].decode())
+    else:
+        board = bitboard.BitBoard()
+    for move in array("H", data[length + 1 :]):
+        board.make_move(board.event(move))
+    return board
+
+
+def _start(size: int, tablebase: str, signal: multiprocessing.Event) -> None:
+    global _engine, _signal
+    _engine = Engine(size=size)
+    if tablebase is not None:
+        _engine.tablebase = Tablebase(tablebase)
+    _signal = signal
+
+
+class Deadline:
+    """Deadline of a worker's search, standing in for a TimeManager: expired
+    once its time is up, or once the search is stopped by the main process.
+
+    Variables:
+        signal (multiprocessing.Event): Set to stop every worker.
+        deadline (float): Time the search stops, by perf_counter, None for no
+            limit.
+    """
+
+    def __init__(self, signal: multiprocessing.Event, hard: float = None) -> None:
+        self.signal: multiprocessing.Event = signal
+        self.deadline: float = None if hard is None else perf_counter() + hard
+
+    def expired(self) -> bool:
+        """Returns True once the search should stop."""
+        return self.signal.is_set() or (
+            self.deadline is not None and perf_counter() >= self.deadline
+        )
+
+
+def _search(
+    data: bytes,
+    move: int,
+    depth: int,
+    alpha: int,
+    beta: int,
+    limit: int,
+    hard: float,
+    fresh: bool,
+) -> tuple[int, int, list[int], bool]:
+    """Searches one root move in a worker process, within a window, by
+    iterative deepening of the position after it. The iterations completed in
+    earlier calls for the same board are kept, so only the new depth is
+    searched, ordered by them and the transposition table.
+
+    Args:
+        data (bytes): Encoded board, as returned by encode.
+        move (int): Root move, packed with Event.pack.
+        depth (int): Depth of the search, in plies, including the root move.
+        alpha (int): Lower bound of the window, from the root's perspective.
+        beta (int): Upper bound of the window, from the root's perspective.
+        limit (int): Maximum number of nodes, None for no limit.
+        hard (float): Seconds before the search stops, None for no limit.
+        fresh (bool): If the transposition table is cleared first.
+
+    Returns:
+        tuple[int, int, list[int], bool]: Score from the root's perspective (a
+            bound if outside the window), nodes searched, packed principal
+            variation after the move and whether the search reached the full
+            depth.
+    """
+    global _data, _board
+    if data != _data:
+        _data, _board = data, decode(data)
+        _done.clear()
+    if fresh:
+        _engine.table.clear()
+        _done.clear()
+    done = _done.setdefault(move, [])
+    _engine.nodes, _engine.info, _engine.stopped = 0, done, False
+    _engine.limit, _engine.manager = limit, Deadline(_signal, hard)
+    start = perf_counter()
+
+    # Searched one ply below the root, so that draws, mates and the
+    # tablebase are scored as in Engine.search
+    event = _board.event(move)
+    _board.make_move(event)
+    score, pv = 0, []
+    for remaining in range(min(len(done), depth - 1), depth):
+        _engine.pv = [[] for ply in range(remaining + 2)]
+        result = -_engine.negamax(_board, remaining, -beta, -alpha, 1)
+        if _engine.stopped and _engine.info:
+            break
+        score, pv = result, _engine.pv[1]
+        # Indexed by ply, for Engine.order
+        done.append(
+            Info(
+                remaining + 1,
+                score,
+                _engine.nodes,
+                perf_counter() - start,
+                [event] + pv,
+            )
+        )
+    _board.unmake_move()
+    return score, _engine.nodes, [event.pack() for event in pv], not _engine.stopped
+
+
+class ParallelEngine(Engine):
+    """Engine that splits the moves at the root of each iteration across
+    worker processes, by principal variation search: each worker searches
+    its moves by iterative deepening, within the bound set by the best move
+    so far. Keeps to the node limit, time managers and stopped as Engine
+    does, and reports each completed iteration in info and to the callback.
+
+    Variables:
+        workers (int): Number of worker processes.
+        deterministic (bool): If each worker's transposition table is
+            cleared at the start of each search, so results do not depend on
+            earlier searches.
+        size (int): Size of the transposition table of each worker, in
+            megabytes.
+        tables (str): Directory of the endgame tables of the workers, None
+            for none.
+        signal (multiprocessing.Event): Set to stop the workers.
+        executors (list[ProcessPoolExecutor]): Worker processes, one pool
+            per worker so that each root move is searched by the same worker
+            at every depth. Empty until the first search.
+    """
+
+    def __init__(
+        self,
+        depth: int = 4,
+        workers: int = None,
+        size: int = 16,
+        deterministic: bool = False,
+        nodes: int = None,
+        tablebase: str = None,
+    ) -> None:
+        """Initializes a ParallelEngine object.
+
+        Args:
+            depth (int, optional): Maximum depth of a search. Defaults to 4.
+            workers (int, optional): Number of worker processes. Defaults to
+                None (one per CPU).
+            size (int, optional): Size of the transposition table of each
+                worker, in megabytes. Defaults to 16.
+            deterministic (bool, optional): If each search starts from
+                cleared transposition tables. Defaults to False.
+            nodes (int, optional): Maximum number of nodes of a search, across
+                all workers. Defaults to None (no limit).
+            tablebase (str, optional): Directory of endgame tables, opened by
+                each worker. Defaults to None (none).
+        """
+        super().__init__(depth, nodes, size=0)
+        self.workers: int = workers or os.cpu_count() or 1
+        self.deterministic: bool = deterministic
+        self.size: int = size
+        self.tables: str = tablebase
+        self.signal: multiprocessing.Event = multiprocessing.Event()
+        self.executors: list[ProcessPoolExecutor] = []
+
+    def __enter__(self) -> "ParallelEngine":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shuts down the worker processes."""
+        for executor in self.executors:
+            executor.shutdown()
+        self.executors = []
+
+    def search(
+        self, board: objects.Board, manager: TimeManager = None
+    ) -> objects.Event:
+        """Searches the position by iterative deepening, one ply at a time up to
+        the maximum depth, or until the node limit or a deadline is reached,
+        with the root moves of each iteration searched in parallel.
+
+        Args:
+            board (objects.Board): Board in play. Left as it was found.
+            manager (TimeManager, optional): Deadlines of the search. Defaults
+                to None (no time limit).
+
+        Returns:
+            objects.Event: Best move, None if there are no legal moves.
+        """
+        self.nodes, self.info, self.stopped = 0, [], False
+        self.manager = manager
+        start = perf_counter()
+        events = self.order(moves(board), 0)
+        if len(events) == 0:
+            return None
+        if not self.executors:
+            self.executors = [
+                ProcessPoolExecutor(
+                    1,
+                    initializer=_start,
+                    initargs=(self.size, self.tables, self.signal),
+                )
+                for worker in range(self.workers)
+            ]
+        self.signal.clear()
+        data = encode(board)
+        # Worker of each root move, by its place in the first ordering, so
+        # that it finds the iterations it has already searched
+        owners = {
+            event.pack(): i % len(self.executors) for i, event in enumerate(events)
+        }
+        scores = {}
+        # Workers whose transposition table needs no clearing
+        cleared = set() if self.deterministic else set(range(len(self.executors)))
+
+        def submit(event: objects.Event, alpha: int, beta: int) -> Future:
+            owner = owners[event.pack()]
+            clear = owner not in cleared
+            cleared.add(owner)
+            return self.executors[owner].submit(
+                _search, data, event.pack(), depth, alpha, beta, limit, hard, clear
+            )
+
+        best = None
+        for depth in range(1, self.depth + 1):
+            # Best moves of the last iteration first
+            events.sort(key=lambda event: -scores.get(event.pack(), 0))
+            limit, hard = None, None
+            if self.info and self.limit is not None:
+                limit = max(1, (self.limit - self.nodes) // len(events))
+            if self.info and manager is not None and manager.origin is not None:
+                hard = max(0, manager.hard - manager.elapsed())
+
+            # Principal variation search: the first move with a full window,
+            # then the others with a null window at the best score so far, in
+            # waves of one move per worker, with those that beat it searched
+            # again above it
+            results = self.collect([submit(events[0], -INFINITY, INFINITY)])
+            alpha, top = results[0][0], 0
+            results += [None] * (len(events) - 1)
+            waiting = list(range(1, len(events)))
+            while waiting and not self.stopped:
+                wave, busy = [], set()
+                for i in waiting:
+                    if owners[events[i].pack()] not in busy:
+                        wave.append(i)
+                        busy.add(owners[events[i].pack()])
+                waiting = [i for i in waiting if i not in wave]
+                bound = alpha
+                tested = self.collect(
+                    [submit(events[i], alpha, alpha + 1) for i in wave]
+                )
+                for i, result in zip(wave, tested):
+                    # Tested again if the bound rose within the wave
+                    if result[0] > bound and alpha > bound and not self.stopped:
+                        result = self.again(result, submit(events[i], alpha, alpha + 1))
+                    if result[0] > alpha and not self.stopped:
+                        result = self.again(result, submit(events[i], alpha, INFINITY))
+                        if result[0] > alpha:
+                            alpha, top = result[0], i
+                    results[i] = result
+            searched = [result for result in results if result is not None]
+            self.nodes += sum(result[1] for result in searched)
+            if len(searched) < len(events) or not all(result[3] for result in searched):
+                self.stopped = True
+            if self.stopped and best is not None:
+                break
+
+            scores = {
+                event.pack(): result[0]
+                for event, result in zip(events, results)
+                if result is not None
+            }
+            score, best = alpha, events[top]
+            pv = [best]
+            board.make_move(best)
+            for move in results[top][2]:
+                pv.append(board.event(move))
+                board.make_move(pv[-1])
+            for event in pv:
+                board.unmake_move()
+
+            self.info.append(Info(depth, score, self.nodes, perf_counter() - start, pv))
+            if self.callback is not None:
+                self.callback(self.info[-1])
+            if self.stopped or abs(score) >= MATE - depth:
+                break
+            if self.limit is not None and self.nodes >= self.limit:
+                break
+            if manager is not None and not manager.proceed(best.pack()):
+                break
+        return best
+
+    def again(self, result: tuple, future: Future) -> tuple:
+        """Returns the result of searching a root move again, counting the
+        nodes of both searches.
+
+        Args:
+            result (tuple): Result of _search of the earlier search.
+            future (Future): Search of the move again.
+
+        Returns:
+            tuple: Result of _search of the search again.
+        """
+        score, nodes, pv, completed = self.collect([future])[0]
+        return score, result[1] + nodes, pv, completed
+
+    def collect(self, futures: list[Future]) -> list[tuple]:
+        """Waits for the results of the workers, stopping them if stopped is
+        set or the hard deadline passes, once an iteration has completed.
+
+        Args:
+            futures (list[Future]): Searches of the root moves.
+
+        Returns:
+            list[tuple]: Results of _search, in the order of futures.
+        """
+        pending = set(futures)
+        while pending:
+            pending = wait(pending, timeout=0.01)[1]
+            if self.info and (
+                self.stopped or self.manager is not None and self.manager.expired()
+            ):
+                self.stopped = True
+                self.signal.set()
+        return [future.result() for future in futures]
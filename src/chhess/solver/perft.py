@@ -0,0 +1,210 @@
+import argparse
+import sys
+from time import perf_counter
+
+from ..game import bitboard, game, objects
+from .search import moves
+
+# Positions to verify, in FEN, and the reference leaf node counts at depths 1,
+# 2, 3, ... The standard test positions exercise castling, en passant
+# (including discovered checks), promotion and checks.
+POSITIONS: dict[str, tuple[str, tuple[int]]] = {
+    "start": (objects.Board.START, (20, 400, 8902, 197281, 4865609, 119060324)),
+    "e4": (
+        "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
+        (20, 600, 13160, 405385, 9771632),
+    ),
+    "kiwipete": (
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        (48, 2039, 97862, 4085603, 193690690),
+    ),
+    "endgame": (
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        (14, 191, 2812, 43238, 674624, 11030083),
+    ),
+    "promotion": (
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        (6, 264, 9467, 422333, 15833292),
+    ),
+    "middlegame": (
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        (44, 1486, 62379, 2103487, 89941194),
+    ),
+}
+
+
+def setup(
+    fen: str = objects.Board.START, events: tuple[str] = (), legacy: bool = False
+) -> objects.Board:
+    """Returns a Board set up from a position, with a sequence of moves played.
+
+    Args:
+        fen (str, optional): Position in FEN. Defaults to the starting
+            position.
+        events (tuple[str], optional): Moves in HHN, e.g. "e2 e4" or
+            "e7 e8n". Defaults to none.
+        legacy (bool, optional): If a plain Board is used instead of a
+            BitBoard. Defaults to False.
+
+    Returns:
+        objects.Board: Board in play.
+    """
+    board = (objects.Board if legacy else bitboard.BitBoard).from_fen(fen)
+    for event in events:
+        split = event.split()
+        i_d = objects.Position(split[0], mode=3).index()
+        i_a = objects.Position(split[1], mode=3).index()
+        game.Player.move(
+            board,
+            objects.Event(
+                board.board[i_d[0]][i_d[1]],
+                board.board[i_a[0]][i_a[1]],
+                promotion=objects.PROMOTIONS.get(split[1][2:].lower()),
+            ),
+        )
+    return board
+
+
+def perft(board: objects.Board, depth: int) -> int:
+    """Returns the number of leaf nodes of the tree of legal moves to a depth,
+    counting each promotion choice as a separate move.
+
+    Args:
+        board (objects.Board): Board in play. Left as it was found.
+        depth (int): Depth, in plies.
+
+    Returns:
+        int: Number of leaf nodes.
+    """
+    if depth == 0:
+        return 1
+    events = moves(board)
+    # Leaves need not be played to be counted
+    if depth == 1:
+        return len(events)
+    nodes = 0
+    for event in events:
+        board.make_move(event)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board: objects.Board, depth: int) -> dict[str, int]:
+    """Returns the number of leaf nodes to a depth below each legal move.
+
+    Args:
+        board (objects.Board): Board in play. Left as it was found.
+        depth (int): Depth, in plies, including the move itself.
+
+    Returns:
+        dict[str, int]: Number of leaf nodes for each move in HHN.
+    """
+    counts = {}
+    for event in moves(board):
+        board.make_move(event)
+        counts[str(event)] = perft(board, depth - 1)
+        board.unmake_move()
+    return counts
+
+
+def run(
+    name: str,
+    depth: int,
+    split: bool = False,
+    legacy: bool = False,
+    fen: str = None,
+    events: tuple[str] = (),
+) -> bool:
+    """Counts the leaf nodes of a position to a depth, prints the count, the
+    nodes per second and any reference count, and returns whether they match.
+
+    Args:
+        name (str): Name of a position in POSITIONS, or of the position given
+            by fen.
+        depth (int): Depth, in plies.
+        split (bool, optional): If the count below each move is printed.
+            Defaults to False.
+        legacy (bool, optional): If a plain Board is used instead of a
+            BitBoard. Defaults to False.
+        fen (str, optional): Position in FEN instead of the named position.
+            Defaults to None.
+        events (tuple[str], optional): Moves played from the position.
+            Defaults to none.
+
+    Returns:
+        bool: False if the count differs from the reference count, True
+            otherwise (including when there is none).
+    """
+    if fen is None and len(events) == 0:
+        fen, reference = POSITIONS[name]
+    else:
+        fen, reference = fen or POSITIONS[name][0], ()
+    board = setup(fen, events, legacy)
+
+    start = perf_counter()
+    if split:
+        counts = divide(board, depth)
+        for event, count in counts.items():
+            print(event + ": " + str(count))
+        nodes = sum(counts.values())
+    else:
+        nodes = perft(board, depth)
+    time = perf_counter() - start
+
+    expected = reference[depth - 1] if depth <= len(reference) else None
+    print(
+        name
+        + " depth "
+        + str(depth)
+        + " nodes "
+        + str(nodes)
+        + " nps "
+        + str(int(nodes / time) if time > 0 else 0)
+        + " time "
+        + str(round(time, 3))
+        + ("" if expected is None else " expected " + str(expected))
+    )
+    return expected is None or nodes == expected
+
+
+def main(argv: list[str] = None) -> int:
+    """Runs perft from the command line, e.g.
+    python -m src.chhess.solver.perft --depth 4 --divide
+
+    Args:
+        argv (list[str], optional): Arguments. Defaults to None (sys.argv).
+
+    Returns:
+        int: Exit status, 1 if a count differs from its reference count.
+    """
+    parser = argparse.ArgumentParser(description="Count leaf nodes of legal moves.")
+    parser.add_argument("--depth", type=int, default=3, help="depth, in plies")
+    parser.add_argument(
+        "--position",
+        action="append",
+        choices=sorted(POSITIONS),
+        help="named position, repeatable (default: all)",
+    )
+    parser.add_argument("--fen", help="position in FEN")
+    parser.add_argument(
+        "--moves", nargs="+", default=(), help='moves from the position, e.g. "e2 e4"'
+    )
+    parser.add_argument("--divide", action="store_true", help="count below each move")
+    parser.add_argument("--legacy", action="store_true", help="use a plain Board")
+    args = parser.parse_args(argv)
+
+    if args.fen is not None or args.moves:
+        names = ["fen" if args.fen is not None else "start"]
+    else:
+        names = args.position or POSITIONS
+    passed = True
+    for name in names:
+        passed &= run(
+            name, args.depth, args.divide, args.legacy, args.fen, tuple(args.moves)
+        )
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+from time import perf_counter
+from typing import Callable
+
+from ..game import game, objects
+from ..game.clock import TimeManager
+from .evaluate import PAWN, evaluate
+from .transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+# Scores, in centipawns. A mate in n plies scores MATE - n.
+MATE = 100_000
+INFINITY = 1_000_000
+# Scores beyond this are mates, stored in the transposition table relative to
+# the position rather than the root
+MATED = MATE - 1_000
+
+
+def moves(board: objects.Board) -> list[objects.Event]:
+    """Returns every legal move for the player who moves next, as Events, with
+    one Event per promotion choice.
+
+    Args:
+        board (objects.Board): Board in play.
+
+    Returns:
+        list[objects.Event]: Legal moves.
+    """
+    return list(game.Referee.iter_legal_moves(board))
+
+
+def same(a: objects.Event, b: objects.Event) -> bool:
+    """Returns True if two Events describe the same move.
+
+    Args:
+        a (objects.Event): First move.
+        b (objects.Event): Second move.
+
+    Returns:
+        bool: Whether or not the moves are the same.
+    """
+    return (
+        a is not None
+        and b is not None
+        and a.depart is b.depart
+        and a.arrive is b.arrive
+        and a.promotion is b.promotion
+    )
+
+
+class Info:
+    """Statistics of one completed iteration of a search.
+
+    Variables:
+        depth (int): Depth searched, in plies.
+        score (int): Score of the best move, in centipawns.
+        nodes (int): Nodes searched so far.
+        time (float): Seconds spent searching so far.
+        pv (list[objects.Event]): Principal variation, best move first.
+    """
+
+    def __init__(
+        self, depth: int, score: int, nodes: int, time: float, pv: list[objects.Event]
+    ) -> None:
+        self.depth: int = depth
+        self.score: int = score
+        self.nodes: int = nodes
+        self.time: float = time
+        self.pv: list[objects.Event] = pv
+
+    @property
+    def nps(self) -> int:
+        """Nodes searched per second."""
+        return int(self.nodes / self.time) if self.time > 0 else 0
+
+    def __str__(self) -> str:
+        return (
+            "depth "
+            + str(self.depth)
+            + " score "
+            + str(self.score)
+            + " nodes "
+            + str(self.nodes)
+            + " nps "
+            + str(self.nps)
+            + " time "
+            + str(round(self.time, 3))
+            + " pv "
+            + ", ".join(str(event) for event in self.pv)
+        )
+
+
+class Engine:
+    """Negamax alpha-beta search with iterative deepening and a principal
+    variation, playing for the player who moves next.
+
+    Variables:
+        depth (int): Maximum depth of a search, in plies.
+        limit (int): Maximum number of nodes of a search, None for no limit.
+        nodes (int): Nodes searched by the current (or last) search.
+        info (list[Info]): Statistics of each completed iteration of the
+            current (or last) search.
+        stopped (bool): If the current search has been stopped.
+        table (TranspositionTable): Results of previous searches, kept
+            between searches.
+        tablebase (tablebase.Tablebase): Endgame tables probed below the
+            root, None for none.
+        callback (Callable[[Info], None]): Called with the statistics of each
+            completed iteration, None for none.
+        manager (TimeManager): Deadlines of the current search, None for
+            none.
+    """
+
+    def __init__(
+        self, depth: int = 4, nodes: int = None, size: int = 16, tablebase=None
+    ) -> None:
+        """Initializes an Engine object.
+
+        Args:
+            depth (int, optional): Maximum depth of a search. Defaults to 4.
+            nodes (int, optional): Maximum number of nodes of a search.
+                Defaults to None (no limit).
+            size (int, optional): Size of the transposition table, in
+                megabytes. Defaults to 16.
+            tablebase (tablebase.Tablebase, optional): Endgame tables, probed
+                once few enough pieces are left. Defaults to None (none).
+        """
+        self.depth: int = depth
+        self.limit: int = nodes
+        self.table: TranspositionTable = TranspositionTable(size)
+        self.tablebase = tablebase
+        self.callback: Callable[[Info], None] = None
+        self.manager: TimeManager = None
+        self.nodes: int = 0
+        self.info: list[Info] = []
+        self.stopped: bool = False
+        self.pv: list[list[objects.Event]] = []
+
+    def search(
+        self, board: objects.Board, manager: TimeManager = None
+    ) -> objects.Event:
+        """Searches the position by iterative deepening, one ply at a time up to
+        the maximum depth, or until the node limit or a deadline is reached.
+
+        Args:
+            board (objects.Board): Board in play. Left as it was found.
+            manager (TimeManager, optional): Deadlines of the search. Defaults
+                to None (no time limit).
+
+        Returns:
+            objects.Event: Best move, None if there are no legal moves.
+        """
+        self.nodes, self.info, self.stopped = 0, [], False
+        self.manager = manager
+        start = perf_counter()
+        best = None
+        for depth in range(1, self.depth + 1):
+            self.pv = [[] for ply in range(depth + 1)]
+            score = self.negamax(board, depth, -INFINITY, INFINITY, 0)
+            if self.stopped and best is not None:
+                break
+            if len(self.pv[0]) == 0:
+                break
+            best = self.pv[0][0]
+            self.info.append(
+                Info(depth, score, self.nodes, perf_counter() - start, self.pv[0])
+            )
+            if self.callback is not None:
+                self.callback(self.info[-1])
+            if self.stopped or abs(score) >= MATE - depth:
+                break
+            if manager is not None and not manager.proceed(best.pack()):
+                break
+        return best
+
+    def negamax(
+        self, board: objects.Board, depth: int, alpha: int, beta: int, ply: int
+    ) -> int:
+        """Returns the score of a position, searched to a depth with alpha-beta
+        pruning, and records its principal variation in self.pv[ply].
+
+        Args:
+            board (objects.Board): Board in play.
+            depth (int): Remaining depth, in plies.
+            alpha (int): Lower bound of the search window.
+            beta (int): Upper bound of the search window.
+            ply (int): Distance from the root, in plies.
+
+        Returns:
+            int: Score, from the perspective of the player who moves next.
+        """
+        # Stop at the node limit or the hard deadline, once the first
+        # iteration has completed
+        self.nodes += 1
+        if self.info and (
+            (self.limit is not None and self.nodes >= self.limit)
+            or (
+                self.manager is not None
+                and self.nodes & 31 == 0
+                and self.manager.expired()
+            )
+        ):
+            self.stopped = True
+        self.pv[ply] = []
+
+        # Score draws by repetition or by the fifty-move rule below the root.
+        # One repetition is enough: whatever was best then is best again. A
+        # mate on the last move of the fifty takes precedence, and only a
+        # player in check can be mated
+        if ply > 0 and board.repetitions():
+            return 0
+        if ply > 0 and board.halfmove >= 100:
+            if not game.Referee.in_check(board) or len(moves(board)) > 0:
+                return 0
+            return -MATE + ply
+
+        # Return the exact score of endgames in the tablebase
+        if (
+            self.tablebase is not None
+            and ply > 0
+            and len(board.active[0]) + len(board.active[1]) <= self.tablebase.pieces
+        ):
+            score = self.tablebase.score(board, ply)
+            if score is not None:
+                return score
+        if depth == 0:
+            return evaluate(board)
+
+        # Return the stored score if deep enough and within the window, else
+        # take the stored best move as a hint
+        key, window, hint = board.key, alpha, 0
+        entry = self.table.probe(key)
+        if entry is not None:
+            hint = entry[3]
+            if ply > 0 and entry[0] >= depth:
+                score = entry[2]
+                if score > MATED:
+                    score -= ply
+                elif score < -MATED:
+                    score += ply
+                if (
+                    entry[1] == EXACT
+                    or (entry[1] == LOWER and score >= beta)
+                    or (entry[1] == UPPER and score <= alpha)
+                ):
+                    return score
+
+        events = moves(board)
+        if len(events) == 0:
+            return -MATE + ply if game.Referee.in_check(board) else 0
+        events = self.order(events, ply, hint)
+
+        best = None
+        for event in events:
+            board.make_move(event)
+            score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            if self.stopped:
+                return alpha
+            if score > alpha:
+                alpha, best = score, event
+                self.pv[ply] = [event] + self.pv[ply + 1]
+                if alpha >= beta:
+                    break
+
+        # Store the result, with mate scores relative to this position
+        bound = LOWER if alpha >= beta else EXACT if alpha > window else UPPER
+        score = alpha
+        if score > MATED:
+            score += ply
+        elif score < -MATED:
+            score -= ply
+        self.table.store(key, depth, bound, score, 0 if best is None else best.pack())
+        return alpha
+
+    def order(
+        self, events: list[objects.Event], ply: int, hint: int = 0
+    ) -> list[objects.Event]:
+        """Orders moves for search: the best move stored in the transposition
+        table first, then the move of the previous principal variation, then
+        captures of the most valuable pieces, then promotions.
+
+        Args:
+            events (list[objects.Event]): Legal moves.
+            ply (int): Distance from the root, in plies.
+            hint (int, optional): Best move stored in the transposition
+                table, packed with Event.pack. Defaults to 0 (none).
+
+        Returns:
+            list[objects.Event]: Ordered moves.
+        """
+        previous = (
+            self.info[-1].pv[ply]
+            if len(self.info) > 0 and ply < len(self.info[-1].pv)
+            else None
+        )
+
+        def priority(event: objects.Event) -> int:
+            if hint and event.pack() == hint:
+                return -INFINITY - 1
+            if same(event, previous):
+                return -INFINITY
+            score = 0
+            if event.arrive.piece is not None:
+                score -= PAWN * event.arrive.piece.value - event.depart.piece.value
+            if event.promotion is not None:
+                score -= PAWN * event.promotion.value
+            return score
+
+        return sorted(events, key=priority)
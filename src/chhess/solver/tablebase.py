@@ -0,0 +1,700 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, Union
+
+from ..game import magic, objects, tables
+from .search import MATE
+
+# Endgame tablebases: the distance to mate of every position with a given set
+# of pieces, found by retrograde analysis from the mates.
+#
+# A set of pieces is named by its letters, the stronger side's (taken to be
+# white) first, each side's King first, e.g. "KQK" or "KPK". The weaker side
+# is mirrored onto white to probe positions where black is stronger.
+#
+# Positions are indexed by side to move, then the White King's square, then
+# the squares of the other pieces, in name order. The board is turned and
+# mirrored so that the White King lies in the a1-d1-d4 triangle (or, with
+# pawns, which move one way only, mirrored so that it lies on files a-d).
+#
+# Each position holds 0 for a draw, or the number of plies to mate plus one:
+# odd if the player who moves next is mated, even if they mate. Castling and
+# en passant are not considered.
+
+LETTERS = "PNBRQK"
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+PROMOTIONS = (QUEEN, ROOK, BISHOP, KNIGHT)
+
+MAGIC = b"CHHSTB01"
+# Name, number of positions, positions per block and number of blocks,
+# followed by the offset of each block (and of the end of the last) and the
+# blocks, compressed with zlib
+HEADER = struct.Struct("<8sIII")
+OFFSET = struct.Struct("<Q")
+BLOCK = 1 << 14
+
+
+def transforms() -> tuple[list[tuple[int]], list[tuple[int]]]:
+    """Returns, for each square of the White King, the symmetry of the board
+    that brings it into the indexed region.
+
+    Returns:
+        tuple[list[tuple[int]], list[tuple[int]]]: Square index of each
+            square after the symmetry, by square of the White King, for sets
+            of pieces without (1st index) and with (2nd index) pawns.
+    """
+    symmetries = [
+        tuple(((sq & 7) << 3 | sq >> 3 if turn else sq) ^ flip for sq in range(64))
+        for turn in (False, True)
+        for flip in (0, 7, 56, 63)
+    ]
+    # Without pawns, every symmetry of the square. With them, mirroring files
+    symmetries = (symmetries, [symmetries[0], symmetries[1]])
+    found = ([], [])
+    for pawns in (0, 1):
+        for sq in range(64):
+            for symmetry in symmetries[pawns]:
+                target = symmetry[sq]
+                if target & 7 <= 3 and (pawns or target >> 3 <= target & 7):
+                    found[pawns].append(symmetry)
+                    break
+    return found
+
+
+TRANSFORMS: tuple[list[tuple[int]], list[tuple[int]]] = transforms()
+# Squares of the White King, without and with pawns
+REGIONS: tuple[list[int], list[int]] = (
+    [sq for sq in range(64) if sq >> 3 <= sq & 7 <= 3],
+    [sq for sq in range(64) if sq & 7 <= 3],
+)
+REGION_INDEX: tuple[dict[int, int], dict[int, int]] = tuple(
+    {sq: i for i, sq in enumerate(region)} for region in REGIONS
+)
+
+
+def split(name: str) -> tuple[list[int], list[int]]:
+    """Returns the kinds of piece of each side of a set of pieces.
+
+    Args:
+        name (str): Name of the set, e.g. "KQK".
+
+    Returns:
+        tuple[list[int], list[int]]: Piece.kind of each piece of the stronger
+            and the weaker side.
+    """
+    second = name.index("K", 1)
+    return [LETTERS.index(c) for c in name[:second]], [
+        LETTERS.index(c) for c in name[second:]
+    ]
+
+
+def strength(kinds: list[int]) -> tuple[int, list[int]]:
+    return sum(objects.KINDS[kind].value for kind in kinds), sorted(kinds)
+
+
+def drawn(white: list[int], black: list[int]) -> bool:
+    """Returns True if neither side can ever mate: a bare King against a King
+    and at most one Knight or Bishop.
+
+    Args:
+        white (list[int]): Piece.kind of each white piece.
+        black (list[int]): Piece.kind of each black piece.
+
+    Returns:
+        bool: Whether or not every position is a draw.
+    """
+    for side, other in ((white, black), (black, white)):
+        if len(side) == 1 and (
+            len(other) == 1 or len(other) == 2 and min(other) in (KNIGHT, BISHOP)
+        ):
+            return True
+    return False
+
+
+def size(name: str) -> int:
+    """Returns the number of positions of a set of pieces, for one side to
+    move.
+
+    Args:
+        name (str): Name of the set.
+
+    Returns:
+        int: Number of positions.
+    """
+    return len(REGIONS["P" in name]) * 64 ** (len(name) - 1)
+
+
+def index(pieces: list[tuple[int, bool, int]], colour: bool) -> tuple[str, int]:
+    """Returns the set of pieces of a position and its index in the set.
+
+    Args:
+        pieces (list[tuple[int, bool, int]]): Piece.kind, colour and square
+            index of each piece.
+        colour (bool): Colour of the player who moves next.
+
+    Returns:
+        tuple[str, int]: Name of the set and index of the position.
+    """
+    white = sorted(((k, sq) for k, c, sq in pieces if not c), reverse=True)
+    black = sorted(((k, sq) for k, c, sq in pieces if c), reverse=True)
+    if strength([k for k, sq in black]) > strength([k for k, sq in white]):
+        white, black = [(k, sq ^ 56) for k, sq in black], [
+            (k, sq ^ 56) for k, sq in white
+        ]
+        colour = not colour
+    layout = white + black
+    name = "".join(LETTERS[k] for k, sq in layout)
+    return name, locate(name, [sq for k, sq in layout], colour)
+
+
+def locate(name: str, squares: list[int], colour: bool) -> int:
+    """Returns the index of a position in its set of pieces.
+
+    Args:
+        name (str): Name of the set.
+        squares (list[int]): Square index of each piece, in name order.
+        colour (bool): Colour of the player who moves next.
+
+    Returns:
+        int: Index of the position.
+    """
+    pawns = "P" in name
+    symmetry = TRANSFORMS[pawns][squares[0]]
+    i = REGION_INDEX[pawns][symmetry[squares[0]]]
+    for sq in squares[1:]:
+        i = i * 64 + symmetry[sq]
+    return i + size(name) if colour else i
+
+
+def attacks(kind: int, colour: bool, sq: int, occupied: int) -> int:
+    match kind:
+        case 0:
+            return tables.PAWN_ATTACKS[1 if colour else 0][sq]
+        case 1:
+            return tables.KNIGHT_ATTACKS[sq]
+        case 2:
+            return magic.bishop_attacks(sq, occupied)
+        case 3:
+            return magic.rook_attacks(sq, occupied)
+        case 4:
+            return magic.queen_attacks(sq, occupied)
+        case 5:
+            return tables.KING_ATTACKS[sq]
+
+
+def in_check(pieces: list[tuple[int, bool, int]], colour: bool) -> bool:
+    """Returns True if the King of a colour is attacked.
+
+    Args:
+        pieces (list[tuple[int, bool, int]]): Piece.kind, colour and square
+            index of each piece.
+        colour (bool): Colour of the King.
+
+    Returns:
+        bool: Whether or not the King is attacked.
+    """
+    occupied = 0
+    for kind, c, sq in pieces:
+        occupied |= 1 << sq
+        if kind == KING and c == colour:
+            king = sq
+    for kind, c, sq in pieces:
+        if c != colour and attacks(kind, c, sq, occupied) >> king & 1:
+            return True
+    return False
+
+
+def successors(
+    pieces: list[tuple[int, bool, int]], colour: bool
+) -> Iterator[tuple[list[tuple[int, bool, int]], bool]]:
+    """Yields the positions after each legal move.
+
+    Args:
+        pieces (list[tuple[int, bool, int]]): Piece.kind, colour and square
+            index of each piece.
+        colour (bool): Colour of the player who moves next.
+
+    Yields:
+        tuple[list[tuple[int, bool, int]], bool]: Pieces after the move, in
+            the same order, and whether the move captured or promoted.
+    """
+    occupied = own = 0
+    for kind, c, sq in pieces:
+        occupied |= 1 << sq
+        if c == colour:
+            own |= 1 << sq
+    for i, (kind, c, sq) in enumerate(pieces):
+        if c != colour:
+            continue
+        if kind == PAWN:
+            step = -8 if colour else 8
+            targets = attacks(PAWN, c, sq, occupied) & occupied & ~own
+            if not occupied >> (sq + step) & 1:
+                targets |= 1 << (sq + step)
+                if (
+                    sq >> 3 == (6 if colour else 1)
+                    and not occupied >> (sq + 2 * step) & 1
+                ):
+                    targets |= 1 << (sq + 2 * step)
+        else:
+            targets = attacks(kind, c, sq, occupied) & ~own
+        while targets:
+            lsb = targets & -targets
+            targets ^= lsb
+            target = lsb.bit_length() - 1
+            captured = occupied & lsb != 0
+            promotions = (kind,)
+            if kind == PAWN and target >> 3 in (0, 7):
+                promotions = PROMOTIONS
+            for promotion in promotions:
+                after = [
+                    (promotion, c, target) if j == i else piece
+                    for j, piece in enumerate(pieces)
+                    if piece[2] != target
+                ]
+                if not in_check(after, colour):
+                    yield after, captured or promotion != kind
+
+
+def decode(name: str, i: int) -> tuple[list[tuple[int, bool, int]], bool]:
+    """Returns the position of an index.
+
+    Args:
+        name (str): Name of the set of pieces.
+        i (int): Index of the position.
+
+    Returns:
+        tuple[list[tuple[int, bool, int]], bool]: Piece.kind, colour and
+            square index of each piece, and colour of the player who moves
+            next.
+    """
+    white, black = split(name)
+    half = size(name)
+    colour = i >= half
+    i %= half
+    squares = []
+    for piece in range(len(name) - 1):
+        squares.append(i & 63)
+        i >>= 6
+    squares.append(REGIONS["P" in name][i])
+    squares.reverse()
+    layout = [(k, False) for k in white] + [(k, True) for k in black]
+    return [(k, c, sq) for (k, c), sq in zip(layout, squares)], colour
+
+
+# Set of pieces being generated, and the tables of the sets it may become, in
+# each worker process
+_name: str = None
+_tables: dict[str, bytes] = None
+
+
+def _start(name: str, subtables: dict[str, bytes]) -> None:
+    global _name, _tables
+    _name, _tables = name, subtables
+
+
+def _moves(start: int, stop: int) -> tuple[bytes, bytes, array, array, array]:
+    """Generates the legal moves of a range of positions.
+
+    Args:
+        start (int): Index of the first position.
+        stop (int): Index after the last position.
+
+    Returns:
+        tuple[bytes, bytes, array, array, array]: Number of legal moves of
+            each position (255 if the position is illegal), whether the player
+            who moves next is mated, number of moves within the set, indices
+            of the positions after them, and positions with moves out of the
+            set interleaved with the values after those moves.
+    """
+    counts, mated, inside = (
+        bytearray(stop - start),
+        bytearray(stop - start),
+        bytearray(stop - start),
+    )
+    targets, outside = array("I"), array("I")
+    for i in range(start, stop):
+        pieces, colour = decode(_name, i)
+        squares = {sq for kind, c, sq in pieces}
+        if (
+            len(squares) < len(pieces)
+            or any(kind == PAWN and sq >> 3 in (0, 7) for kind, c, sq in pieces)
+            or in_check(pieces, not colour)
+        ):
+            counts[i - start] = 255
+            continue
+        count = 0
+        for after, changed in successors(pieces, colour):
+            count += 1
+            if not changed:
+                # Pieces keep the order of the name, so need not be sorted
+                inside[i - start] += 1
+                targets.append(locate(_name, [sq for k, c, sq in after], not colour))
+                continue
+            white = [k for k, c, sq in after if not c]
+            black = [k for k, c, sq in after if c]
+            if not drawn(white, black):
+                name, j = index(after, not colour)
+                if _tables[name][j]:
+                    outside.extend((i, _tables[name][j]))
+        counts[i - start] = count
+        mated[i - start] = count == 0 and in_check(pieces, colour)
+    return bytes(counts), bytes(mated), bytes(inside), targets, outside
+
+
+def dependencies(name: str) -> list[str]:
+    """Returns the sets of pieces a set may become by a capture or promotion,
+    other than those that are always drawn.
+
+    Args:
+        name (str): Name of the set.
+
+    Returns:
+        list[str]: Names of the sets.
+    """
+    white, black = split(name)
+    found = set()
+    for side in (white, black):
+        for i, kind in enumerate(side):
+            if kind == KING:
+                continue
+            changes = [side[:i] + side[i + 1 :]]
+            if kind == PAWN:
+                changes += [side[:i] + [p] + side[i + 1 :] for p in PROMOTIONS]
+            for changed in changes:
+                after = (changed, black) if side is white else (white, changed)
+                if drawn(*after):
+                    continue
+                pieces = [(k, False, 0) for k in after[0]] + [
+                    (k, True, 56) for k in after[1]
+                ]
+                found.add(index(pieces, False)[0])
+    return sorted(found)
+
+
+def generate(name: str, subtables: dict[str, bytes], workers: int = None) -> bytes:
+    """Generates the table of a set of pieces by retrograde analysis. The
+    legal moves of every position are generated across worker processes, then
+    positions are resolved in order of distance to mate.
+
+    Args:
+        name (str): Name of the set, e.g. "KQK".
+        subtables (dict[str, bytes]): Tables of every set in
+            dependencies(name), by name.
+        workers (int, optional): Number of worker processes. Defaults to None
+            (one per CPU).
+
+    Raises:
+        ValueError: A distance to mate too long to store.
+
+    Returns:
+        bytes: Value of each position.
+    """
+    total = 2 * size(name)
+    workers = workers or os.cpu_count() or 1
+    chunk = -(-total // (4 * workers))
+    ranges = [(start, min(start + chunk, total)) for start in range(0, total, chunk)]
+    with ProcessPoolExecutor(
+        workers, initializer=_start, initargs=(name, subtables)
+    ) as executor:
+        results = list(executor.map(_moves, *zip(*ranges)))
+    counts = bytearray(b"".join(result[0] for result in results))
+    mated = b"".join(result[1] for result in results)
+    inside = b"".join(result[2] for result in results)
+    targets, outside = array("I"), array("I")
+    for result in results:
+        targets.extend(result[3])
+        outside.extend(result[4])
+
+    # Invert the moves within the set: the positions each position is reached
+    # from are predecessors[starts[j]:starts[j + 1]]
+    starts = array("I", bytes(4 * (total + 1)))
+    for j in targets:
+        starts[j + 1] += 1
+    for j in range(total):
+        starts[j + 1] += starts[j]
+    filled = array("I", starts)
+    predecessors = array("I", bytes(4 * len(targets)))
+    k = 0
+    for i in range(total):
+        for j in targets[k : k + inside[i]]:
+            predecessors[filled[j]] = i
+            filled[j] += 1
+        k += inside[i]
+
+    # Positions resolved, or with a move resolved, at each distance to mate.
+    # A move leads to a position with the opponent to move: if they are mated
+    # at distance d, the mover mates at d + 1; if they mate at d, the mover
+    # is mated at d + 1 once every move is known to lose.
+    values = bytearray(total)
+    buckets = [[i for i in range(total) if mated[i]]]
+    for k in range(0, len(outside), 2):
+        d = outside[k + 1] - 1
+        while len(buckets) <= d:
+            buckets.append([])
+        buckets[d].append(~outside[k])
+    d = 0
+    while d < len(buckets):
+        if d >= 254:
+            raise ValueError("Distance to mate too long in " + name + ".")
+        following = []
+        for entry in buckets[d]:
+            if entry < 0:
+                moves = (~entry,)
+            elif values[entry] == 0:
+                values[entry] = d + 1
+                moves = predecessors[starts[entry] : starts[entry + 1]]
+            else:
+                continue
+            for i in moves:
+                if values[i]:
+                    continue
+                if d % 2 == 0:
+                    following.append(i)
+                else:
+                    counts[i] -= 1
+                    if counts[i] == 0:
+                        following.append(i)
+        if d + 1 < len(buckets):
+            buckets[d + 1].extend(following)
+        elif following:
+            buckets.append(following)
+        d += 1
+    return bytes(values)
+
+
+def save(target: Union[str, BinaryIO], name: str, values: bytes) -> None:
+    """Writes a table to a file, in compressed blocks.
+
+    Args:
+        target (Union[str, BinaryIO]): Path of the file, or a binary file open
+            for writing.
+        name (str): Name of the set of pieces.
+        values (bytes): Value of each position.
+    """
+    if isinstance(target, str):
+        with open(target, "wb") as f:
+            return save(f, name, values)
+    blocks = [
+        zlib.compress(values[start : start + BLOCK], 9)
+        for start in range(0, len(values), BLOCK)
+    ]
+    offset = len(MAGIC) + HEADER.size + OFFSET.size * (len(blocks) + 1)
+    offsets = [offset]
+    for block in blocks:
+        offsets.append(offsets[-1] + len(block))
+    target.write(MAGIC)
+    target.write(HEADER.pack(name.encode(), len(values), BLOCK, len(blocks)))
+    target.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+    target.write(b"".join(blocks))
+
+
+class Table:
+    """Table of one set of pieces, read from a file one block at a time.
+
+    Variables:
+        name (str): Name of the set of pieces.
+        size (int): Number of positions.
+        block (int): Number of positions per block.
+        offsets (list[int]): Offset of each block, and of the end of the last.
+        data (mmap.mmap): Memory map of the file.
+        cache (dict[int, bytes]): Decompressed blocks, by block number.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initializes a Table object.
+
+        Args:
+            path (str): Path of the file.
+
+        Raises:
+            ValueError: Not a table.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("Not a tablebase: " + path + ".")
+            self.data: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        name, size, block, blocks = HEADER.unpack_from(self.data, len(MAGIC))
+        self.name: str = name.rstrip(b"\0").decode()
+        self.size: int = size
+        self.block: int = block
+        start = len(MAGIC) + HEADER.size
+        self.offsets: list[int] = [
+            OFFSET.unpack_from(self.data, start + OFFSET.size * i)[0]
+            for i in range(blocks + 1)
+        ]
+        self.cache: dict[int, bytes] = {}
+
+    def close(self) -> None:
+        """Closes the memory map."""
+        self.data.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, i: int) -> int:
+        block = self.cache.get(i // self.block)
+        if block is None:
+            if len(self.cache) >= 64:
+                self.cache.clear()
+            j = i // self.block
+            block = self.cache[j] = zlib.decompress(
+                self.data[self.offsets[j] : self.offsets[j + 1]]
+            )
+        return block[i % self.block]
+
+    def values(self) -> bytes:
+        """Returns the value of every position.
+
+        Returns:
+            bytes: Value of each position.
+        """
+        return b"".join(
+            zlib.decompress(self.data[self.offsets[j] : self.offsets[j + 1]])
+            for j in range(len(self.offsets) - 1)
+        )
+
+
+class Tablebase:
+    """Tables of every set of pieces in a directory, probed by search.
+
+    Variables:
+        tables (dict[str, Table]): Tables, by name of set of pieces.
+        pieces (int): Largest number of pieces of a table.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Initializes a Tablebase object.
+
+        Args:
+            directory (str): Directory of the table files, named e.g. KQK.tb.
+        """
+        self.tables: dict[str, Table] = {}
+        for file in sorted(os.listdir(directory)):
+            if file.endswith(".tb"):
+                table = Table(os.path.join(directory, file))
+                self.tables[table.name] = table
+        self.pieces: int = max((len(name) for name in self.tables), default=2)
+
+    def close(self) -> None:
+        """Closes the tables."""
+        for table in self.tables.values():
+            table.close()
+
+    def probe(self, board: objects.Board) -> int:
+        """Returns the value of a position: 0 for a draw, else the number of
+        plies to mate plus one, odd if the player who moves next is mated.
+
+        Args:
+            board (objects.Board): Board in play.
+
+        Returns:
+            int: Value of the position, None if it is not in a table.
+        """
+        if len(board.active[0]) + len(board.active[1]) > self.pieces:
+            return None
+        if board.castling():
+            return None
+        pieces = [
+            (piece.kind, piece.colour, piece.position.square())
+            for active in board.active
+            for piece in active
+        ]
+        # Tables leave out en passant, so positions where it is possible
+        passant = board.en_passant()
+        if passant is not None:
+            passant = passant.position.square()
+            for kind, colour, sq in pieces:
+                if (
+                    kind == PAWN
+                    and colour == board.colour
+                    and tables.PAWN_ATTACKS[1 if colour else 0][sq] >> passant & 1
+                ):
+                    return None
+        white = [kind for kind, colour, sq in pieces if not colour]
+        black = [kind for kind, colour, sq in pieces if colour]
+        if drawn(white, black):
+            return 0
+        name, i = index(pieces, board.colour)
+        table = self.tables.get(name)
+        return None if table is None else table[i]
+
+    def score(self, board: objects.Board, ply: int) -> int:
+        """Returns the score of a position for search.
+
+        Args:
+            board (objects.Board): Board in play.
+            ply (int): Distance from the root, in plies.
+
+        Returns:
+            int: Score, from the perspective of the player who moves next,
+                None if the position is not in a table.
+        """
+        value = self.probe(board)
+        if not value:
+            return value
+        return -MATE + ply + value - 1 if value % 2 else MATE - ply - value + 1
+
+
+def build(names: list[str], directory: str, workers: int = None) -> list[str]:
+    """Generates and saves the tables of sets of pieces, and of every set they
+    may become, that are not already in a directory.
+
+    Args:
+        names (list[str]): Names of the sets, e.g. ["KQK", "KPK"].
+        directory (str): Directory of the table files.
+        workers (int, optional): Number of worker processes. Defaults to None
+            (one per CPU).
+
+    Returns:
+        list[str]: Names of the sets generated, in order.
+    """
+    os.makedirs(directory, exist_ok=True)
+    generated = []
+
+    def load(name: str) -> bytes:
+        path = os.path.join(directory, name + ".tb")
+        if not os.path.exists(path):
+            subtables = {sub: load(sub) for sub in dependencies(name)}
+            save(path, name, generate(name, subtables, workers))
+            generated.append(name)
+        table = Table(path)
+        values = table.values()
+        table.close()
+        return values
+
+    for name in names:
+        pieces = [(k, False, 0) for k in split(name)[0]]
+        pieces += [(k, True, 56) for k in split(name)[1]]
+        load(index(pieces, False)[0])
+    return generated
+
+
+def main(argv: list[str] = None) -> int:
+    """Generates tables from the command line, e.g.
+    python -m src.chhess.solver.tablebase KQK KRK KPK --directory tables
+
+    Args:
+        argv (list[str], optional): Arguments. Defaults to None (sys.argv).
+
+    Returns:
+        int: Exit status.
+    """
+    parser = argparse.ArgumentParser(description="Generate endgame tablebases.")
+    parser.add_argument("names", nargs="+", help='sets of pieces, e.g. "KQK"')
+    parser.add_argument("--directory", default="tables", help="output directory")
+    parser.add_argument("--workers", type=int, help="worker processes")
+    args = parser.parse_args(argv)
+    for name in build(args.names, args.directory, args.workers):
+        print(name + " written to " + args.directory)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
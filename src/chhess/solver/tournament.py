@@ -0,0 +1,410 @@
+import argparse
+import math
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from time import perf_counter
+from typing import Iterator
+
+from ..game import bitboard, game, objects, pgn
+from .book import Book
+from .search import Engine
+
+# Engine-versus-engine matches between two configurations of Engine, played
+# across a pool of worker processes. Each opening is played twice, with the
+# configurations swapping colours, and scores are from the first
+# configuration's perspective.
+
+
+class Rules:
+    """Adjudication rules, ending games before mate.
+
+    Variables:
+        plies (int): Number of moves after which a game is drawn.
+        resign_score (int): Score, in centipawns, below which a player
+            resigns, if their opponent agrees.
+        resign_moves (int): Number of consecutive moves both players must
+            agree on the score to resign.
+        draw_ply (int): Number of moves before which no draw is agreed.
+        draw_score (int): Score, in centipawns, within which both players
+            agree to a draw.
+        draw_moves (int): Number of consecutive moves both players must agree
+            on the score to draw.
+    """
+
+    def __init__(
+        self,
+        plies: int = 400,
+        resign_score: int = 1000,
+        resign_moves: int = 6,
+        draw_ply: int = 80,
+        draw_score: int = 10,
+        draw_moves: int = 12,
+    ) -> None:
+        self.plies: int = plies
+        self.resign_score: int = resign_score
+        self.resign_moves: int = resign_moves
+        self.draw_ply: int = draw_ply
+        self.draw_score: int = draw_score
+        self.draw_moves: int = draw_moves
+
+
+class Result:
+    """Outcome of one game of a match.
+
+    Variables:
+        number (int): Number of the game, from 0.
+        score (float): Score of the first configuration: 1, 0.5 or 0.
+        reason (str): How the game ended.
+        text (str): Game in PGN.
+    """
+
+    def __init__(self, number: int, score: float, reason: str, text: str) -> None:
+        self.number: int = number
+        self.score: float = score
+        self.reason: str = reason
+        self.text: str = text
+
+
+def name(config: dict) -> str:
+    """Returns the name of an Engine configuration, e.g. "depth=3".
+
+    Args:
+        config (dict): Keyword arguments of Engine.
+
+    Returns:
+        str: Name of the configuration.
+    """
+    return (
+        ",".join(key + "=" + str(value) for key, value in config.items()) or "default"
+    )
+
+
+def ending(board: objects.Board) -> tuple[float, str]:
+    """Returns the result of a game that has ended by the rules of chess.
+
+    Args:
+        board (objects.Board): Board in play.
+
+    Returns:
+        tuple[float, str]: Score of white and how the game ended, None if it
+            has not ended.
+    """
+    if game.Referee.check_mate(board):
+        return (1 if board.colour else 0), "checkmate"
+    draw = game.Referee.draw(board)
+    return None if draw is None else (0.5, draw)
+
+
+def play(
+    white: dict,
+    black: dict,
+    rules: Rules,
+    fen: str = None,
+    opening: tuple[int] = (),
+) -> tuple[float, str, bitboard.BitBoard]:
+    """Plays a game between two Engine configurations.
+
+    Args:
+        white (dict): Keyword arguments of the Engine playing white.
+        black (dict): Keyword arguments of the Engine playing black.
+        rules (Rules): Adjudication rules.
+        fen (str, optional): Position to start from. Defaults to None (the
+            starting position).
+        opening (tuple[int], optional): Moves played first, packed with
+            Event.pack. Defaults to none.
+
+    Returns:
+        tuple[float, str, bitboard.BitBoard]: Score of white, how the game
+            ended and the board at the end.
+    """
+    board = bitboard.BitBoard() if fen is None else bitboard.BitBoard.from_fen(fen)
+    for move in opening:
+        board.make_move(board.event(move))
+    engines = (Engine(**white), Engine(**black))
+    # Consecutive moves the scores have agreed on resigning or a draw
+    resign, draw = 0, 0
+    while True:
+        result = ending(board)
+        if result is not None:
+            return result + (board,)
+        if len(board.history) >= rules.plies:
+            return 0.5, "adjudication: length", board
+
+        engine = engines[board.colour]
+        event = engine.search(board)
+        score = engine.info[-1].score if engine.info else 0
+        board.make_move(event)
+
+        # Scores alternate perspective, so both players must agree in turn
+        if abs(score) >= rules.resign_score:
+            resign = resign + 1 if resign and (score > 0) != (last > 0) else 1
+        else:
+            resign = 0
+        last = score
+        if resign >= rules.resign_moves:
+            # The player who just moved thinks they are winning
+            winner = not board.colour if score > 0 else board.colour
+            return (0 if winner else 1), "adjudication: resign", board
+        if len(board.history) >= rules.draw_ply and abs(score) <= rules.draw_score:
+            draw += 1
+        else:
+            draw = 0
+        if draw >= rules.draw_moves:
+            return 0.5, "adjudication: draw", board
+
+
+def _game(
+    number: int,
+    first: dict,
+    second: dict,
+    rules: Rules,
+    fen: str,
+    opening: tuple[int],
+) -> Result:
+    """Plays one game of a match in a worker process. Odd games swap colours.
+
+    Args:
+        number (int): Number of the game.
+        first (dict): First Engine configuration.
+        second (dict): Second Engine configuration.
+        rules (Rules): Adjudication rules.
+        fen (str): Position to start from, None for the starting position.
+        opening (tuple[int]): Moves played first, packed with Event.pack.
+
+    Returns:
+        Result: Outcome of the game.
+    """
+    swap = number % 2 == 1
+    white, black = (second, first) if swap else (first, second)
+    score, reason, board = play(white, black, rules, fen, opening)
+
+    sequence = board.sequence
+    sequence.event, sequence.round = "Tournament", number + 1
+    sequence.white, sequence.black = name(white), name(black)
+    sequence.result = {1: [1, 0], 0: [0, 1]}.get(score, [0.5, 0.5])
+    sequence.tags = {
+        "Event": sequence.event,
+        "Site": "?",
+        "Round": str(number + 1),
+        "White": sequence.white,
+        "Black": sequence.black,
+        "Termination": reason,
+    }
+    return Result(number, 1 - score if swap else score, reason, pgn.write(board))
+
+
+def elo(wins: int, draws: int, losses: int) -> tuple[float, float]:
+    """Returns the Elo difference a match result suggests, with its 95%
+    confidence margin. Scores of 0% or 100% are clamped to 0.1% or 99.9%.
+
+    Args:
+        wins (int): Number of games won.
+        draws (int): Number of games drawn.
+        losses (int): Number of games lost.
+
+    Returns:
+        tuple[float, float]: Elo difference and margin.
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, 0.0
+    score = (wins + draws / 2) / games
+    variance = (
+        wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score**2
+    ) / games
+    margin = 1.96 * math.sqrt(variance / games)
+
+    def difference(p: float) -> float:
+        p = min(max(p, 0.001), 0.999)
+        return -400 * math.log10(1 / p - 1)
+
+    return (
+        difference(score),
+        (difference(score + margin) - difference(score - margin)) / 2,
+    )
+
+
+def openings(
+    fens: list[str] = None, book: Book = None, plies: int = 8, count: int = 1
+) -> list[tuple[str, tuple[int]]]:
+    """Returns opening positions for the pairs of games of a match.
+
+    Args:
+        fens (list[str], optional): Positions to start from, in FEN. Defaults
+            to None (the starting position).
+        book (Book, optional): Opening book to play the first moves from, on
+            each position. Defaults to None (no moves).
+        plies (int, optional): Number of moves played from the book. Defaults
+            to 8.
+        count (int, optional): Number of openings. Defaults to 1.
+
+    Returns:
+        list[tuple[str, tuple[int]]]: Position (None for the starting
+            position) and moves packed with Event.pack of each opening.
+    """
+    fens = fens or [None]
+    found = []
+    for i in range(count):
+        fen = fens[i % len(fens)]
+        moves = []
+        if book is not None:
+            board = objects.Board() if fen is None else objects.Board.from_fen(fen)
+            for ply in range(plies):
+                event = book.choose(board)
+                if event is None:
+                    break
+                moves.append(event.pack())
+                board.make_move(event)
+        found.append((fen, tuple(moves)))
+    return found
+
+
+def run(
+    first: dict,
+    second: dict,
+    games: int,
+    starts: list[tuple[str, tuple[int]]] = None,
+    rules: Rules = None,
+    workers: int = None,
+) -> Iterator[Result]:
+    """Plays a match across worker processes, yielding each game as it ends.
+
+    Args:
+        first (dict): Keyword arguments of the first Engine.
+        second (dict): Keyword arguments of the second Engine.
+        games (int): Number of games.
+        starts (list[tuple[str, tuple[int]]], optional): Openings, as returned
+            by openings, one per pair of games, repeated if too few. Defaults
+            to None (the starting position).
+        rules (Rules, optional): Adjudication rules. Defaults to None
+            (Rules()).
+        workers (int, optional): Number of worker processes. Defaults to None
+            (one per CPU).
+
+    Yields:
+        Result: Outcome of each game, in the order they end.
+    """
+    starts = starts or [(None, ())]
+    rules = rules or Rules()
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        for number in range(games):
+            fen, opening = starts[number // 2 % len(starts)]
+            pending.append(
+                executor.submit(_game, number, first, second, rules, fen, opening)
+            )
+            # Keep every worker busy without queueing the whole match
+            if len(pending) >= 2 * workers:
+                yield from _ended(pending)
+        while pending:
+            yield from _ended(pending)
+
+
+def _ended(pending: deque) -> Iterator[Result]:
+    done = wait(pending, return_when=FIRST_COMPLETED)[0]
+    for future in [future for future in pending if future in done]:
+        pending.remove(future)
+        yield future.result()
+
+
+def config(text: str) -> dict:
+    """Returns an Engine configuration from the command line, e.g.
+    "depth=3,nodes=20000".
+
+    Args:
+        text (str): Keyword arguments, comma-separated.
+
+    Returns:
+        dict: Keyword arguments of Engine.
+    """
+    pairs = [pair.split("=") for pair in text.split(",") if pair]
+    return {key: int(value) for key, value in pairs}
+
+
+def main(argv: list[str] = None) -> int:
+    """Plays a match from the command line, e.g.
+    python -m src.chhess.solver.tournament --engine depth=3 --engine depth=2
+    --games 200 --output match.pgn
+
+    Args:
+        argv (list[str], optional): Arguments. Defaults to None (sys.argv).
+
+    Returns:
+        int: Exit status.
+    """
+    parser = argparse.ArgumentParser(description="Play an engine match.")
+    parser.add_argument(
+        "--engine",
+        type=config,
+        action="append",
+        required=True,
+        help='engine configuration, e.g. "depth=3,size=16", twice',
+    )
+    parser.add_argument("--games", type=int, default=100, help="number of games")
+    parser.add_argument("--workers", type=int, help="worker processes")
+    parser.add_argument("--output", help="PGN file the games are appended to")
+    parser.add_argument("--fens", help="file of opening positions, one FEN a line")
+    parser.add_argument("--book", help="opening book")
+    parser.add_argument("--book-plies", type=int, default=8, help="book moves")
+    parser.add_argument("--seed", type=int, default=0, help="seed of book choices")
+    parser.add_argument("--plies", type=int, default=400, help="moves before a draw")
+    args = parser.parse_args(argv)
+    if len(args.engine) != 2:
+        parser.error("two engine configurations are needed")
+
+    fens = None
+    if args.fens is not None:
+        with open(args.fens) as f:
+            fens = [line.strip() for line in f if line.strip()]
+    book = None if args.book is None else Book(args.book, seed=args.seed)
+    starts = openings(fens, book, args.book_plies, (args.games + 1) // 2)
+    if book is not None:
+        book.close()
+
+    output = None if args.output is None else open(args.output, "a")
+    start = perf_counter()
+    counts = [0, 0, 0]
+    try:
+        for result in run(
+            args.engine[0],
+            args.engine[1],
+            args.games,
+            starts,
+            Rules(plies=args.plies),
+            args.workers,
+        ):
+            counts[{1: 0, 0.5: 1, 0: 2}[result.score]] += 1
+            if output is not None:
+                output.write(result.text + "\n")
+                output.flush()
+            difference, margin = elo(*counts)
+            minutes = (perf_counter() - start) / 60
+            print(
+                "game "
+                + str(result.number + 1)
+                + " "
+                + result.reason
+                + " | +"
+                + str(counts[0])
+                + " ="
+                + str(counts[1])
+                + " -"
+                + str(counts[2])
+                + " elo "
+                + str(round(difference, 1))
+                + " +/- "
+                + str(round(margin, 1))
+                + " games/min "
+                + str(round(sum(counts) / minutes, 1) if minutes > 0 else 0)
+            )
+    finally:
+        if output is not None:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+from array import array
+
+# Bound types of a stored score
+EXACT, LOWER, UPPER = 1, 2, 3
+
+# Layout of the data word of an entry
+MOVE_BITS, SCORE_BITS, DEPTH_BITS = 16, 22, 8
+SCORE_SHIFT = MOVE_BITS
+DEPTH_SHIFT = SCORE_SHIFT + SCORE_BITS
+BOUND_SHIFT = DEPTH_SHIFT + DEPTH_BITS
+SCORE_OFFSET = 1 << (SCORE_BITS - 1)
+
+
+class TranspositionTable:
+    """Fixed-size table of search results, keyed by Zobrist key.
+
+    Entries are packed into a preallocated array of 64-bit words, two words
+    (key, data) per entry, and grouped in buckets of two entries. The first
+    entry of a bucket is replaced only by results of equal or greater depth,
+    the second is always replaced.
+
+    Variables:
+        size (int): Size of the table, in megabytes.
+        buckets (int): Number of buckets, a power of two.
+        table (array): Words of the entries.
+    """
+
+    def __init__(self, size: int = 16) -> None:
+        """Initializes a TranspositionTable object.
+
+        Args:
+            size (int, optional): Size of the table, in megabytes. Defaults
+                to 16.
+        """
+        self.size: int = size
+        # 2 entries * 2 words * 8 bytes per bucket
+        buckets = max(1, (size << 20) // 32)
+        self.buckets: int = 1 << (buckets.bit_length() - 1)
+        self.table: array = array("Q", bytes(self.buckets * 32))
+
+    def clear(self) -> None:
+        """Empties every entry of the table."""
+        self.table = array("Q", bytes(self.buckets * 32))
+
+    def probe(self, key: int) -> tuple[int, int, int, int]:
+        """Returns the entry stored for a position.
+
+        Args:
+            key (int): Zobrist key of the position.
+
+        Returns:
+            tuple[int, int, int, int]: (depth, bound, score, move), None if
+                no entry is stored.
+        """
+        i = (key & (self.buckets - 1)) << 2
+        table = self.table
+        if table[i] == key and table[i + 1]:
+            data = table[i + 1]
+        elif table[i + 2] == key and table[i + 3]:
+            data = table[i + 3]
+        else:
+            return None
+        return (
+            (data >> DEPTH_SHIFT) & ((1 << DEPTH_BITS) - 1),
+            data >> BOUND_SHIFT,
+            ((data >> SCORE_SHIFT) & ((1 << SCORE_BITS) - 1)) - SCORE_OFFSET,
+            data & ((1 << MOVE_BITS) - 1),
+        )
+
+    def store(self, key: int, depth: int, bound: int, score: int, move: int) -> None:
+        """Stores a search result for a position.
+
+        Args:
+            key (int): Zobrist key of the position.
+            depth (int): Depth searched, in plies.
+            bound (int): EXACT, LOWER or UPPER.
+            score (int): Score found.
+            move (int): Best move, packed with Event.pack, 0 if none.
+        """
+        data = (
+            bound << BOUND_SHIFT
+            | depth << DEPTH_SHIFT
+            | (score + SCORE_OFFSET) << SCORE_SHIFT
+            | move
+        )
+        i = (key & (self.buckets - 1)) << 2
+        table = self.table
+        if (
+            table[i] == key
+            or depth >= (table[i + 1] >> DEPTH_SHIFT) & ((1 << DEPTH_BITS) - 1)
+            or not table[i + 1]
+        ):
+            table[i], table[i + 1] = key, data
+        else:
+            table[i + 2], table[i + 3] = key, data
+
+    def hashfull(self) -> int:
+        """Returns how full the table is, sampled over the first 1000 entries.
+
+        Returns:
+            int: Permille of entries in use.
+        """
+        n = min(1000, self.buckets * 2)
+        return sum(1 for i in range(n) if self.table[2 * i + 1]) * 1000 // n
@@ -0,0 +1,301 @@
+import sys
+import threading
+from typing import Callable, TextIO
+
+from .game import archive, bitboard, clock, game, objects
+from .solver.search import MATE, MATED, Engine, Info, same
+
+# Universal Chess Interface front-end. Commands are read on the main thread
+# and answered at once; searches run on a worker thread, which reports each
+# completed iteration and the best move as it goes.
+
+NAME = "chhess"
+AUTHOR = "Hansen"
+# Depth of searches limited only by time, or by stop
+MAX_DEPTH = 64
+# Scale of the soft deadline when the GUI may ponder, as a predicted move
+# comes with time already spent on it
+PONDER = 1.25
+
+
+def move(event: objects.Event) -> str:
+    """Returns a move in UCI long algebraic notation, e.g. "e2e4" or "e7e8q".
+
+    Args:
+        event (objects.Event): Move.
+
+    Returns:
+        str: Move in UCI notation.
+    """
+    return archive.unpack(event.pack()).replace(" ", "")
+
+
+def parse(board: objects.Board, text: str) -> objects.Event:
+    """Returns the Event of a move in UCI long algebraic notation.
+
+    Args:
+        board (objects.Board): Board in play.
+        text (str): Move in UCI notation, e.g. "e2e4" or "e7e8q".
+
+    Raises:
+        ValueError: Illegal move.
+
+    Returns:
+        objects.Event: Event of the move.
+    """
+    packed = archive.pack(text[:2] + " " + text[2:]) if len(text) in (4, 5) else -1
+    for event in game.Referee.iter_legal_moves(board):
+        pack = event.pack()
+        # A promotion without a piece is to a queen
+        if pack == packed or pack == packed | objects.Queen.kind << 12:
+            return event
+    raise ValueError("Illegal move " + text + ".")
+
+
+def info(statistics: Info) -> str:
+    """Returns the statistics of an iteration as a UCI info line.
+
+    Args:
+        statistics (Info): Statistics of a completed iteration.
+
+    Returns:
+        str: Info line.
+    """
+    score = statistics.score
+    if score > MATED:
+        score = "mate " + str((MATE - score + 1) // 2)
+    elif score < -MATED:
+        score = "mate -" + str((MATE + score) // 2)
+    else:
+        score = "cp " + str(score)
+    return (
+        "info depth "
+        + str(statistics.depth)
+        + " score "
+        + score
+        + " nodes "
+        + str(statistics.nodes)
+        + " nps "
+        + str(statistics.nps)
+        + " time "
+        + str(int(statistics.time * 1000))
+        + " pv "
+        + " ".join(move(event) for event in statistics.pv)
+    )
+
+
+class UCI:
+    """UCI session: the position, the engine and the search in progress.
+
+    Variables:
+        output (Callable[[str], None]): Writes a line to the GUI.
+        board (bitboard.BitBoard): Position set by the GUI.
+        engine (Engine): Engine searching the position.
+        thread (threading.Thread): Search in progress, None if none.
+        manager (clock.TimeManager): Deadlines of the search in progress,
+            None if it has no time limit.
+        release (threading.Event): Set once the best move of an infinite or
+            pondering search may be sent.
+        ponder (bool): If the GUI may ponder (the Ponder option).
+    """
+
+    def __init__(self, output: Callable[[str], None] = None) -> None:
+        """Initializes a UCI object.
+
+        Args:
+            output (Callable[[str], None], optional): Writes a line to the
+                GUI. Defaults to None (standard output).
+        """
+        self.output: Callable[[str], None] = output or (
+            lambda line: print(line, flush=True)
+        )
+        self.board: bitboard.BitBoard = bitboard.BitBoard()
+        self.engine: Engine = Engine(MAX_DEPTH)
+        self.engine.callback = lambda statistics: self.output(info(statistics))
+        self.thread: threading.Thread = None
+        self.manager: clock.TimeManager = None
+        self.release: threading.Event = threading.Event()
+        self.ponder: bool = False
+
+    def command(self, line: str) -> bool:
+        """Handles a command from the GUI. Unknown commands are ignored.
+
+        Args:
+            line (str): Command.
+
+        Returns:
+            bool: False once the GUI has quit.
+        """
+        tokens = line.split()
+        if len(tokens) == 0:
+            return True
+        name, args = tokens[0], tokens[1:]
+        if name == "uci":
+            self.output("id name " + NAME)
+            self.output("id author " + AUTHOR)
+            self.output("option name Hash type spin default 16 min 1 max 4096")
+            self.output("option name Ponder type check default false")
+            self.output("uciok")
+        elif name == "isready":
+            self.output("readyok")
+        elif name == "setoption":
+            self.setoption(args)
+        elif name == "ucinewgame":
+            self.stop()
+            self.engine.table.clear()
+            self.board = bitboard.BitBoard()
+        elif name == "position":
+            self.stop()
+            self.position(args)
+        elif name == "go":
+            self.stop()
+            self.go(args)
+        elif name == "stop":
+            self.stop()
+        elif name == "ponderhit":
+            self.ponderhit()
+        elif name == "quit":
+            self.stop()
+            return False
+        return True
+
+    def setoption(self, args: list[str]) -> None:
+        """Sets an option: setoption name Hash value <megabytes>, or
+        setoption name Ponder value <true | false>.
+
+        Args:
+            args (list[str]): Arguments of the command.
+        """
+        if "value" not in args:
+            return
+        split = args.index("value")
+        name, value = " ".join(args[1:split]).lower(), " ".join(args[split + 1 :])
+        if name == "hash" and value.isdigit():
+            self.stop()
+            callback, tablebase = self.engine.callback, self.engine.tablebase
+            self.engine = Engine(MAX_DEPTH, size=max(1, int(value)))
+            self.engine.callback, self.engine.tablebase = callback, tablebase
+        elif name == "ponder" and value.lower() in ("true", "false"):
+            self.ponder = value.lower() == "true"
+
+    def position(self, args: list[str]) -> None:
+        """Sets the position: position [startpos | fen <fen>] [moves <moves>].
+
+        Args:
+            args (list[str]): Arguments of the command.
+        """
+        split = args.index("moves") if "moves" in args else len(args)
+        try:
+            if args[:1] == ["fen"]:
+                board = bitboard.BitBoard.from_fen(" ".join(args[1:split]))
+            else:
+                board = bitboard.BitBoard()
+            for text in args[split + 1 :]:
+                board.make_move(parse(board, text))
+        except (ValueError, IndexError, KeyError) as invalid:
+            self.output("info string " + str(invalid))
+            return
+        self.board = board
+
+    def go(self, args: list[str]) -> None:
+        """Starts a search: go [depth <plies>] [nodes <nodes>] [movetime <ms>]
+        [wtime <ms>] [btime <ms>] [winc <ms>] [binc <ms>] [movestogo <moves>]
+        [infinite] [ponder].
+
+        Args:
+            args (list[str]): Arguments of the command.
+        """
+        limits = {}
+        for i, token in enumerate(args[:-1]):
+            if args[i + 1].lstrip("-").isdigit():
+                limits[token] = int(args[i + 1])
+        self.engine.depth = limits.get("depth", MAX_DEPTH)
+        self.engine.limit = limits.get("nodes")
+
+        # Time runs from ponderhit when pondering
+        own = "btime" if self.board.colour else "wtime"
+        increment = "binc" if self.board.colour else "winc"
+        pondering = "ponder" in args
+        self.manager = None
+        if "movetime" in limits:
+            self.manager = clock.TimeManager(
+                None, limits["movetime"] / 1000, not pondering
+            )
+        elif own in limits:
+            self.manager = clock.allocate(
+                limits[own] / 1000,
+                limits.get(increment, 0) / 1000,
+                limits.get("movestogo"),
+            )
+            if self.ponder and self.manager.soft is not None:
+                self.manager.soft = min(self.manager.soft * PONDER, self.manager.hard)
+            if pondering:
+                self.manager.origin = None
+
+        # Infinite and pondering searches send their best move only when told
+        self.release.clear()
+        if "infinite" not in args and not pondering:
+            self.release.set()
+        self.thread = threading.Thread(target=self.search)
+        self.thread.start()
+
+    def search(self) -> None:
+        """Searches the position and sends the best move, once released. Runs
+        on the search thread."""
+        board = self.board
+        best = self.engine.search(board, self.manager)
+        self.release.wait()
+        if best is None:
+            # Stopped before any move was searched, or no legal move
+            best = next(game.Referee.iter_legal_moves(board), None)
+        if best is None:
+            self.output("bestmove 0000")
+            return
+        line = "bestmove " + move(best)
+        pv = self.engine.info[-1].pv if self.engine.info else []
+        if len(pv) > 1 and same(pv[0], best):
+            line += " ponder " + move(pv[1])
+        self.output(line)
+
+    def ponderhit(self) -> None:
+        """Turns the pondering search into a search of the move played,
+        timed from now."""
+        if self.thread is None or self.release.is_set():
+            return
+        if self.manager is not None:
+            self.manager.start()
+        self.release.set()
+
+    def stop(self) -> None:
+        """Stops the search in progress, if any, and waits for its best
+        move."""
+        if self.thread is None:
+            return
+        self.release.set()
+        # The search clears the flag as it starts, so keep raising it
+        while self.thread.is_alive():
+            self.engine.stopped = True
+            self.thread.join(0.01)
+        self.thread = None
+
+
+def main(stream: TextIO = None) -> int:
+    """Speaks UCI over standard input and output, e.g. python -m src.chhess uci
+
+    Args:
+        stream (TextIO, optional): Commands. Defaults to None (sys.stdin).
+
+    Returns:
+        int: Exit status.
+    """
+    session = UCI()
+    for line in stream or sys.stdin:
+        if not session.command(line):
+            break
+    else:
+        session.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
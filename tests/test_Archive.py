@@ -0,0 +1,70 @@
+import io
+
+from src.chhess.game import archive, objects, pgn
+from tests.test_Pgn import GAMES
+
+
+def test_pack() -> None:
+    for text in ("e2 e4", "a7 a8", "h7 h8n", "b2 a1q"):
+        assert archive.unpack(archive.pack(text)) == text
+    board = objects.Board()
+    event = objects.Event(board.board[1][4], board.board[3][4])
+    assert archive.pack(str(event)) == event.pack()
+
+
+def test_archive(tmp_path) -> None:
+    sequences = [board.sequence for board in pgn.read(io.StringIO(GAMES))]
+    sequences.append(objects.Sequence())
+    path = str(tmp_path / "games.arc")
+    assert archive.write(path, sequences) == 3
+
+    with archive.Archive(path) as games:
+        assert len(games) == 3
+        for sequence, stored in zip(sequences, games):
+            assert vars(stored) == vars(sequence)
+        assert games[-1].sequence == [] and games[0].white == "Morphy, Paul"
+        assert list(games.moves(1)) == [
+            move & objects.MOVE for move in sequences[1].sequence
+        ]
+        try:
+            games[3]
+        except IndexError:
+            pass
+        else:
+            assert False
+
+
+def test_archive_date(tmp_path) -> None:
+    long, after = objects.Sequence(), objects.Sequence()
+    long.date, after.date, after.white = [2024, 1, 2, 3, 4], [1999], "After"
+    path = str(tmp_path / "games.arc")
+    archive.write(path, [long, after])
+    with archive.Archive(path) as games:
+        assert games[0].date == [2024, 1, 2]
+        assert games[1].date == [1999] and games[1].white == "After"
+
+
+def test_archive_numbers(tmp_path) -> None:
+    text = (
+        '[Round "202401"]\n[WhiteElo "70000"]\n[Date "2024.300.1"]\n'
+        + '[PlyCount "99999999999"]\n\n1. e4 *\n'
+    )
+    sequence = next(pgn.read(io.StringIO(text))).sequence
+    path = str(tmp_path / "games.arc")
+    archive.write(path, [sequence, objects.Sequence()])
+    with archive.Archive(path) as games:
+        stored = games[0]
+        assert (stored.round, stored.elo_white) == (202401, 70000)
+        assert stored.date == [2024, 300, 1] and stored.count_ply == archive.LARGEST
+        assert stored.tags["PlyCount"] == "99999999999" and len(games) == 2
+
+
+def test_archive_invalid(tmp_path) -> None:
+    path = tmp_path / "games.pgn"
+    path.write_text(GAMES)
+    try:
+        archive.Archive(str(path))
+    except ValueError:
+        pass
+    else:
+        assert False
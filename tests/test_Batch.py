@@ -0,0 +1,46 @@
+import numpy as np
+from src.chhess.game import bitboard, objects
+from src.chhess.solver import batch, evaluate
+from tests.test_Objects import play
+
+
+def test_encode() -> None:
+    boards = [
+        play(board, ["e2 e4"]) for board in (objects.Board(), bitboard.BitBoard())
+    ]
+    pieces, colours = batch.encode(boards)
+    assert pieces.shape == (2, 12) and (pieces[0] == pieces[1]).all()
+    assert colours.tolist() == [True, True]
+    assert batch.planes(pieces)[0, bitboard.PAWN, 28] == 1
+
+
+def test_material() -> None:
+    boards = [
+        play(bitboard.BitBoard(), events)
+        for events in ([], ["e2 e4"], ["e2 e4", "d7 d5", "e4 d5", "d8 d5"])
+    ]
+    pieces, colours = batch.encode(boards)
+    scores = [
+        -evaluate.evaluate(b) if b.colour else evaluate.evaluate(b) for b in boards
+    ]
+    assert batch.material(pieces).tolist() == scores
+
+
+def test_mobility() -> None:
+    pieces, colours = batch.encode(
+        [bitboard.BitBoard(), play(objects.Board(), ["e2 e4"])]
+    )
+    assert batch.mobility(pieces).tolist() == [0, batch.MOBILITY * (13 - 4)]
+
+
+def test_structure() -> None:
+    board = play(bitboard.BitBoard(), ["e2 e4", "d7 d5", "e4 d5"])
+    pieces, colours = batch.encode([board])
+    assert batch.structure(pieces).tolist() == [batch.DOUBLED]
+
+
+def test_evaluate() -> None:
+    boards = [bitboard.BitBoard(), play(bitboard.BitBoard(), ["e2 e4"])]
+    scores = batch.evaluate(boards)
+    assert scores.dtype == np.int32 and scores[0] == 0
+    assert scores[1] < 0
@@ -0,0 +1,110 @@
+import pytest
+from numpy.random import randint
+from src.chhess.game import bitboard, game, objects
+from tests.test_Objects import play
+
+
+@pytest.fixture
+def board():
+    return bitboard.BitBoard()
+
+
+def test_BitBoard_occupancy(board: bitboard.BitBoard) -> None:
+    assert (
+        board.occupied
+        == bitboard.RANK_1 | bitboard.RANK_2 | bitboard.RANK_7 | bitboard.RANK_8
+    )
+    assert board.colours[0] == bitboard.RANK_1 | bitboard.RANK_2
+    assert board.bitboard(bitboard.KING, True) == 1 << 60
+
+
+def test_BitBoard_view(board: bitboard.BitBoard) -> None:
+    play(board, ["e2 e4", "e7 e5", "g1 f3"])
+    for sq in range(64):
+        piece = board.squares[sq].piece
+        assert (board.occupied >> sq & 1) == (piece is not None)
+        if piece is not None:
+            assert board.pieces[bitboard.piece_index(piece)] >> sq & 1
+
+
+def test_BitBoard_squares() -> None:
+    sq = randint(0, 64)
+    assert bitboard.square(bitboard.position(sq)) == sq
+    assert list(bitboard.squares(0b1010)) == [1, 3]
+
+
+def test_BitBoard_attacks() -> None:
+    assert bin(bitboard.knight_attacks(0)).count("1") == 2
+    assert bin(bitboard.king_attacks(27)).count("1") == 8
+    assert bin(bitboard.rook_attacks(27, 0)).count("1") == 14
+    assert bin(bitboard.bishop_attacks(0, 1 << 18)).count("1") == 2
+
+
+def test_BitBoard_castle(board: bitboard.BitBoard) -> None:
+    play(board, ["e2 e4", "e7 e5", "g1 f3", "b8 c6", "f1 c4", "g8 f6", "e1 g1"])
+    assert isinstance(board.board[0][6].piece, objects.King)
+    assert isinstance(board.board[0][5].piece, objects.Rook)
+    assert board.board[0][7].piece is None
+    assert not board.in_check(False)
+
+
+def test_Referee_legal_moves(board: bitboard.BitBoard) -> None:
+    moves = 0
+    for piece in board.active[0]:
+        moves += len(game.Referee.legal_moves(piece, board))
+    assert moves == 20
+
+
+def test_BitBoard_attack_maps(board: bitboard.BitBoard) -> None:
+    play(board, ["e2 e4", "d7 d5", "e4 d5", "d8 d5", "b1 c3", "d5 e5", "f1 e2"])
+    board.unmake_move()
+    for colour in (False, True):
+        attacked = 0
+        for sq in range(64):
+            count = len(list(bitboard.squares(board.attackers(sq, colour))))
+            assert board.attack_counts[1 if colour else 0][sq] == count
+            attacked |= (1 << sq) if count else 0
+        assert board.attack_maps[1 if colour else 0] == attacked
+    assert board.in_check(False)
+
+
+def test_Referee_iter_legal_moves(board: bitboard.BitBoard) -> None:
+    play(board, ["e2 e4", "d7 d5", "g1 f3", "b8 c6", "f1 c4", "c8 g4"])
+    events = list(game.Referee.iter_legal_moves(board))
+    assert [str(event) for event in events[:2]] == ["e4 d5", "c4 d5"]
+    assert str(events[-1]) == "e1 g1" and len(events) == 32
+    captures = game.Referee.iter_legal_moves(board, stage=game.CAPTURES)
+    assert len(list(captures)) == 2
+    assert len(list(game.Referee.iter_legal_moves(board, colour=True))) == 36
+    assert not board.colour and len(board.history) == 6
+
+
+def test_Referee_check_mate(board: bitboard.BitBoard) -> None:
+    play(board, ["f2 f3", "e7 e5", "g2 g4"])
+    assert not game.Referee.check_mate(board)
+    play(board, ["d8 h4"])
+    assert game.Referee.check_mate(board)
+
+
+def test_BitBoard_pins(board: bitboard.BitBoard) -> None:
+    play(board, ["e2 e4", "d7 d6", "d2 d4", "e8 d7", "f1 b5"])
+    checkers, pinned, evasions = board.pins(True)
+    assert checkers == 1 << 33 and pinned == 0
+    assert evasions == 1 << 33 | 1 << 42
+    # Only blocking or moving the King escapes, and not back along the check
+    moves = [str(event) for event in game.Referee.iter_legal_moves(board)]
+    assert sorted(moves) == ["b8 c6", "c7 c6", "d7 e6"]
+
+
+def test_BitBoard_en_passant_pin(board: bitboard.BitBoard) -> None:
+    play(board, ["b2 b4", "h7 h5", "b4 b5", "h5 h4", "d2 d3", "h8 h5"])
+    play(board, ["e1 d2", "g8 f6", "d2 c3", "f6 g8", "c3 b4", "g8 f6"])
+    play(board, ["b4 a5", "c7 c5"])
+    # Capturing en passant would leave the King open to the Rook on the rank
+    pawn = board.squares[33].piece
+    assert [str(sq.position) for sq in game.Referee.legal_moves(pawn, board)] == ["b6"]
+    i_d = pawn.position.index()
+    depart = board.board[i_d[0]][i_d[1]]
+    for arrive in game.Referee.pseudo_legal_moves(pawn, board):
+        legal = game.Referee.is_legal(objects.Event(depart, arrive), board)
+        assert legal == (str(arrive.position) == "b6")
@@ -0,0 +1,52 @@
+import io
+
+from src.chhess.game import archive, objects, pgn
+from src.chhess.solver import book
+from tests.test_Pgn import GAMES
+
+OPENINGS = """[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 1-0
+
+[Result "1/2-1/2"]
+
+1. e4 c5 1/2-1/2
+
+[Result "0-1"]
+
+1. d4 d5 0-1
+"""
+
+
+def test_build() -> None:
+    counts = book.build(pgn.read(io.StringIO(OPENINGS)), plies=2)
+    start = objects.Board().key
+    e4, d4 = archive.pack("e2 e4"), archive.pack("d2 d4")
+    assert counts[(start, e4)] == [2, 1, 1] and counts[(start, d4)] == [1, 0, 0]
+    # Plies beyond the limit are not counted
+    assert len(counts) == 5
+
+
+def test_book(tmp_path) -> None:
+    path = str(tmp_path / "book.bin")
+    counts = book.build(pgn.read(io.StringIO(OPENINGS + "\n" + GAMES)))
+    assert book.write(path, counts, minimum=2) == 3
+
+    book.write(path, counts)
+    with book.Book(path, weighted=False) as opening:
+        assert len(opening) == len(counts)
+        board = objects.Board()
+        assert opening.entries(board.key)[0] == (archive.pack("e2 e4"), 3, 2, 1)
+        assert str(opening.choose(board)) == "e2 e4"
+        board.make_move(opening.choose(board))
+        assert len(opening.entries(board.key)) == 2
+        board.make_move(board.event(archive.pack("a7 a6")))
+        assert opening.choose(board) is None
+
+    # Sequences of an archive are replayed
+    sequences = [board.sequence for board in pgn.read(io.StringIO(OPENINGS))]
+    boards = [book.replay(sequence, 16) for sequence in sequences]
+    assert book.build(boards) == book.build(pgn.read(io.StringIO(OPENINGS)))
+    board = book.replay(sequences[0], 1)
+    assert board.sequence.moves == 1 and board.sequence.result == sequences[0].result
+    assert board.sequence.sequence == sequences[0].sequence[:1]
@@ -0,0 +1,79 @@
+from time import perf_counter
+
+from src.chhess.game import bitboard, clock
+from src.chhess.solver.search import Engine
+
+
+class Time:
+    def __init__(self) -> None:
+        self.time = 0.0
+
+    def __call__(self) -> float:
+        return self.time
+
+
+def test_increment() -> None:
+    now = Time()
+    timer = clock.Clock(60, increment=2, now=now)
+    timer.start(False)
+    now.time = 10
+    assert timer.left(False) == 50 and timer.left(True) == 60
+    assert timer.press() and timer.remaining == [52, 60] and timer.colour
+    now.time = 75
+    assert not timer.press()
+    assert timer.flagged and timer.remaining[1] == 0 and timer.colour is None
+
+
+def test_delay() -> None:
+    now = Time()
+    simple = clock.Clock(60, delay=5, now=now)
+    simple.start(False)
+    now.time = 3
+    assert simple.left(False) == 60
+    now.time = 8
+    simple.press()
+    assert simple.remaining[0] == 57
+
+    now.time = 0
+    bronstein = clock.Clock(60, delay=5, bronstein=True, now=now)
+    bronstein.start(False)
+    now.time = 3
+    assert bronstein.left(False) == 57
+    bronstein.press()
+    assert bronstein.remaining[0] == 60
+    now.time = 11
+    bronstein.press()
+    assert bronstein.remaining[1] == 57
+
+
+def test_allocate() -> None:
+    manager = clock.allocate(60, 1)
+    assert 2 < manager.soft < manager.hard <= 30
+    manager = clock.allocate(10, 0, 1)
+    assert manager.soft == manager.hard < 10
+    # Never more than the clock allows, however large the increment
+    manager = clock.allocate(0.5, 10)
+    assert manager.hard < 0.5
+    assert clock.allocate(0).hard == 0
+
+
+def test_proceed() -> None:
+    manager = clock.TimeManager(1, 10)
+    assert manager.proceed(1) and manager.stable == 0
+    assert manager.proceed(1) and manager.stable == 1
+    manager.origin -= 0.8
+    # Past the soft deadline once the best move is stable
+    assert manager.proceed(1) and not manager.proceed(1)
+    assert manager.proceed(2) and manager.stable == 0
+    manager.origin -= 5
+    assert not manager.proceed(2)
+    pondering = clock.TimeManager(0, 0, False)
+    assert pondering.proceed(1) and not pondering.expired()
+
+
+def test_search() -> None:
+    board = bitboard.BitBoard()
+    manager = clock.TimeManager(None, 0.3)
+    start = perf_counter()
+    assert Engine(64).search(board, manager) is not None
+    assert perf_counter() - start < 0.6
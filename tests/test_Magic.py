@@ -0,0 +1,64 @@
+import threading
+
+from numpy.random import randint
+from src.chhess.game import bitboard, game, magic, objects, tables
+
+
+def random_occupancy() -> int:
+    occupied = 0
+    for sq in randint(0, 64, size=randint(0, 33)):
+        occupied |= 1 << int(sq)
+    return occupied
+
+
+def test_magic_slow_path() -> None:
+    for _ in range(16):
+        occupied = random_occupancy()
+        for sq in range(64):
+            assert magic.rook_attacks(sq, occupied) == tables.slide(
+                sq, occupied, tables.ORTHOGONALS
+            )
+            assert magic.bishop_attacks(sq, occupied) == tables.slide(
+                sq, occupied, tables.DIAGONALS
+            )
+
+
+def test_magic_generate_threads() -> None:
+    rook, bishop = list(magic.ROOK_TABLE), list(magic.BISHOP_TABLE)
+    magic.ROOK_TABLE.clear()
+    magic.BISHOP_TABLE.clear()
+    results = []
+
+    def attacks() -> None:
+        results.append(magic.queen_attacks(27, 0))
+
+    threads = [threading.Thread(target=attacks) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 4 and len(set(results)) == 1
+    assert magic.ROOK_TABLE == rook and magic.BISHOP_TABLE == bishop
+
+
+def test_magic_prune_lines() -> None:
+    events = ["d2 d4", "e7 e5", "c1 g5", "d8 g5", "d1 d3", "f8 b4", "b1 c3"]
+    legacy, bits = objects.Board(), bitboard.BitBoard()
+    for board in (legacy, bits):
+        for event in events:
+            split = event.split()
+            i_d = objects.Position(split[0], mode=3).index()
+            i_a = objects.Position(split[1], mode=3).index()
+            board.make_move(
+                objects.Event(board.board[i_d[0]][i_d[1]], board.board[i_a[0]][i_a[1]])
+            )
+    for i in range(len(legacy.active[1])):
+        piece = legacy.active[1][i]
+        if isinstance(piece, (objects.Bishop, objects.Rook, objects.Queen)):
+            assert sorted(
+                str(square.position)
+                for square in game.Referee.legal_moves(piece, legacy)
+            ) == sorted(
+                str(square.position)
+                for square in game.Referee.legal_moves(bits.active[1][i], bits)
+            )
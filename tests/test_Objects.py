@@ -1,6 +1,6 @@
 import pytest
 from numpy.random import randint
-from ..src.game import objects
+from src.chhess.game import game, objects, pgn, zobrist
 
 
 @pytest.fixture
@@ -34,3 +34,226 @@ def test_Position_err_2() -> None:
 def test_Position_err_3() -> None:
     with pytest.raises(ValueError):
         objects.Position("i4", mode=3)
+
+
+def test_Position_of(rand_pos: objects.Position) -> None:
+    interned = objects.Position.of(rand_pos.file, rand_pos.rank)
+    assert interned == rand_pos and interned is not rand_pos
+    assert interned is objects.Position.at(rand_pos.square())
+    assert (
+        interned is objects.Board().board[rand_pos.rank - 1][rand_pos.file - 1].position
+    )
+    with pytest.raises(ValueError):
+        objects.Position.of(0, 1)
+
+
+def test_Position_immutable(rand_pos: objects.Position) -> None:
+    with pytest.raises(AttributeError):
+        rand_pos.file = 1
+    assert not hasattr(objects.Board().board[0][0], "__dict__")
+
+
+def play(board: objects.Board, events: list[str]) -> objects.Board:
+    for event in events:
+        split = event.split()
+        i_d = objects.Position(split[0], mode=3).index()
+        i_a = objects.Position(split[1], mode=3).index()
+        board.make_move(
+            objects.Event(
+                board.board[i_d[0]][i_d[1]],
+                board.board[i_a[0]][i_a[1]],
+                promotion=objects.PROMOTIONS.get(split[1][2:]),
+            )
+        )
+    return board
+
+
+def snapshot(board: objects.Board) -> tuple:
+    return (
+        [str(square) for row in board.board for square in row],
+        [[str(piece.position) for piece in active] for active in board.active],
+        [len(captured) for captured in board.captured],
+        board.colour,
+        list(board.sequence.sequence),
+    )
+
+
+def test_Board_unmake_move_capture() -> None:
+    board = play(objects.Board(), ["e2 e4", "d7 d5"])
+    before = snapshot(board)
+    play(board, ["e4 d5"])
+    assert len(board.active[1]) == 15 and len(board.captured[1]) == 1
+    board.unmake_move()
+    assert snapshot(board) == before
+
+
+def test_Board_unmake_move_castle() -> None:
+    board = play(objects.Board(), ["e2 e4", "e7 e5", "g1 f3", "b8 c6", "f1 c4"])
+    play(board, ["g8 f6"])
+    before = snapshot(board)
+    play(board, ["e1 g1"])
+    assert str(board.board[0][5]) == "r" and board.board[0][5].piece.moved
+    board.unmake_move()
+    assert snapshot(board) == before
+    assert not board.board[0][4].piece.moved and not board.board[0][7].piece.moved
+
+
+def test_Board_en_passant() -> None:
+    board = play(objects.Board(), ["e2 e4", "a7 a6", "e4 e5", "d7 d5"])
+    assert str(board.en_passant().position) == "d6"
+    before = snapshot(board)
+    play(board, ["e5 d6"])
+    assert board.board[4][3].piece is None and len(board.captured[1]) == 1
+    board.unmake_move()
+    assert snapshot(board) == before
+    assert str(board.en_passant().position) == "d6"
+    play(board, ["g1 f3"])
+    assert board.en_passant() is None
+
+
+def test_Board_promote() -> None:
+    board = play(
+        objects.Board(),
+        ["h2 h4", "g7 g5", "h4 g5", "h7 h6", "g5 h6", "a7 a6", "h6 g7", "a6 a5"],
+    )
+    before = snapshot(board)
+    play(board, ["g7 h8n"])
+    assert str(board.board[7][7]) == "n" and len(board.captured[1]) == 3
+    assert isinstance(board.active[0][7], objects.Knight)
+    board.unmake_move()
+    assert snapshot(board) == before
+
+
+def test_Board_key_transposition() -> None:
+    board = objects.Board()
+    key = board.key
+    play(board, ["g1 f3", "g8 f6", "f3 g1", "f6 g8"])
+    assert board.key == key
+    play(board, ["e2 e4"])
+    assert board.key == zobrist.compute(board)
+    board.unmake_move()
+    assert board.key == key
+
+
+def test_Board_key_castling() -> None:
+    board = play(objects.Board(), ["e2 e4", "e7 e5", "g1 f3", "b8 c6", "f1 c4"])
+    play(board, ["g8 f6", "e1 g1", "f6 e4", "h2 h4", "d7 d5", "h4 h5", "g7 g5"])
+    assert board.castling() == 12
+    assert board.key == zobrist.compute(board)
+    play(board, ["h5 g6", "f8 e7", "g6 g7", "a7 a6", "g7 h8q"])
+    assert board.castling() == 8
+    assert board.key == zobrist.compute(board)
+
+
+def test_Board_fen() -> None:
+    board = play(objects.Board(), ["e2 e4", "c7 c5", "g1 f3"])
+    fen = "rnbqkbnr/pp1ppppp/8/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2"
+    assert board.to_fen() == fen
+    copy = objects.Board.from_fen(fen)
+    assert copy.to_fen() == fen and copy.key == board.key
+    assert [str(sq) for row in copy.board for sq in row] == [
+        str(sq) for row in board.board for sq in row
+    ]
+    assert len(copy.active[0]) == 16 and len(copy.active[1]) == 16
+    assert objects.Board.from_fen(objects.Board.START).key == objects.Board().key
+
+
+def test_Board_fen_en_passant() -> None:
+    fen = "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3"
+    board = objects.Board.from_fen(fen)
+    assert board.key == zobrist.compute(board)
+    assert str(board.en_passant().position) == "f6"
+    play(board, ["e5 f6"])
+    assert board.board[4][5].piece is None and board.halfmove == 0
+    board.unmake_move()
+    assert board.to_fen() == fen
+
+
+def test_Board_fen_castling() -> None:
+    board = objects.Board.from_fen("r3k2r/8/8/8/8/8/8/R3K2R w Kq - 5 40")
+    assert board.castling() == 1 | 8
+    assert not board.board[0][4].piece.moved and board.board[0][0].piece.moved
+    play(board, ["e1 g1"])
+    assert board.to_fen() == "r3k2r/8/8/8/8/8/8/R4RK1 b q - 6 40"
+    with pytest.raises(ValueError):
+        objects.Board.from_fen("r3k2r/8/8/8/8/8/8/R3K2 w - - 0 1")
+
+
+def test_Sequence_packed() -> None:
+    board = play(objects.Board(), ["e2 e4", "d7 d5", "e4 d5", "g8 f6", "g1 f3"])
+    moves = board.sequence.sequence
+    assert [objects.Sequence.unpack(move) for move in moves[:3]] == [
+        "e2 e4",
+        "d7 d5",
+        "e4 d5",
+    ]
+    assert moves[0] & objects.DOUBLE and not moves[4] & objects.DOUBLE
+    assert moves[2] >> objects.CAPTURED == objects.Pawn.kind + 1
+    assert moves[2] & objects.MOVE == board.history[2][0].pack()
+    play(board, ["c7 c5", "d5 c6"])
+    assert board.sequence.sequence[-1] & objects.EN_PASSANT
+    copy = game.Referee.copy_board(board)
+    assert copy.to_fen() == board.to_fen()
+    assert copy.sequence.sequence == board.sequence.sequence
+
+    board = objects.Board.from_fen("4k3/1P6/8/8/8/8/8/R3K3 w Q - 0 1")
+    play(board, ["e1 c1", "e8 d7", "b7 b8"])
+    assert board.sequence.sequence[0] & objects.CASTLE
+    assert objects.Sequence.unpack(board.sequence.sequence[-1]) == "b7 b8q"
+    sequence = objects.Sequence(sequence=["e2 e4", "e7 e8n"])
+    assert sequence.sequence == [
+        objects.Sequence.pack("e2 e4"),
+        52 | 60 << 6 | objects.Knight.kind << 12,
+    ]
+
+
+def test_Board_repetitions() -> None:
+    board = objects.Board()
+    shuffle = ["g1 f3", "g8 f6", "f3 g1", "f6 g8"]
+    play(board, shuffle)
+    assert board.repetitions() == 1
+    play(board, shuffle[:3])
+    assert board.repetitions() == 1 and game.Referee.draw(board) is None
+    play(board, shuffle[3:])
+    assert board.repetitions() == 2 and game.Referee.draw(board) == "repetition"
+    # Nothing before a pawn move can repeat
+    play(board, ["e2 e3", "e7 e6"] + shuffle)
+    assert board.repetitions() == 1 and board.halfmove == 4
+
+
+def test_Board_repetitions_double_push() -> None:
+    # No Pawn may capture en passant, so the first position counts
+    board = pgn.replay({}, "1. e4 Nf6 2. Nf3 Ng8 3. Ng1 Nf6 4. Nf3 Ng8 5. Ng1")
+    assert board.repetitions() == 2 and game.Referee.draw(board) == "repetition"
+    board = pgn.replay({}, "1. e4 d5 2. e5 f5")
+    assert str(board.en_passant().position) == "f6"
+    key = board.key
+    play(board, ["g1 f3", "g8 f6", "f3 g1", "f6 g8"])
+    assert board.key != key and board.repetitions() == 0
+
+
+def test_Board_insufficient_material() -> None:
+    for fen, dead in (
+        ("7k/8/8/8/8/8/8/K7 w - - 0 1", True),
+        ("7k/8/8/8/8/8/8/KN6 w - - 0 1", True),
+        ("7k/8/8/8/8/8/8/KP6 w - - 0 1", False),
+        ("6bk/8/8/8/8/8/8/KB6 w - - 0 1", True),
+        ("5b1k/8/8/8/8/8/8/KB6 w - - 0 1", False),
+        ("6nk/8/8/8/8/8/8/KN6 w - - 0 1", False),
+        ("b5bk/8/8/8/8/8/8/KB1B4 w - - 0 1", True),
+        ("b5bk/8/8/8/8/8/8/KBB5 w - - 0 1", False),
+        ("7k/8/8/8/8/8/8/KNN5 w - - 0 1", False),
+        ("6nk/8/8/8/8/8/8/KB6 w - - 0 1", False),
+    ):
+        board = objects.Board.from_fen(fen)
+        assert board.insufficient_material() == dead
+
+
+def test_Referee_draw() -> None:
+    board = objects.Board.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+    assert game.Referee.stale_mate(board) and not game.Referee.check_mate(board)
+    assert game.Referee.draw(board) == "stalemate"
+    board = objects.Board.from_fen("7k/8/6K1/8/8/8/8/1Q6 w - - 100 80")
+    assert game.Referee.draw(board) == "fifty moves"
+    play(board, ["b1 b8"])
+    assert game.Referee.check_mate(board) and game.Referee.draw(board) is None
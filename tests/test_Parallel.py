@@ -0,0 +1,72 @@
+import threading
+from time import perf_counter
+
+from src.chhess.game import bitboard, clock, objects
+from src.chhess.solver import parallel, search
+from tests.test_Objects import play
+
+
+def test_encode() -> None:
+    board = play(objects.Board(), ["e2 e4", "d7 d5", "e4 d5", "g8 f6", "f1 b5"])
+    data = parallel.encode(board)
+    assert len(data) == 11
+    copy = parallel.decode(data)
+    assert copy.key == board.key and str(copy) == str(board)
+
+
+def test_ParallelEngine_mate_in_one() -> None:
+    board = play(
+        bitboard.BitBoard(), ["e2 e4", "e7 e5", "f1 c4", "b8 c6", "d1 h5", "g8 f6"]
+    )
+    with parallel.ParallelEngine(depth=3, workers=2, size=1) as engine:
+        assert str(engine.search(board)) == "h5 f7"
+        assert engine.info[-1].score == search.MATE - 1
+    assert len(board.history) == 6
+
+
+def test_ParallelEngine_deterministic() -> None:
+    board = play(bitboard.BitBoard(), ["e2 e4", "e7 e5"])
+    with parallel.ParallelEngine(
+        depth=2, workers=2, size=1, deterministic=True
+    ) as engine:
+        first = (str(engine.search(board)), engine.info[-1].score, engine.nodes)
+        second = (str(engine.search(board)), engine.info[-1].score, engine.nodes)
+    assert first == second
+    serial = search.Engine(depth=2, size=1)
+    assert str(serial.search(board)) == first[0]
+    assert serial.info[-1].score == first[1]
+
+
+def test_ParallelEngine_nodes() -> None:
+    # The moves after the first are searched within its bound, so splitting
+    # them costs little more than a serial search
+    fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+    board = bitboard.BitBoard.from_fen(fen)
+    serial = search.Engine(depth=3, size=1)
+    best = str(serial.search(board))
+    with parallel.ParallelEngine(depth=3, workers=2, size=1) as engine:
+        assert str(engine.search(board)) == best
+        assert engine.info[-1].score == serial.info[-1].score
+        assert engine.nodes <= 1.25 * serial.nodes
+
+
+def test_ParallelEngine_limits() -> None:
+    board = bitboard.BitBoard()
+    reported = []
+    with parallel.ParallelEngine(depth=10, workers=2, size=1, nodes=2000) as engine:
+        engine.callback = reported.append
+        assert engine.search(board) is not None
+        assert 1 <= engine.info[-1].depth < 10 and reported == engine.info
+        assert engine.nodes <= 2000 + 2 * engine.info[0].nodes
+
+        engine.limit = None
+        start = perf_counter()
+        assert engine.search(board, clock.TimeManager(None, 0.5)) is not None
+        assert engine.info[-1].depth < 10 and perf_counter() - start < 1.5
+
+        # Stopped from another thread, as by the UCI front-end
+        timer = threading.Timer(0.5, lambda: setattr(engine, "stopped", True))
+        timer.start()
+        assert engine.search(board) is not None and engine.stopped
+        timer.join()
+    assert len(board.history) == 0
@@ -0,0 +1,26 @@
+from src.chhess.solver import perft
+
+
+def test_perft() -> None:
+    board = perft.setup()
+    assert perft.perft(board, 3) == 8902
+    assert len(board.history) == 0
+
+
+def test_perft_positions() -> None:
+    for name in ("kiwipete", "endgame", "promotion", "middlegame"):
+        fen, reference = perft.POSITIONS[name]
+        assert perft.perft(perft.setup(fen), 2) == reference[1]
+
+
+def test_divide() -> None:
+    counts = perft.divide(perft.setup(events=("e2 e4",), legacy=True), 2)
+    assert len(counts) == 20 and sum(counts.values()) == 600
+    assert counts["e7 e5"] == 29
+
+
+def test_main(capsys) -> None:
+    assert perft.main(["--depth", "2"]) == 0
+    assert "expected 400" in capsys.readouterr().out
+    # Counts with no reference always pass
+    assert perft.main(["--depth", "1", "--moves", "e2 e4", "d7 d5"]) == 0
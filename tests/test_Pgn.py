@@ -0,0 +1,98 @@
+import io
+
+import pytest
+
+from src.chhess.game import bitboard, pgn
+
+GAMES = """[Event "Paris"]
+[Site "Paris FRA"]
+[Date "1858.??.??"]
+[Round "?"]
+[White "Morphy, Paul"]
+[Black "Duke Karl / Count Isouard"]
+[Result "1-0"]
+[WhiteElo "2690"]
+[ECO "C41"]
+
+1. e4 e5 2. Nf3 d6 3. d4 Bg4 {This is a weak move already.} 4. dxe5 Bxf3 5.
+Qxf3 dxe5 6. Bc4 Nf6 7. Qb3 Qe7 8. Nc3 c6 9. Bg5 b5 $6 (9... Qb4+ 10. Qxb4)
+10. Nxb5 cxb5 11. Bxb5+ Nbd7 12. O-O-O Rd8 13. Rxd7 Rxd7 ; the rook is pinned
+14. Rd1 Qe6 15. Bxd7+ Nxd7 16. Qb8+ Nxb8 17. Rd8# 1-0
+
+[Event "Illegal"]
+
+1. e4 e5 2. Ke3 *
+
+[Event "Study"]
+[SetUp "1"]
+[FEN "4k3/8/8/3pP3/8/8/1p6/4K3 w - d6 0 1"]
+
+1. exd6 b1=Q+ 2. Kd2 *
+"""
+
+
+def test_read() -> None:
+    games = list(pgn.read(io.StringIO(GAMES)))
+    assert len(games) == 2
+
+    board = games[0]
+    sequence = board.sequence
+    assert sequence.white == "Morphy, Paul" and sequence.eco == "C41"
+    assert sequence.date == [1858, 0, 0] and sequence.elo_white == 2690
+    assert sequence.result == [1, 0] and sequence.count_ply == 33
+    assert sequence.tags["Black"] == "Duke Karl / Count Isouard"
+    assert str(board.history[21][0]) == "b8 d7"
+    assert board.squares[59].piece is not None and board.colour
+
+    board = games[1]
+    assert board.to_fen() == "4k3/8/3P4/8/8/8/3K4/1q6 b - - 1 2"
+
+
+def test_read_strict() -> None:
+    try:
+        list(pgn.read(io.StringIO(GAMES), strict=True))
+    except ValueError as error:
+        assert "Ke3" in str(error)
+    else:
+        assert False
+
+
+def test_parse() -> None:
+    board = bitboard.BitBoard.from_fen("4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1")
+    assert str(pgn.parse(board, "O-O")) == "e1 g1"
+    board = bitboard.BitBoard.from_fen("4k3/8/8/8/8/8/4K3/R6R w - - 0 1")
+    assert str(pgn.parse(board, "Rad1")) == "a1 d1"
+    for san in ("Rd1", "Ra9", "Nf3", "O-O"):
+        try:
+            pgn.parse(board, san)
+        except ValueError:
+            continue
+        assert False
+
+
+def test_parse_illegal() -> None:
+    for movetext, san in (
+        ("1. e4 e5", "e5"),
+        ("1. e4 f6 2. Qh5+", "a6"),
+        ("1. e4 e5", "Nd2"),
+        ("1. d4 e5 2. d5 d6", "d6"),
+    ):
+        board = pgn.replay({}, movetext)
+        key = board.key
+        with pytest.raises(ValueError, match="Illegal move"):
+            pgn.parse(board, san)
+        assert board.key == key
+    board = bitboard.BitBoard.from_fen("4k3/1P6/8/8/8/8/4P3/4K3 w - - 0 1")
+    assert str(pgn.parse(board, "b8=N")) == "b7 b8n"
+    for san in ("b8", "e3=Q", "Kd1=Q"):
+        with pytest.raises(ValueError, match="Invalid promotion"):
+            pgn.parse(board, san)
+
+
+def test_write() -> None:
+    board = next(pgn.read(io.StringIO(GAMES)))
+    text = pgn.write(board)
+    assert "12. O-O-O Rd8" in text and "17. Rd8# 1-0" in text
+    assert len(board.history) == 33
+    again = next(pgn.read(io.StringIO(text)))
+    assert [r[0].pack() for r in again.history] == [r[0].pack() for r in board.history]
@@ -0,0 +1,48 @@
+from src.chhess.game import bitboard
+from src.chhess.solver import search
+from tests.test_Objects import play
+
+
+def test_Engine_mate_in_one() -> None:
+    board = play(
+        bitboard.BitBoard(), ["e2 e4", "e7 e5", "f1 c4", "b8 c6", "d1 h5", "g8 f6"]
+    )
+    key = board.key
+    engine = search.Engine(depth=3)
+    assert str(engine.search(board)) == "h5 f7"
+    assert engine.info[-1].score == search.MATE - 1
+    assert board.key == key and len(board.history) == 6
+
+
+def test_Engine_checkmated() -> None:
+    board = play(bitboard.BitBoard(), ["f2 f3", "e7 e5", "g2 g4", "d8 h4"])
+    assert search.Engine(depth=2).search(board) is None
+
+
+def test_Engine_node_limit() -> None:
+    engine = search.Engine(depth=10, nodes=500)
+    assert engine.search(bitboard.BitBoard()) is not None
+    assert len(engine.info) >= 1 and engine.info[-1].depth < 10
+    assert engine.nodes <= 500 + engine.info[0].nodes
+    assert engine.info[-1].nps > 0 and len(engine.info[-1].pv) >= 1
+
+
+def test_Engine_repetition() -> None:
+    board = bitboard.BitBoard.from_fen("6nk/8/8/8/8/8/8/K2Q2N1 w - - 0 1")
+    play(board, ["g1 f3", "g8 f6", "f3 g1", "f6 g8", "g1 f3", "g8 f6", "f3 g1"])
+    # A queen down, black takes the draw by repetition
+    engine = search.Engine(depth=2)
+    assert str(engine.search(board)) == "f6 g8"
+    assert engine.info[-1].score == 0
+
+
+def test_Engine_fifty_moves() -> None:
+    board = bitboard.BitBoard.from_fen("7k/8/8/8/8/8/8/KQ6 b - - 99 80")
+    engine = search.Engine(depth=2)
+    engine.search(board)
+    assert engine.info[-1].score == 0
+    # Mate on the hundredth halfmove is still mate
+    board = bitboard.BitBoard.from_fen("7k/8/6K1/8/8/8/8/1Q6 w - - 99 80")
+    engine = search.Engine(depth=2)
+    assert str(engine.search(board)) == "b1 b8"
+    assert engine.info[-1].score == search.MATE - 1
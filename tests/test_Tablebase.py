@@ -0,0 +1,47 @@
+import pytest
+
+from src.chhess.game import objects
+from src.chhess.solver import search, tablebase
+
+
+@pytest.fixture(scope="module")
+def tables(tmp_path_factory) -> tablebase.Tablebase:
+    directory = str(tmp_path_factory.mktemp("tables"))
+    assert tablebase.build(["KKQ"], directory, workers=1) == ["KQK"]
+    yield tablebase.Tablebase(directory)
+
+
+def test_index() -> None:
+    # Symmetric positions share an index, whichever side is stronger
+    pieces = [(5, False, 0), (4, False, 9), (5, True, 63)]
+    turned = [(kind, not colour, sq ^ 56) for kind, colour, sq in pieces]
+    mirrored = [(kind, colour, sq ^ 7) for kind, colour, sq in pieces]
+    name, i = tablebase.index(pieces, False)
+    assert name == "KQK" and i < tablebase.size(name)
+    assert tablebase.index(turned, True) == (name, i)
+    assert tablebase.index(mirrored, False) == (name, i)
+    assert tablebase.decode(name, i) == (pieces, False)
+    assert tablebase.dependencies("KPK") == ["KQK", "KRK"]
+
+
+def test_tablebase(tables) -> None:
+    assert tables.pieces == 3 and max(tables.tables["KQK"].values()) == 21
+    board = objects.Board.from_fen("7k/8/6K1/8/8/8/8/1Q6 w - - 0 1")
+    assert tables.probe(board) == 2
+    assert tables.score(board, 0) == search.MATE - 1
+    # Black to move, with a lone King and a Queen
+    board = objects.Board.from_fen("7K/8/6k1/8/8/8/8/1q6 w - - 0 1")
+    assert tables.probe(board) % 2 == 1
+    board = objects.Board.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+    assert tables.probe(board) == 0
+    board = objects.Board.from_fen("7k/8/6K1/8/8/8/8/1N6 w - - 0 1")
+    assert tables.probe(board) == 0
+
+
+def test_search(tables) -> None:
+    board = objects.Board.from_fen("8/8/8/3k4/8/8/8/KQ6 w - - 0 1")
+    engine = search.Engine(depth=2, tablebase=tables)
+    event = engine.search(board)
+    board.make_move(event)
+    assert tables.probe(board) % 2 == 1
+    assert engine.info[-1].score == search.MATE - tables.probe(board)
@@ -0,0 +1,27 @@
+from numpy.random import randint
+from src.chhess.game import objects, tables
+
+
+def test_KNIGHT_TARGETS() -> None:
+    assert sorted(tables.KNIGHT_TARGETS[0]) == [10, 17]
+    assert len(tables.KNIGHT_TARGETS[27]) == 8
+
+
+def test_KING_TARGETS() -> None:
+    assert sorted(tables.KING_TARGETS[63]) == [54, 55, 62]
+    assert len(tables.KING_TARGETS[27]) == 8
+
+
+def test_RAYS_ordered() -> None:
+    assert tables.RAYS[tables.NORTH][0] == (8, 16, 24, 32, 40, 48, 56)
+    assert tables.RAYS[tables.SOUTH_WEST][63] == (54, 45, 36, 27, 18, 9, 0)
+    assert tables.RAYS[tables.WEST][0] == ()
+
+
+def test_RAYS_possible_moves() -> None:
+    position = objects.Position((randint(1, 9), randint(1, 9)), mode=1)
+    queen = objects.Queen(position, False)
+    assert len(queen.possible_moves()) == sum(
+        len(tables.RAYS[direction][position.square()]) for direction in range(8)
+    )
+    assert len(queen.possible_moves()) in (21, 23, 25, 27)
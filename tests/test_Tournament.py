@@ -0,0 +1,49 @@
+import io
+
+from src.chhess.game import objects, pgn
+from src.chhess.solver import tournament
+
+
+def test_elo() -> None:
+    assert tournament.elo(0, 0, 0) == (0.0, 0.0)
+    difference, margin = tournament.elo(10, 0, 10)
+    assert difference == 0 and 100 < margin < 200
+    difference, margin = tournament.elo(30, 40, 10)
+    assert 85 < difference < 90 and margin < difference
+    assert (
+        round(tournament.elo(5, 0, 0)[0]) == -round(tournament.elo(0, 0, 5)[0]) == 1200
+    )
+
+
+def test_ending() -> None:
+    board = pgn.replay({}, "1. f3 e5 2. g4 Qh4#")
+    assert tournament.ending(board) == (0, "checkmate")
+    board = objects.Board.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+    assert tournament.ending(board) == (0.5, "stalemate")
+    board = objects.Board.from_fen("7k/8/6K1/8/8/8/8/1N6 b - - 0 1")
+    assert tournament.ending(board) == (0.5, "insufficient material")
+    board = pgn.replay({}, "1. Nf3 Nf6 2. Ng1 Ng8 3. Nf3 Nf6 4. Ng1")
+    assert tournament.ending(board) is None
+    board.make_move(pgn.parse(board, "Ng8"))
+    assert tournament.ending(board) == (0.5, "repetition")
+
+
+def test_play() -> None:
+    rules = tournament.Rules(plies=6)
+    score, reason, board = tournament.play({"depth": 1}, {"depth": 1}, rules)
+    assert (score, reason, len(board.history)) == (0.5, "adjudication: length", 6)
+    fen = "7k/8/6K1/8/8/8/8/1Q6 w - - 0 1"
+    score, reason, board = tournament.play({"depth": 2}, {"depth": 1}, rules, fen)
+    assert (score, reason) == (1, "checkmate")
+
+
+def test_run() -> None:
+    starts = tournament.openings(["7k/8/6K1/8/8/8/8/1Q6 w - - 0 1"], count=1)
+    results = list(tournament.run({"depth": 2}, {"depth": 1}, 2, starts, workers=1))
+    assert sorted(result.number for result in results) == [0, 1]
+    # The first configuration has the Queen, then the bare King
+    scores = {result.number: result.score for result in results}
+    assert scores[0] == 1
+    game = next(pgn.read(io.StringIO(results[0].text)))
+    assert game.sequence.white == "depth=2" and game.sequence.result == [1, 0]
+    assert game.sequence.tags["Termination"] == "checkmate"
@@ -0,0 +1,51 @@
+from src.chhess.game import bitboard, objects
+from src.chhess.solver import search, transposition
+
+
+def test_TranspositionTable_size() -> None:
+    table = transposition.TranspositionTable(1)
+    assert table.buckets == 1 << 15
+    assert len(table.table) * table.table.itemsize == 1 << 20
+
+
+def test_TranspositionTable_probe() -> None:
+    table = transposition.TranspositionTable(1)
+    key = (1 << 63) | 12345
+    assert table.probe(key) is None
+    table.store(key, 5, transposition.UPPER, -search.MATE + 3, 0xABC)
+    assert table.probe(key) == (5, transposition.UPPER, -search.MATE + 3, 0xABC)
+    assert table.probe(key ^ 1 << 40) is None
+    assert table.hashfull() == 0
+    table.clear()
+    assert table.probe(key) is None
+
+
+def test_TranspositionTable_replace() -> None:
+    table = transposition.TranspositionTable(1)
+    deep, shallow, other = 7, 7 + table.buckets, 7 + 2 * table.buckets
+    table.store(deep, 6, transposition.EXACT, 10, 1)
+    table.store(shallow, 2, transposition.LOWER, 20, 2)
+    # The deeper entry is kept, the shallower one is replaced
+    table.store(other, 1, transposition.EXACT, 30, 3)
+    assert table.probe(deep)[2] == 10
+    assert table.probe(shallow) is None
+    assert table.probe(other)[2] == 30
+
+
+def test_Event_pack() -> None:
+    board = bitboard.BitBoard()
+    event = objects.Event(board.board[1][4], board.board[3][4])
+    assert event.pack() == 12 | 28 << 6
+    assert str(board.event(event.pack())) == "e2 e4"
+
+
+def test_Engine_table() -> None:
+    board = bitboard.BitBoard()
+    engine = search.Engine(depth=3)
+    best = engine.search(board)
+    entry = engine.table.probe(board.key)
+    assert entry[0] == 3 and entry[1] == transposition.EXACT
+    assert entry[3] == best.pack()
+    # A second search reuses the stored results
+    nodes = engine.nodes
+    assert search.same(engine.search(board), best) and engine.nodes < nodes
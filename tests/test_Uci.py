@@ -0,0 +1,83 @@
+import io
+
+from src.chhess import uci
+from src.chhess.game import bitboard
+
+
+def session() -> tuple[uci.UCI, list[str]]:
+    lines = []
+    return uci.UCI(lines.append), lines
+
+
+def test_parse() -> None:
+    board = bitboard.BitBoard.from_fen("7k/4P3/8/8/8/8/8/4K3 w - - 0 1")
+    assert uci.move(uci.parse(board, "e7e8")) == "e7e8q"
+    assert uci.move(uci.parse(board, "e7e8n")) == "e7e8n"
+    for text in ("e7e6", "e1e3", "e7"):
+        try:
+            uci.parse(board, text)
+            assert False
+        except ValueError:
+            pass
+
+
+def test_handshake() -> None:
+    engine, lines = session()
+    assert engine.command("uci") and engine.command("isready")
+    assert lines[0] == "id name chhess" and lines[-2:] == ["uciok", "readyok"]
+    assert "option name Ponder type check default false" in lines
+    engine.command("setoption name Ponder value true")
+    assert engine.ponder
+    engine.command("go wtime 10000 btime 10000")
+    soft = engine.manager.soft
+    engine.command("setoption name Ponder value false")
+    engine.command("go wtime 10000 btime 10000")
+    assert not engine.ponder and engine.manager.soft < soft
+    assert not engine.command("quit")
+
+
+def test_position() -> None:
+    engine, lines = session()
+    engine.command("position startpos moves e2e4 e7e5 g1f3")
+    assert engine.board.colour and len(engine.board.history) == 3
+    engine.command("position fen 7k/8/8/8/8/8/8/4K3 w - - 0 1 moves e1e2")
+    assert engine.board.to_fen() == "7k/8/8/8/8/8/4K3/8 b - - 1 1"
+    engine.command("position startpos moves e2e5")
+    assert lines == ["info string Illegal move e2e5."]
+    assert len(engine.board.history) == 1
+
+
+def test_go() -> None:
+    engine, lines = session()
+    engine.command("position fen 7k/8/6K1/8/8/8/8/1Q6 w - - 0 1")
+    engine.command("go depth 3")
+    engine.thread.join()
+    assert lines[-2].startswith("info depth 2 score mate 1 ")
+    assert lines[-1] == "bestmove b1b8"
+
+
+def test_infinite() -> None:
+    engine, lines = session()
+    engine.command("go infinite")
+    # Answered while the search runs
+    engine.command("isready")
+    assert "readyok" in lines and engine.thread.is_alive()
+    engine.command("stop")
+    assert lines[-1].startswith("bestmove ") and engine.thread is None
+
+
+def test_ponderhit() -> None:
+    engine, lines = session()
+    engine.command("position fen 7k/8/6K1/8/8/8/8/1Q6 w - - 0 1")
+    engine.command("go ponder depth 3 wtime 1000 btime 1000")
+    engine.thread.join(1)
+    # The search is done, but its best move waits for ponderhit
+    assert not lines[-1].startswith("bestmove")
+    engine.command("ponderhit")
+    engine.thread.join()
+    assert lines[-1] == "bestmove b1b8"
+
+
+def test_main() -> None:
+    commands = io.StringIO("uci\nposition startpos\ngo movetime 200\nquit\n")
+    assert uci.main(commands) == 0
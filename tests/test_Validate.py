@@ -0,0 +1,67 @@
+import io
+
+from src.chhess.game import archive, objects, pgn, validate
+from tests.test_Pgn import GAMES
+
+
+def test_check() -> None:
+    assert validate.replay([archive.pack("e2 e4")]).plies == 1
+    board = pgn.replay({}, "1. e4 e5")
+    assert validate.check(board, archive.pack("g1 f3")) is None
+    assert validate.check(board, archive.pack("e7 e6")) == "No piece to move on e7"
+    assert validate.check(board, archive.pack("e1 e3")) == "Illegal move e1 e3"
+    assert validate.check(board, archive.pack("g1 f3q")) == "Invalid promotion g1 f3q"
+
+
+def test_validate(tmp_path) -> None:
+    (tmp_path / "games.pgn").write_text(GAMES)
+    sequences = [board.sequence for board in pgn.read(io.StringIO(GAMES))]
+    sequences.append(objects.Sequence(sequence=["e2 e4", "e7 e5", "e1 e3"]))
+    archive.write(str(tmp_path / "games.arc"), sequences)
+
+    reports = list(validate.validate([str(tmp_path)], workers=1, chunk=2))
+    assert [(report.source[-3:], report.number) for report in reports] == [
+        ("arc", 0),
+        ("arc", 1),
+        ("arc", 2),
+        ("pgn", 0),
+        ("pgn", 1),
+        ("pgn", 2),
+    ]
+    assert [report.plies for report in reports] == [33, 3, 2, 33, 2, 3]
+    assert reports[2].error == "Illegal move e1 e3 at ply 3"
+    assert reports[4].error == "Illegal move Ke3 at ply 3"
+    assert reports[5].error is None
+
+    unordered = validate.validate([str(tmp_path)], workers=1, chunk=1, ordered=False)
+    assert sorted(map(str, unordered)) == sorted(map(str, reports))
+
+
+def test_main(tmp_path, capsys) -> None:
+    (tmp_path / "games.pgn").write_text(GAMES)
+    assert validate.main([str(tmp_path / "games.pgn"), "--workers", "1"]) == 1
+    out = capsys.readouterr().out
+    assert "games.pgn #1: Illegal move Ke3 at ply 3" in out
+    assert "games 3 errors 1 plies 38" in out
+
+
+def test_pgn_illegal() -> None:
+    games = [({}, "1. e4 e5 2. e5"), ({}, "1. e4 f6 2. Qh5+ a6"), ({}, "1. e4 e5")]
+    reports = validate._pgn("games.pgn", 0, games)
+    assert [report.plies for report in reports] == [2, 3, 2]
+    assert reports[0].error.endswith(" at ply 3")
+    assert reports[1].error.endswith(" at ply 4")
+    assert reports[2].error is None
+
+
+def test_archive_corrupt(tmp_path) -> None:
+    path = tmp_path / "games.arc"
+    sequence = objects.Sequence(sequence=["e2 e4", "e7 e5"])
+    archive.write(str(path), [sequence, sequence])
+    data = bytearray(path.read_bytes())
+    # Strings of the first record that are not UTF-8
+    data[len(archive.MAGIC) + archive.HEADER.size] = 0xFF
+    path.write_bytes(bytes(data))
+    reports = validate._archive(str(path), 0, 2)
+    assert reports[0].error.startswith("Corrupt record")
+    assert reports[1].error is None and reports[1].plies == 2